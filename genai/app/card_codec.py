@@ -0,0 +1,92 @@
+"""
+Storage format of drawn cards.
+
+Cards are stored in Weaviate as a typed `cards` OBJECT_ARRAY property whose
+nested fields mirror `CardLayout`, so reads get structured values back and
+only need to build the models. Rows written before that property existed
+keep their cards as JSON text in `cards_drawn`; `parse_legacy_cards` decodes
+them until `tools/migrate_cards_drawn.py` has rewritten them.
+"""
+
+import ast
+import json
+from typing import Any, Dict, List, Optional
+
+from weaviate.classes.config import DataType, Property
+
+from app.models import CardLayout
+from app.logger_config import get_tarot_logger
+
+logger = get_tarot_logger(__name__)
+
+CARDS_PROPERTY = "cards"
+LEGACY_CARDS_PROPERTY = "cards_drawn"
+
+
+def cards_property() -> Property:
+    """Schema of the typed `cards` property."""
+    return Property(
+        name=CARDS_PROPERTY,
+        data_type=DataType.OBJECT_ARRAY,
+        nested_properties=[
+            Property(name="name", data_type=DataType.TEXT),
+            Property(name="position", data_type=DataType.TEXT),
+            Property(name="upright", data_type=DataType.BOOL),
+            Property(name="meaning", data_type=DataType.TEXT),
+            Property(name="position_keywords", data_type=DataType.TEXT_ARRAY),
+        ]
+    )
+
+
+def encode_cards(cards: List[CardLayout]) -> List[Dict[str, Any]]:
+    """Value to write into the `cards` property."""
+    return [card.model_dump() for card in cards]
+
+
+def decode_cards(cards: Optional[List[Dict[str, Any]]]) -> List[CardLayout]:
+    """Build `CardLayout` objects from the typed `cards` property."""
+    return [
+        CardLayout(
+            name=card.get("name") or "",
+            position=card.get("position") or "",
+            upright=bool(card.get("upright")),
+            meaning=card.get("meaning") or "",
+            position_keywords=card.get("position_keywords") or []
+        )
+        for card in cards or ()
+    ]
+
+
+def parse_legacy_cards(cards_drawn_str: Optional[str]) -> List[CardLayout]:
+    """
+    Decode the JSON text of the legacy `cards_drawn` property.
+    Rows written with Python reprs instead of JSON are read with literal_eval.
+    """
+    if not cards_drawn_str:
+        return []
+
+    try:
+        cards_data = json.loads(cards_drawn_str)
+    except (json.JSONDecodeError, TypeError):
+        try:
+            cards_data = ast.literal_eval(cards_drawn_str.replace("null", "None"))
+        except Exception as e:
+            logger.warning(f"Could not parse cards_drawn: {e}")
+            return []
+
+    if not isinstance(cards_data, list):
+        logger.warning(f"cards_drawn is not a list: {type(cards_data)}")
+        return []
+    try:
+        return [CardLayout(**card_data) for card_data in cards_data if card_data is not None]
+    except Exception as e:
+        logger.warning(f"Invalid card in cards_drawn: {e}")
+        return []
+
+
+def cards_from_properties(props: Dict[str, Any], legacy_parser=parse_legacy_cards) -> List[CardLayout]:
+    """Cards of a stored object: typed property first, legacy JSON text otherwise."""
+    cards = props.get(CARDS_PROPERTY)
+    if cards is not None:
+        return decode_cards(cards)
+    return legacy_parser(props.get(LEGACY_CARDS_PROPERTY))
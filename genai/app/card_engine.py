@@ -1,42 +1,179 @@
 # reading_engine.py
-import random
-from typing import List, Tuple
+"""
+Spread engine.
+
+Spreads are declared in `SPREADS` (ordered positions per spread type) and
+position keywords in `POSITION_KEYWORDS`. Draws use a NumPy `Generator`
+per request instead of the global `random` state: pass a seeded one (see
+`spread_rng`) for reproducible spreads, or leave it out for a fresh stream.
+`draw_spreads` draws many spreads at once with one vectorized permutation
+and orientation sample, for bulk jobs.
+
+Layouts come from a `LayoutTable` holding a ready `CardLayout` for every
+(card, orientation, position) of the registered spreads, so a draw is index
+lookups plus a copy of the layout and its keyword list. The table is built once per deck and rebuilt
+when a different deck (a new deck cache snapshot) is drawn from.
+"""
+
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
 from app.models import TarotCard, CardLayout
 
 POSITION_KEYWORDS = {
-    "past":    ["roots", "foundation", "history", "origin"],
-    "present": ["focus", "challenge", "opportunity", "awareness"],
-    "future":  ["potential", "direction", "outcome", "change"]
+    "past":             ["roots", "foundation", "history", "origin"],
+    "present":          ["focus", "challenge", "opportunity", "awareness"],
+    "future":           ["potential", "direction", "outcome", "change"],
+    "situation":        ["circumstances", "context", "starting point", "state"],
+    "challenge":        ["obstacle", "tension", "friction", "test"],
+    "advice":           ["guidance", "approach", "action", "attitude"],
+    "hidden_influence": ["unseen forces", "undercurrent", "blind spot", "secret"],
+    "outcome":          ["result", "resolution", "destination", "culmination"],
+    "foundation":       ["basis", "root cause", "subconscious", "groundwork"],
+    "crown":            ["aspiration", "best outcome", "conscious goal", "ideal"],
+    "self":             ["attitude", "self-image", "stance", "inner state"],
+    "environment":      ["surroundings", "other people", "influences", "setting"],
+    "hopes_fears":      ["hopes", "fears", "expectations", "anxieties"],
+}
+
+class SpreadSpec(NamedTuple):
+    key: str
+    positions: Tuple[str, ...]
+
+THREE_CARD = "three_past_present_future"
+FIVE_CARD = "five_card"
+CELTIC_CROSS = "celtic_cross"
+
+SPREADS: Dict[str, SpreadSpec] = {
+    spec.key: spec for spec in [
+        SpreadSpec(THREE_CARD, ("past", "present", "future")),
+        SpreadSpec(FIVE_CARD, ("situation", "challenge", "advice", "hidden_influence", "outcome")),
+        SpreadSpec(CELTIC_CROSS, ("present", "challenge", "foundation", "past", "crown", "future",
+                                  "self", "environment", "hopes_fears", "outcome")),
+    ]
 }
 
-def draw_cards(deck: List[TarotCard], count: int) -> List[Tuple[TarotCard, bool]]:
-    picks = random.sample(deck, count)
-    return [(card, random.choice([True, False])) for card in picks]
+_SPREAD_BY_POSITIONS = {spec.positions: spec.key for spec in SPREADS.values()}
+
+def spread_for_positions(positions: Sequence[str]) -> Optional[str]:
+    """Key of the registered spread with exactly these positions, if any."""
+    return _SPREAD_BY_POSITIONS.get(tuple(positions))
+
+def get_spread(key: str) -> SpreadSpec:
+    try:
+        return SPREADS[key]
+    except KeyError:
+        raise ValueError(f"Unknown spread: {key}") from None
+
+def spread_rng(seed: Optional[int] = None) -> np.random.Generator:
+    """Independent random stream; the same seed always draws the same spreads."""
+    return np.random.default_rng(seed)
+
+def draw_indices(deck_size: int, count: int, spreads: int,
+                 rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draw `spreads` spreads of `count` distinct cards from a deck of `deck_size`.
+    Returns (card indices, upright flags), both shaped (spreads, count).
+    """
+    if count > deck_size:
+        raise ValueError(f"Cannot draw {count} cards from a deck of {deck_size}")
+    rng = rng or spread_rng()
+    order = rng.permuted(np.broadcast_to(np.arange(deck_size), (spreads, deck_size)), axis=1)
+    return order[:, :count], rng.random((spreads, count)) < 0.5
+
+def draw_cards(deck: Sequence[TarotCard], count: int,
+               rng: Optional[np.random.Generator] = None) -> List[Tuple[TarotCard, bool]]:
+    indices, upright = draw_indices(len(deck), count, 1, rng)
+    return [(deck[i], bool(u)) for i, u in zip(indices[0].tolist(), upright[0].tolist())]
 
 def interpret_card(card: TarotCard, upright: bool) -> str:
     return card.meanings_light if upright else card.meanings_shadow
 
-def layout_three_card(deck, layout_key="three_past_present_future") -> List[CardLayout]:
-    drawn = draw_cards(deck, 3)
-    positions = ["past", "present", "future"]
-    result = []
-    for i, (card, upright) in enumerate(drawn):
-        pos = positions[i]
-        meaning = interpret_card(card, upright)
-        position_keywords = POSITION_KEYWORDS[pos]
-        result.append(
-            CardLayout(
-                name=card.name,
-                position=pos,
-                upright=upright,
-                meaning=" | ".join(meaning) if isinstance(meaning, list) else meaning,
-                position_keywords=position_keywords
+def build_layout(card: TarotCard, upright: bool, position: str) -> CardLayout:
+    meaning = interpret_card(card, upright)
+    return CardLayout(
+        name=card.name,
+        position=position,
+        upright=upright,
+        meaning=" | ".join(meaning) if isinstance(meaning, list) else meaning,
+        position_keywords=POSITION_KEYWORDS[position]
+    )
+
+class LayoutTable:
+    """
+    Immutable lookup of the `CardLayout` of every card, orientation and
+    position. Cards are addressed by slot, their index in `cards`.
+    """
+
+    def __init__(self, cards: Sequence[TarotCard], positions: Optional[Iterable[str]] = None):
+        self.cards = tuple(cards)
+        if positions is None:
+            positions = {position for spec in SPREADS.values() for position in spec.positions}
+        # Keyed by identity: decks handed out by the deck cache share the same card objects
+        self._slots = {id(card): slot for slot, card in enumerate(self.cards)}
+        self._layouts: Dict[str, Tuple[Tuple[CardLayout, CardLayout], ...]] = {
+            position: tuple(
+                (build_layout(card, False, position), build_layout(card, True, position)) for card in self.cards
             )
-        )
-    return result
+            for position in positions
+        }
+
+    def slots(self, deck: Sequence[TarotCard]) -> Optional[Sequence[int]]:
+        """Slot of every card of `deck`, or None if the table was built for another deck."""
+        if deck is self.cards:
+            return range(len(self.cards))
+        if len(deck) != len(self.cards):
+            return None
+        slots = [self._slots.get(id(card)) for card in deck]
+        return None if None in slots else slots
+
+    def layout(self, slot: int, upright: bool, position: str) -> CardLayout:
+        layout = self._layouts[position][slot][upright]
+        # The keyword list is the only mutable field; callers must not share it with the table
+        return layout.model_copy(update={"position_keywords": list(layout.position_keywords)})
+
+_layout_table: Optional[LayoutTable] = None
+_layout_table_lock = threading.Lock()
+
+def build_layout_table(deck: Sequence[TarotCard]) -> LayoutTable:
+    """Build the table for `deck` and make it the one used by draws."""
+    global _layout_table
+    table = LayoutTable(deck)
+    with _layout_table_lock:
+        _layout_table = table
+    return table
+
+def _layout_table_for(deck: Sequence[TarotCard]) -> Tuple[LayoutTable, Sequence[int]]:
+    table = _layout_table
+    if table is not None:
+        slots = table.slots(deck)
+        if slots is not None:
+            return table, slots
+    table = build_layout_table(deck)
+    return table, range(len(table.cards))
+
+def draw_spreads(deck: Sequence[TarotCard], layout_key: str, count: int,
+                 rng: Optional[np.random.Generator] = None) -> List[List[CardLayout]]:
+    """Draw `count` independent spreads of one type in a single vectorized pass."""
+    positions = get_spread(layout_key).positions
+    table, slots = _layout_table_for(deck)
+    indices, upright = draw_indices(len(deck), len(positions), count, rng)
+    return [
+        [table.layout(slots[i], u, pos) for i, u, pos in zip(row_indices, row_upright, positions)]
+        for row_indices, row_upright in zip(indices.tolist(), upright.tolist())
+    ]
+
+def draw_spread(deck: Sequence[TarotCard], layout_key: str,
+                rng: Optional[np.random.Generator] = None) -> List[CardLayout]:
+    return draw_spreads(deck, layout_key, 1, rng)[0]
+
+def layout_three_card(deck, layout_key=THREE_CARD, rng: Optional[np.random.Generator] = None) -> List[CardLayout]:
+    return draw_spread(deck, layout_key, rng)
 
-def layout_five_card(deck: List[TarotCard]) -> List[Tuple[TarotCard, bool, str]]:
-    pass
+def layout_five_card(deck: List[TarotCard], rng: Optional[np.random.Generator] = None) -> List[CardLayout]:
+    return draw_spread(deck, FIVE_CARD, rng)
 
-def layout_celtic_cross(deck: List[TarotCard]) -> List[Tuple[TarotCard, bool, str]]:
-    pass
+def layout_celtic_cross(deck: List[TarotCard], rng: Optional[np.random.Generator] = None) -> List[CardLayout]:
+    return draw_spread(deck, CELTIC_CROSS, rng)
@@ -0,0 +1,182 @@
+"""
+Circuit breaker for upstream calls.
+
+The breaker keeps the outcomes of the last `window` calls. Once at least
+`min_calls` are recorded and the share of failed or slow calls (slower than
+`slow_call_seconds`) reaches `failure_rate`, it opens: calls are rejected
+immediately with `CircuitOpenError` for `open_seconds`. It then goes
+half-open and lets `half_open_probes` calls through; a healthy probe closes
+it again, a failed or slow one re-opens it.
+
+Only errors accepted by `is_failure` count against the upstream; others
+(bad input, local configuration) pass through without affecting the state.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque
+
+from app.logger_config import get_tarot_logger
+from app.metrics import metrics
+
+logger = get_tarot_logger(__name__)
+
+BREAKER_WINDOW = int(os.getenv("GEMINI_BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("GEMINI_BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("GEMINI_BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("GEMINI_BREAKER_SLOW_CALL_SECONDS", "15"))
+BREAKER_OPEN_SECONDS = float(os.getenv("GEMINI_BREAKER_OPEN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the upstream while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe closed / open / half-open breaker with a count-based window.
+    """
+
+    def __init__(self, name: str, window: int = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 failure_rate: float = BREAKER_FAILURE_RATE, slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+                 open_seconds: float = BREAKER_OPEN_SECONDS, half_open_probes: int = 1,
+                 is_failure: Callable[[BaseException], bool] = lambda error: True):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.is_failure = is_failure
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._times_opened = 0
+        self._short_circuited = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now. Half-open admits a limited number of probes."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            self._short_circuited += 1
+        metrics.increment(f"{self.name}_breaker.short_circuited")
+        return False
+
+    def record_success(self, duration: float) -> None:
+        self._record(bad=duration >= self.slow_call_seconds)
+
+    def record_failure(self) -> None:
+        self._record(bad=True)
+
+    def record_error(self, error: Exception) -> None:
+        """Record a failed call; errors rejected by `is_failure` do not count."""
+        if self.is_failure(error):
+            self.record_failure()
+        else:
+            self.release()
+
+    def release(self) -> None:
+        """Give back a half-open probe whose outcome says nothing about the upstream."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        started = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            self.record_error(e)
+            raise
+        self.record_success(time.monotonic() - started)
+        return result
+
+    async def call_async(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        except Exception as e:
+            self.record_error(e)
+            raise
+        self.record_success(time.monotonic() - started)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state,
+                "failure_rate": round(self._rate(), 3),
+                "calls_in_window": len(self._outcomes),
+                "times_opened": self._times_opened,
+                "short_circuited": self._short_circuited,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._outcomes.clear()
+            self._state = CLOSED
+            self._probes = 0
+        metrics.set_gauge(f"{self.name}_breaker.state", _STATE_GAUGE[CLOSED])
+
+    def _record(self, bad: bool) -> None:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == HALF_OPEN:
+                if bad:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    logger.info(f"{self.name} circuit closed after a healthy probe")
+            elif self._state == CLOSED:
+                self._outcomes.append(bad)
+                if len(self._outcomes) >= self.min_calls and self._rate() >= self.failure_rate:
+                    self._open()
+            state = self._state
+        metrics.set_gauge(f"{self.name}_breaker.state", _STATE_GAUGE[state])
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes = 0
+        self._times_opened += 1
+        metrics.increment(f"{self.name}_breaker.opened")
+        logger.warning(f"{self.name} circuit opened for {self.open_seconds:.0f}s "
+                       f"(failure rate {self._rate():.0%} over {len(self._outcomes)} calls)")
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+
+    def _rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
@@ -16,7 +16,7 @@ from collections import Counter
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Local imports
-from app.weaviate_client import get_weaviate_client
+from app.weaviate_client import get_shared_weaviate_client
 from app.models import TarotCard, CardLayout
 from app.feedback import FeedbackProcessor
 from app.logger_config import get_tarot_logger
@@ -29,9 +29,10 @@ class ContextAwareReader:
     Enhances tarot readings by incorporating feedback from similar past readings.
     """
     
-    def __init__(self):
-        self.client = get_weaviate_client()
-        self.feedback_processor = FeedbackProcessor()
+    def __init__(self, client=None):
+        # Reuse the process-wide connection unless a client is injected
+        self.client = client or get_shared_weaviate_client()
+        self.feedback_processor = FeedbackProcessor(self.client)
 
     def enhance_reading_with_context(self, question: str, cards: List[CardLayout], 
                                    base_interpretation: str) -> Dict[str, str]:
@@ -346,11 +347,12 @@ class ContextAwareReader:
             return {"error": str(e)}
     
     def close(self):
-        """Close the client connection."""
-        if hasattr(self, 'client') and self.client:
-            self.client.close()
-        if hasattr(self, 'feedback_processor') and self.feedback_processor.client:
-            self.feedback_processor.client.close()
+        """
+        Release reader resources. The Weaviate client is shared by the process
+        and is closed by the server lifespan handler, not here.
+        """
+        self.client = None
+        self.feedback_processor = None
 
 
 def enhance_reading_with_feedback_context(question: str, cards: List[CardLayout], 
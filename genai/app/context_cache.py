@@ -0,0 +1,283 @@
+"""
+Gemini context cache for the static part of reading prompts.
+
+The persona and answer instructions (`tarot_system_instruction.txt`) and a
+glossary of the whole deck (every card's upright and reversed meanings,
+position keywords and spread layouts) are uploaded once as a Gemini cached
+context. Reading prompts then only carry the question, the drawn cards by
+name, position and orientation, and any conversation context, and are sent
+with `cached_content` pointing at the cache.
+
+`run_context_cache_refresher` creates the cache at startup and extends its
+TTL (`GEMINI_CONTEXT_CACHE_TTL`) `GEMINI_CONTEXT_CACHE_REFRESH_MARGIN`
+seconds before it expires. When the deck or the instruction changed, a new
+cache replaces the old one. Without an active cache, or when Gemini no
+longer knows it, prompts fall back to the full template; a cache Gemini
+reported missing wakes the refresher so it is recreated right away.
+
+The cache is off by default (`GEMINI_CONTEXT_CACHE_ENABLED`). Every request
+that uses it processes the whole cached context: about 10.9k characters
+(~2.7k tokens) of glossary and instruction, while a full three-card prompt is
+about 740 characters (~185 tokens) and a Celtic Cross prompt about 1.9k. Even
+at the cached-token rate, plus storage, it only pays off with prompts that
+repeat much more of the deck than one spread does.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from google.genai import errors, types
+
+from app.card_engine import POSITION_KEYWORDS, SPREADS
+from app.deck_cache import get_deck
+from app.gemini_runtime import GEMINI_MODEL, get_gemini_runtime
+from app.logger_config import get_tarot_logger
+from app.metrics import metrics
+from app.models import CardLayout, TarotCard
+from app.prompt_loader import load_system_instruction, render_cached_prompt
+
+logger = get_tarot_logger(__name__)
+
+GEMINI_CONTEXT_CACHE_ENABLED = os.getenv("GEMINI_CONTEXT_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+GEMINI_CONTEXT_CACHE_TTL = float(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+GEMINI_CONTEXT_CACHE_REFRESH_MARGIN = float(os.getenv("GEMINI_CONTEXT_CACHE_REFRESH_MARGIN", "300"))
+
+# Retry delay while no cache could be created
+RETRY_SECONDS = 60.0
+# A cache this close to its expiry is no longer handed out
+EXPIRY_SAFETY_SECONDS = 30.0
+
+
+class CachedContextPrompt(str):
+    """
+    A prompt that relies on the cached context `cache_name`. Carries the full
+    prompt so the request can be repeated without the cache.
+    """
+
+    def __new__(cls, text: str, cache_name: str, full_prompt: str):
+        prompt = super().__new__(cls, text)
+        prompt.cache_name = cache_name
+        prompt.full_prompt = full_prompt
+        return prompt
+
+
+def prefix_prompt(prefix: str, prompt: str) -> str:
+    """`prefix + prompt`, keeping the cached context of a `CachedContextPrompt`."""
+    if isinstance(prompt, CachedContextPrompt):
+        return CachedContextPrompt(prefix + prompt, prompt.cache_name, prefix + prompt.full_prompt)
+    return prefix + prompt
+
+
+# (HTTP code, status) pairs Gemini answers with for an unknown or expired cached content
+CACHE_MISS_STATUSES = {(404, "NOT_FOUND"), (403, "PERMISSION_DENIED")}
+
+
+def is_cache_miss(error: BaseException) -> bool:
+    """Whether Gemini rejected a request because its cached content is gone."""
+    if not isinstance(error, errors.ClientError) or (error.code, error.status) not in CACHE_MISS_STATUSES:
+        return False
+    # A 403 is also what an unauthorized API key gets; only count the ones about the cache
+    return "cachedcontent" in (error.message or "").replace(" ", "").lower()
+
+
+def record_usage(response) -> None:
+    """Count prompt and cache-served tokens of a Gemini response."""
+    usage = getattr(response, "usage_metadata", None)
+    for field, name in (("prompt_token_count", "gemini.prompt_tokens"),
+                        ("cached_content_token_count", "gemini.cached_tokens")):
+        value = getattr(usage, field, None)
+        if isinstance(value, int):
+            metrics.increment(name, value)
+
+
+def _meanings(meanings) -> str:
+    return " | ".join(meanings) if isinstance(meanings, list) else (meanings or "")
+
+
+def build_glossary(cards: Iterable[TarotCard]) -> str:
+    """Deck glossary in a stable order, so unchanged decks produce identical text."""
+    lines = ["# Tarot glossary", "", "## Cards"]
+    for card in sorted(cards, key=lambda c: c.name):
+        lines.append(f"### {card.name}" + (f" ({card.arcana} arcana)" if card.arcana else ""))
+        if card.keywords:
+            lines.append(f"Keywords: {', '.join(card.keywords)}")
+        lines.append(f"Upright: {_meanings(card.meanings_light)}")
+        lines.append(f"Reversed: {_meanings(card.meanings_shadow)}")
+        lines.append("")
+    lines.append("## Position keywords")
+    lines.extend(f"- {position}: {', '.join(keywords)}" for position, keywords in POSITION_KEYWORDS.items())
+    lines.extend(["", "## Spreads"])
+    lines.extend(f"- {spec.key}: {', '.join(spec.positions)}" for spec in SPREADS.values())
+    return "\n".join(lines)
+
+
+class ContextCache:
+    """
+    Owns one Gemini cached context and keeps it alive.
+    """
+
+    def __init__(self, enabled: bool = GEMINI_CONTEXT_CACHE_ENABLED, ttl: float = GEMINI_CONTEXT_CACHE_TTL,
+                 refresh_margin: float = GEMINI_CONTEXT_CACHE_REFRESH_MARGIN, model: str = GEMINI_MODEL):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.model = model
+        self._name: Optional[str] = None
+        self._fingerprint: Optional[str] = None
+        self._expires_at = 0.0
+        self._created = 0
+        self._refreshed = 0
+        self._lock = threading.Lock()
+        # Set by the refresher task so invalidate() can wake it from any thread
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def active_name(self) -> Optional[str]:
+        """Name of the cached context to use now, or None to send full prompts."""
+        if not self.enabled or self._name is None:
+            return None
+        if time.monotonic() >= self._expires_at - EXPIRY_SAFETY_SECONDS:
+            return None
+        return self._name
+
+    def refresh(self, client=None) -> Optional[str]:
+        """
+        Create the cached context, extend its TTL, or replace it when the
+        glossary or instruction changed. Returns the active cache name.
+        """
+        if not self.enabled:
+            return None
+        cards = get_deck(client).cards
+        if not cards:
+            logger.warning("No tarot deck available, Gemini context cache not created")
+            return None
+        instruction = load_system_instruction()
+        glossary = build_glossary(cards)
+        fingerprint = hashlib.sha256(f"{self.model}\n{instruction}\n{glossary}".encode("utf-8")).hexdigest()
+        ttl = f"{int(self.ttl)}s"
+        caches = get_gemini_runtime().client.caches
+
+        with self._lock:
+            if self._name is not None and fingerprint == self._fingerprint:
+                try:
+                    caches.update(name=self._name, config=types.UpdateCachedContentConfig(ttl=ttl))
+                    self._expires_at = time.monotonic() + self.ttl
+                    self._refreshed += 1
+                    metrics.increment("gemini.context_cache.refreshed")
+                    return self._name
+                except Exception as e:
+                    logger.warning(f"Could not extend Gemini context cache {self._name}, recreating it: {e}")
+
+            previous = self._name
+            cached = caches.create(model=self.model, config=types.CreateCachedContentConfig(
+                display_name=f"tarot-glossary-{fingerprint[:12]}",
+                system_instruction=instruction,
+                contents=[glossary],
+                ttl=ttl
+            ))
+            self._name = cached.name
+            self._fingerprint = fingerprint
+            self._expires_at = time.monotonic() + self.ttl
+            self._created += 1
+            metrics.increment("gemini.context_cache.created")
+            logger.info(f"Created Gemini context cache {cached.name} ({len(cards)} cards, ttl {ttl})")
+
+        if previous is not None and previous != cached.name:
+            self._delete(previous)
+        return cached.name
+
+    def invalidate(self, name: str) -> None:
+        """Stop using `name` after Gemini reported it missing and wake the refresher to recreate it."""
+        with self._lock:
+            current = self._name == name
+            if current:
+                self._name = None
+                self._fingerprint = None
+        metrics.increment("gemini.context_cache.misses")
+        logger.warning(f"Gemini context cache {name} is gone, sending full prompts until it is recreated")
+        if current:
+            self.wake()
+
+    def wake(self) -> None:
+        """Make the refresher task run now instead of at its next scheduled refresh."""
+        if self._wakeup is None or self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass  # the loop is closed
+
+    async def wait_for_refresh(self) -> None:
+        """Sleep until the next scheduled refresh or until `wake()` is called."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._wakeup = loop, asyncio.Event()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.next_refresh_in())
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def next_refresh_in(self) -> float:
+        """Seconds until the cache should be refreshed."""
+        if self._name is None:
+            return RETRY_SECONDS
+        return max(1.0, self._expires_at - self.refresh_margin - time.monotonic())
+
+    def close(self) -> None:
+        """Delete the cached context (on shutdown) so it does not accrue storage."""
+        with self._lock:
+            name, self._name, self._fingerprint = self._name, None, None
+        if name is not None:
+            self._delete(name)
+
+    def stats(self) -> dict:
+        name = self.active_name()
+        return {
+            "enabled": self.enabled,
+            "active": name is not None,
+            "name": name,
+            "expires_in": round(max(0.0, self._expires_at - time.monotonic()), 1) if name else 0.0,
+            "created": self._created,
+            "refreshed": self._refreshed,
+        }
+
+    def _delete(self, name: str) -> None:
+        try:
+            get_gemini_runtime().client.caches.delete(name=name)
+        except Exception as e:
+            logger.warning(f"Could not delete Gemini context cache {name}: {e}")
+
+
+_context_cache = ContextCache()
+
+
+def get_context_cache() -> ContextCache:
+    """Return the process-wide Gemini context cache."""
+    return _context_cache
+
+
+def with_context_cache(question: str, picks: List[CardLayout], full_prompt: str) -> str:
+    """The short cached-context prompt when a cache is active, otherwise `full_prompt`."""
+    name = _context_cache.active_name()
+    if name is None:
+        return full_prompt
+    return CachedContextPrompt(render_cached_prompt(question, picks), name, full_prompt)
+
+
+async def run_context_cache_refresher(client_getter=None) -> None:
+    """Background task: create the cached context and keep it from expiring until cancelled."""
+    if not _context_cache.enabled:
+        return
+    while True:
+        try:
+            client = client_getter() if client_getter is not None else None
+            await asyncio.to_thread(_context_cache.refresh, client)
+        except Exception as e:
+            metrics.increment("gemini.context_cache.errors")
+            logger.error(f"Gemini context cache refresh failed: {e}")
+        await _context_cache.wait_for_refresh()
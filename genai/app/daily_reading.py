@@ -0,0 +1,246 @@
+"""
+Deterministic, precomputed daily readings.
+
+A daily reading is drawn with a random generator seeded by (user_id, date),
+so every request on the same day yields the same cards, and the generated
+reading is kept in a daily store (in process, optionally mirrored to Redis).
+An off-peak warm-up job pre-generates readings for recently active users and
+for anonymous visitors with a bounded worker pool, so serving a daily reading
+is a cache lookup in the steady state.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from weaviate.classes.query import Filter
+
+from app.card_engine import layout_three_card, spread_rng
+from app.logger_config import get_tarot_logger
+from app.metrics import metrics
+from app.pagination import iterate_all
+from app.rag_engine import fetch_full_deck, generate_reading, generate_reading_async
+from app.schema import collection_available
+from app.offline_reading import OfflineReading
+
+logger = get_tarot_logger(__name__)
+
+DAILY_QUESTION = "What guidance do I need for today?"
+ANONYMOUS_USER = "anonymous"
+
+# Hour of day (0-23, server local time) at which the warm-up job runs; unset disables it
+DAILY_WARMUP_HOUR = os.getenv("DAILY_WARMUP_HOUR")
+DAILY_WARMUP_WORKERS = int(os.getenv("DAILY_WARMUP_WORKERS", "4"))
+# Users with a discussion in the last N days are considered active
+DAILY_WARMUP_ACTIVE_DAYS = int(os.getenv("DAILY_WARMUP_ACTIVE_DAYS", "7"))
+DAILY_WARMUP_MAX_USERS = int(os.getenv("DAILY_WARMUP_MAX_USERS", "1000"))
+
+
+def daily_seed(user_id: Optional[str], day: date) -> int:
+    """Stable 64-bit seed for a user's reading on a given day."""
+    raw = f"{user_id or ANONYMOUS_USER}:{day.isoformat()}".encode("utf-8")
+    return int.from_bytes(hashlib.sha256(raw).digest()[:8], "big")
+
+
+def draw_daily_spread(deck, user_id: Optional[str], day: date):
+    """Draw the deterministic three-card spread for (user_id, day)."""
+    # Sort so the draw does not depend on the order Weaviate returns the cards in
+    ordered = sorted(deck, key=lambda card: card.name)
+    return layout_three_card(ordered, rng=spread_rng(daily_seed(user_id, day)))
+
+
+class DailyReadingStore:
+    """
+    Holds today's generated readings keyed by (user_id, date).
+    Entries from previous days are dropped when the date rolls over.
+    """
+
+    def __init__(self, remote=None):
+        self.remote = remote
+        self._entries: Dict[Tuple[str, str], dict] = {}
+        self._day: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def attach_remote(self, remote) -> None:
+        """Use a `CacheManager`-like object (get/set) as second tier."""
+        self.remote = remote
+
+    def get(self, user_id: Optional[str], day: date) -> Optional[dict]:
+        key = (user_id or ANONYMOUS_USER, day.isoformat())
+        with self._lock:
+            self._roll_over(day)
+            entry = self._entries.get(key)
+        if entry is None and self.remote is not None:
+            entry = self.remote.get(self._remote_key(key))
+            if entry is not None:
+                with self._lock:
+                    self._entries[key] = entry
+        return dict(entry) if entry is not None else None
+
+    def set(self, user_id: Optional[str], day: date, reading: dict) -> None:
+        key = (user_id or ANONYMOUS_USER, day.isoformat())
+        with self._lock:
+            self._roll_over(day)
+            self._entries[key] = reading
+        if self.remote is not None:
+            self.remote.set(self._remote_key(key), reading, expire=_seconds_until_end_of(day))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _roll_over(self, day: date) -> None:
+        if self._day != day.isoformat():
+            self._entries.clear()
+            self._day = day.isoformat()
+
+    @staticmethod
+    def _remote_key(key: Tuple[str, str]) -> str:
+        return f"daily:{key[0]}:{key[1]}"
+
+
+def _seconds_until_end_of(day: date) -> int:
+    end = datetime.combine(day + timedelta(days=1), dt_time.min)
+    return max(60, int((end - datetime.now()).total_seconds()))
+
+
+def _build_reading(user_id: Optional[str], day: date, picks, answer: str) -> dict:
+    return {
+        "reading_type": "daily_three_card",
+        "date": day.isoformat(),
+        "question": DAILY_QUESTION,
+        "cards": [card.model_dump() for card in picks],
+        "answer": answer,
+        "user_id": user_id
+    }
+
+
+_daily_store = DailyReadingStore()
+
+
+def get_daily_store() -> DailyReadingStore:
+    """Return the process-wide daily reading store."""
+    return _daily_store
+
+
+def get_daily_reading(user_id: Optional[str] = None, day: Optional[date] = None) -> dict:
+    """Return today's reading for a user, generating and storing it on first access."""
+    day = day or date.today()
+    cached = _daily_store.get(user_id, day)
+    if cached is not None:
+        metrics.increment("daily_reading.hits")
+        return cached
+
+    metrics.increment("daily_reading.misses")
+    deck = fetch_full_deck()
+    if not deck:
+        raise Exception("Failed to fetch tarot deck")
+
+    picks = draw_daily_spread(deck, user_id, day)
+    answer = generate_reading(DAILY_QUESTION, picks)
+    reading = _build_reading(user_id, day, picks, answer)
+    if not isinstance(answer, OfflineReading):
+        _daily_store.set(user_id, day, reading)
+    return dict(reading)
+
+
+async def get_daily_reading_async(user_id: Optional[str] = None, day: Optional[date] = None) -> dict:
+    """Async variant of `get_daily_reading`."""
+    day = day or date.today()
+    cached = await asyncio.to_thread(_daily_store.get, user_id, day)
+    if cached is not None:
+        metrics.increment("daily_reading.hits")
+        return cached
+
+    metrics.increment("daily_reading.misses")
+    deck = await asyncio.to_thread(fetch_full_deck)
+    if not deck:
+        raise Exception("Failed to fetch tarot deck")
+
+    picks = draw_daily_spread(deck, user_id, day)
+    answer = await generate_reading_async(DAILY_QUESTION, picks)
+    reading = _build_reading(user_id, day, picks, answer)
+    if not isinstance(answer, OfflineReading):
+        await asyncio.to_thread(_daily_store.set, user_id, day, reading)
+    return dict(reading)
+
+
+def get_active_user_ids(client, days: int = DAILY_WARMUP_ACTIVE_DAYS,
+                        limit: int = DAILY_WARMUP_MAX_USERS) -> List[str]:
+    """
+    User IDs with at least one discussion started in the last `days` days,
+    most recently active first. Weaviate filters and sorts on `created_at`;
+    pages are only fetched until `limit` distinct users were seen.
+    """
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+    if not collection_available(client, "Discussion"):
+        return []
+    objects = iterate_all(
+        client.collections.get("Discussion"),
+        "created_at",
+        filters=Filter.by_property("created_at").greater_or_equal(cutoff),
+        ascending=False,
+        return_properties=["user_id", "created_at"]
+    )
+    user_ids = []
+    seen = set()
+    for obj in objects:
+        user_id = obj.properties.get("user_id")
+        if user_id and user_id not in seen:
+            seen.add(user_id)
+            user_ids.append(user_id)
+            if len(user_ids) >= limit:
+                break
+    return user_ids
+
+
+def warm_daily_readings(user_ids: Iterable[Optional[str]], day: Optional[date] = None,
+                        max_workers: int = DAILY_WARMUP_WORKERS) -> dict:
+    """
+    Pre-generate daily readings with a bounded worker pool.
+    The anonymous reading is always included.
+    """
+    day = day or date.today()
+    targets = [None] + [user_id for user_id in dict.fromkeys(user_ids) if user_id]
+    generated = failed = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="daily-warmup") as pool:
+        futures = {pool.submit(get_daily_reading, user_id, day): user_id for user_id in targets}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                generated += 1
+            except Exception as e:
+                failed += 1
+                logger.warning(f"Daily warm-up failed for {futures[future] or ANONYMOUS_USER}: {e}")
+
+    logger.info(f"Daily warm-up for {day.isoformat()}: {generated} readings ready, {failed} failed")
+    metrics.increment("daily_reading.warmed", generated)
+    return {"date": day.isoformat(), "generated": generated, "failed": failed}
+
+
+def _seconds_until_hour(hour: int) -> float:
+    now = datetime.now()
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+async def run_daily_warmup_scheduler(client_getter) -> None:
+    """
+    Background task: once a day at DAILY_WARMUP_HOUR, pre-generate readings
+    for active users and anonymous visitors.
+    """
+    hour = int(DAILY_WARMUP_HOUR)
+    while True:
+        await asyncio.sleep(_seconds_until_hour(hour))
+        try:
+            user_ids = await asyncio.to_thread(get_active_user_ids, client_getter())
+            await asyncio.to_thread(warm_daily_readings, user_ids)
+        except Exception as e:
+            logger.error(f"Daily warm-up job failed: {e}")
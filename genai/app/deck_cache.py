@@ -0,0 +1,182 @@
+"""
+Process-level cache for the tarot deck.
+
+The 78-card deck almost never changes, so it is fetched from Weaviate once and
+kept as an immutable snapshot (a tuple of cards plus a read-only index by
+name). After `DECK_CACHE_TTL` seconds the cache re-validates the snapshot by
+reading a single `DeckMeta` object whose version is bumped by
+`vector-db/vectordb_init.py` on every ingestion; the full deck is only
+re-fetched when that version changed or `invalidate()` was called. Every new
+snapshot also rebuilds the card engine's layout table.
+"""
+
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, List, Mapping, NamedTuple, Optional, Tuple
+
+from weaviate.util import generate_uuid5
+
+from app.models import TarotCard
+from app.card_engine import build_layout_table
+from app.logger_config import get_tarot_logger
+from app.weaviate_client import get_shared_weaviate_client
+from app.schema import collection_available
+
+logger = get_tarot_logger(__name__)
+
+DECK_CACHE_TTL = float(os.getenv("DECK_CACHE_TTL", "3600"))
+
+# Collection and object written by vector-db/vectordb_init.py after ingestion
+DECK_META_COLLECTION = "DeckMeta"
+DECK_META_KEY = "tarot_deck"
+DECK_META_UUID = generate_uuid5(DECK_META_KEY)
+
+
+class DeckSnapshot(NamedTuple):
+    """Immutable view of the deck at a given version."""
+    cards: Tuple[TarotCard, ...]
+    by_name: Mapping[str, TarotCard]
+    version: Optional[str]
+    loaded_at: float
+
+    def get(self, name: str) -> Optional[TarotCard]:
+        return self.by_name.get(name)
+
+
+def load_deck_from_weaviate(client) -> List[TarotCard]:
+    """Fetch all tarot cards from the TarotCard collection."""
+    tarot_col = client.collections.get("TarotCard")
+    all_objs = tarot_col.query.fetch_objects(limit=78)  # 78 cards in a tarot deck
+
+    cards = []
+    for obj in all_objs.objects:
+        card_data = {
+            "name": obj.properties.get("name", ""),
+            "arcana": obj.properties.get("arcana", ""),
+            "meanings_light": obj.properties.get("meanings_light", []),
+            "meanings_shadow": obj.properties.get("meanings_shadow", []),
+            "keywords": obj.properties.get("keywords", []),
+            "fortune_telling": obj.properties.get("fortune_telling", []),
+        }
+        cards.append(TarotCard(**card_data))
+    return cards
+
+
+def read_deck_version(client) -> Optional[str]:
+    """Return the deck version published by the ingestion script, if any."""
+    if not collection_available(client, DECK_META_COLLECTION):
+        return None
+    obj = client.collections.get(DECK_META_COLLECTION).query.fetch_object_by_id(DECK_META_UUID)
+    if obj is None:
+        return None
+    return obj.properties.get("version")
+
+
+class DeckCache:
+    """
+    Thread-safe holder of the current `DeckSnapshot`.
+    """
+
+    def __init__(self, loader: Callable = load_deck_from_weaviate,
+                 version_reader: Callable = read_deck_version,
+                 ttl: float = DECK_CACHE_TTL):
+        self._loader = loader
+        self._version_reader = version_reader
+        self.ttl = ttl
+        self._snapshot: Optional[DeckSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, client=None) -> DeckSnapshot:
+        """
+        Return the cached snapshot, re-validating it once the TTL has expired.
+        Returns an empty snapshot when the deck cannot be loaded at all.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.ttl:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and time.monotonic() - self._checked_at < self.ttl:
+                return snapshot
+
+            if client is None:
+                client = get_shared_weaviate_client()
+
+            version = None
+            try:
+                version = self._version_reader(client)
+                if snapshot is not None and version == snapshot.version:
+                    self._checked_at = time.monotonic()
+                    return snapshot
+            except Exception as e:
+                if snapshot is not None:
+                    logger.warning(f"Could not read deck version, serving cached deck: {e}")
+                    self._checked_at = time.monotonic()
+                    return snapshot
+                logger.warning(f"Could not read deck version: {e}")
+
+            try:
+                cards = self._loader(client)
+            except Exception as e:
+                logger.error(f"Error fetching deck: {e}")
+                if snapshot is not None:
+                    return snapshot
+                return _empty_snapshot()
+
+            if not cards:
+                logger.warning("Deck loader returned no cards; not caching")
+                return snapshot if snapshot is not None else _empty_snapshot()
+
+            self._snapshot = _build_snapshot(cards, version)
+            self._checked_at = time.monotonic()
+            # Prepare the layouts of the new deck before the first draw needs them
+            build_layout_table(self._snapshot.cards)
+            logger.info(f"Cached tarot deck with {len(cards)} cards (version: {version})")
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot so the next `get()` reloads the deck."""
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = 0.0
+        logger.info("Tarot deck cache invalidated")
+
+    @property
+    def snapshot(self) -> Optional[DeckSnapshot]:
+        """Current snapshot without any validation or network access."""
+        return self._snapshot
+
+
+def _build_snapshot(cards: List[TarotCard], version: Optional[str]) -> DeckSnapshot:
+    return DeckSnapshot(
+        cards=tuple(cards),
+        by_name=MappingProxyType({card.name: card for card in cards}),
+        version=version,
+        loaded_at=time.time(),
+    )
+
+
+def _empty_snapshot() -> DeckSnapshot:
+    return DeckSnapshot(cards=(), by_name=MappingProxyType({}), version=None, loaded_at=time.time())
+
+
+_deck_cache = DeckCache()
+
+
+def get_deck_cache() -> DeckCache:
+    """Return the process-wide deck cache."""
+    return _deck_cache
+
+
+def get_deck(client=None) -> DeckSnapshot:
+    """Return the current deck snapshot."""
+    return _deck_cache.get(client)
+
+
+def invalidate_deck_cache() -> None:
+    """Invalidation hook: force the next deck read to hit Weaviate."""
+    _deck_cache.invalidate()
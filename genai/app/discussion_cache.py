@@ -0,0 +1,186 @@
+"""
+Write-through cache of discussion state.
+
+`store_discussion` and `store_followup_question` put what they just wrote
+into this cache, and `get_discussion` / `get_discussion_history` read from it
+before going to Weaviate. A discussion is therefore readable right after it
+was stored (no waiting for Weaviate to make the write visible), and a
+followup turn does not have to re-read the discussion and its history.
+
+Entries live in an in-process LRU with TTL. When a `CacheManager` is attached
+(REDIS_HOST set), Redis is the shared copy: reads go to Redis first so every
+worker sees followups written by the others, and the local LRU only serves as
+a fallback when Redis is unavailable. Followups are appended to the Redis copy
+with an atomic read-modify-write (`CacheManager.update`), so concurrent
+appends from several workers are not lost.
+
+Local entries expire after `DISCUSSION_CACHE_LOCAL_TTL` seconds: without a
+shared tier, a followup stored by another replica only shows up here once the
+local entry expired and the history is reloaded from Weaviate.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.models import Discussion, FollowupQuestion
+from app.logger_config import get_tarot_logger
+from app.metrics import metrics
+
+logger = get_tarot_logger(__name__)
+
+DISCUSSION_CACHE_SIZE = int(os.getenv("DISCUSSION_CACHE_SIZE", "2000"))
+DISCUSSION_CACHE_TTL = int(os.getenv("DISCUSSION_CACHE_TTL", "3600"))
+# Lifetime of the in-process copy, which other replicas cannot update
+DISCUSSION_CACHE_LOCAL_TTL = int(os.getenv("DISCUSSION_CACHE_LOCAL_TTL", "30"))
+
+
+class DiscussionState(BaseModel):
+    """
+    Cached view of one discussion. `followups` is None until the complete
+    history is known (loaded from Weaviate or started empty in this cache).
+    """
+    discussion_id: str
+    discussion: Optional[Discussion] = None
+    followups: Optional[List[FollowupQuestion]] = None
+
+
+class DiscussionStateCache:
+    """
+    LRU + TTL cache of `DiscussionState` with an optional remote tier.
+    """
+
+    def __init__(self, max_entries: int = DISCUSSION_CACHE_SIZE, ttl: int = DISCUSSION_CACHE_TTL, remote=None,
+                 local_ttl: int = DISCUSSION_CACHE_LOCAL_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.local_ttl = min(local_ttl, ttl)
+        self.remote = remote
+        self._entries: "OrderedDict[str, Tuple[DiscussionState, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def attach_remote(self, remote) -> None:
+        """Use a `CacheManager`-like object (get/set/delete) as shared tier."""
+        self.remote = remote
+
+    def get(self, discussion_id: str) -> Optional[DiscussionState]:
+        state = None
+        if self.remote is not None:
+            data = self.remote.get(self._remote_key(discussion_id))
+            if data is not None:
+                try:
+                    state = DiscussionState.model_validate(data)
+                except Exception as e:
+                    logger.warning(f"Dropping unreadable cached state of discussion {discussion_id}: {e}")
+        if state is None:
+            state = self._get_local(discussion_id)
+
+        metrics.increment("discussion_cache.hits" if state is not None else "discussion_cache.misses")
+        return state.model_copy(deep=True) if state is not None else None
+
+    def put_discussion(self, discussion: Discussion) -> None:
+        """Cache a discussion that was just stored; it has no followups yet."""
+        self._put(DiscussionState(
+            discussion_id=discussion.discussion_id,
+            discussion=discussion,
+            followups=[]
+        ))
+
+    def remember_discussion(self, discussion: Discussion) -> None:
+        """Cache a discussion loaded from storage, keeping any cached history."""
+        state = self.get(discussion.discussion_id) or DiscussionState(discussion_id=discussion.discussion_id)
+        state.discussion = discussion
+        self._put(state)
+
+    def remember_history(self, discussion_id: str, followups: List[FollowupQuestion]) -> None:
+        """Cache the complete followup history loaded from storage."""
+        state = self.get(discussion_id) or DiscussionState(discussion_id=discussion_id)
+        state.followups = list(followups)
+        self._put(state)
+
+    def append_followup(self, followup: FollowupQuestion) -> None:
+        """
+        Add a just-stored followup to the cached history, if the history is
+        cached. Both tiers are updated atomically, not with get-then-set.
+        """
+        with self._lock:
+            entry = self._entries.get(followup.discussion_id)
+            if entry is not None:
+                state, expires_at = entry
+                updated = _with_followup(state.model_copy(deep=True), followup)
+                if updated is not None:
+                    self._entries[followup.discussion_id] = (updated, expires_at)
+        if self.remote is not None:
+            self.remote.update(self._remote_key(followup.discussion_id),
+                               lambda data: _with_followup_data(data, followup), expire=self.ttl)
+
+    def invalidate(self, discussion_id: str) -> None:
+        with self._lock:
+            self._entries.pop(discussion_id, None)
+        if self.remote is not None:
+            self.remote.delete(self._remote_key(discussion_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _put(self, state: DiscussionState) -> None:
+        with self._lock:
+            self._entries[state.discussion_id] = (state, time.monotonic() + self.local_ttl)
+            self._entries.move_to_end(state.discussion_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self.remote is not None:
+            self.remote.set(self._remote_key(state.discussion_id), state.model_dump(mode="json"), expire=self.ttl)
+
+    def _get_local(self, discussion_id: str) -> Optional[DiscussionState]:
+        with self._lock:
+            entry = self._entries.get(discussion_id)
+            if entry is None:
+                return None
+            state, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[discussion_id]
+                return None
+            self._entries.move_to_end(discussion_id)
+            return state
+
+    @staticmethod
+    def _remote_key(discussion_id: str) -> str:
+        return f"discussion:{discussion_id}"
+
+
+def _with_followup(state: DiscussionState, followup: FollowupQuestion) -> Optional[DiscussionState]:
+    """`state` with `followup` appended, or None when there is nothing to change."""
+    if state.followups is None or any(f.question_id == followup.question_id for f in state.followups):
+        return None
+    state.followups.append(followup)
+    return state
+
+
+def _with_followup_data(data: Optional[Dict], followup: FollowupQuestion) -> Optional[Dict]:
+    """`_with_followup` on the JSON form kept in the shared tier."""
+    if data is None:
+        return None
+    try:
+        state = _with_followup(DiscussionState.model_validate(data), followup)
+    except Exception as e:
+        logger.warning(f"Dropping unreadable cached state of discussion {followup.discussion_id}: {e}")
+        return None
+    return state.model_dump(mode="json") if state is not None else None
+
+
+_discussion_cache = DiscussionStateCache()
+
+
+def get_discussion_cache() -> DiscussionStateCache:
+    """Return the process-wide discussion state cache."""
+    return _discussion_cache
@@ -0,0 +1,185 @@
+"""
+Bounded conversation memory for followup questions.
+
+Each discussion keeps a rolling summary of its older followups, persisted in
+the `DiscussionSummary` collection (one object per discussion, addressed by a
+UUID derived from the discussion ID). After every followup the turns that
+fell out of the verbatim window are folded into the summary. Followup prompts
+then carry the summary plus the most recent turns that fit in a token budget,
+so prompt size stays flat however long a discussion gets. When the earlier
+turns most relevant to the new question were retrieved (`app.history_index`),
+those plus the latest turn replace the window of most recent turns.
+"""
+
+import os
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from weaviate.util import generate_uuid5
+
+from app.models import DiscussionSummary, FollowupQuestion
+from app.logger_config import get_tarot_logger
+from app.schema import collection_available, ensure_collection
+
+logger = get_tarot_logger(__name__)
+
+# Token budget for the conversation context of a followup prompt (summary + recent turns)
+FOLLOWUP_HISTORY_TOKEN_BUDGET = int(os.getenv("FOLLOWUP_HISTORY_TOKEN_BUDGET", "1500"))
+# Most recent followups kept verbatim; older ones are folded into the summary
+FOLLOWUP_VERBATIM_TURNS = int(os.getenv("FOLLOWUP_VERBATIM_TURNS", "3"))
+SUMMARY_MAX_WORDS = 200
+
+SUMMARY_COLLECTION = "DiscussionSummary"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """`text` cut to about `tokens` tokens, with "..." when it was shortened."""
+    limit = max(0, tokens * 4)
+    return text if len(text) <= limit else text[:limit].rstrip() + "..."
+
+
+def render_turn(number: int, turn: FollowupQuestion) -> str:
+    return f"Q{number}: {turn.question}\nA{number}: {turn.response}\n\n"
+
+
+def render_followup_context(history: List[FollowupQuestion], summary: Optional[DiscussionSummary] = None,
+                            budget: int = FOLLOWUP_HISTORY_TOKEN_BUDGET,
+                            max_turns: int = FOLLOWUP_VERBATIM_TURNS,
+                            relevant: Optional[List[FollowupQuestion]] = None) -> str:
+    """
+    Render the summary plus the newest turns not covered by it, newest first
+    until the token budget or `max_turns` is reached. With `relevant`, the
+    turns rendered are those plus the latest one, whether summarized or not.
+    Returns "" without history.
+    """
+    if not history:
+        return ""
+
+    summary_block = ""
+    first_unsummarized = 0
+    if summary is not None and summary.summary:
+        summary_block = f"Summary of the earlier conversation:\n{summary.summary}\n\n"
+        first_unsummarized = min(summary.turns_summarized, len(history))
+
+    remaining = budget - estimate_tokens(summary_block)
+    if relevant is not None:
+        selected = {turn.question_id for turn in relevant} | {history[-1].question_id}
+        window = [(number, turn) for number, turn in enumerate(history, 1) if turn.question_id in selected]
+    else:
+        numbered = list(enumerate(history, 1))[first_unsummarized:]
+        window = numbered[-max_turns:] if max_turns > 0 else []
+    turns = []
+    for number, turn in reversed(window):
+        block = render_turn(number, turn)
+        cost = estimate_tokens(block)
+        if cost > remaining:
+            if not turns and remaining > 0:
+                # Always keep the latest exchange, shortened to what is left
+                turns.append(truncate_to_tokens(block, remaining) + "\n\n")
+            break
+        turns.append(block)
+        remaining -= cost
+
+    if not summary_block and not turns:
+        return ""
+    return "Previous conversation context:\n" + summary_block + "".join(reversed(turns))
+
+
+def _summary_uuid(discussion_id: str) -> str:
+    return generate_uuid5(discussion_id, SUMMARY_COLLECTION)
+
+
+def get_discussion_summary(discussion_id: str, client) -> Optional[DiscussionSummary]:
+    """Load the rolling summary of a discussion, if one was written."""
+    try:
+        if not collection_available(client, SUMMARY_COLLECTION):
+            return None
+        obj = client.collections.get(SUMMARY_COLLECTION).query.fetch_object_by_id(_summary_uuid(discussion_id))
+        if obj is None:
+            return None
+        props = obj.properties
+        return DiscussionSummary(
+            discussion_id=props.get("discussion_id"),
+            summary=props.get("summary") or "",
+            turns_summarized=props.get("turns_summarized") or 0,
+            updated_at=datetime.fromisoformat(props.get("updated_at"))
+        )
+    except Exception as e:
+        logger.error(f"Error getting discussion summary: {e}")
+        return None
+
+
+def store_discussion_summary(summary: DiscussionSummary, client) -> None:
+    """Insert or replace the summary object of a discussion."""
+    ensure_collection(client, SUMMARY_COLLECTION)
+    summary_col = client.collections.get(SUMMARY_COLLECTION)
+    object_uuid = _summary_uuid(summary.discussion_id)
+    properties = {
+        "discussion_id": summary.discussion_id,
+        "summary": summary.summary,
+        "turns_summarized": summary.turns_summarized,
+        "updated_at": summary.updated_at.isoformat()
+    }
+    if summary_col.data.exists(object_uuid):
+        summary_col.data.replace(uuid=object_uuid, properties=properties)
+    else:
+        summary_col.data.insert(properties=properties, uuid=object_uuid)
+
+
+def build_summary_prompt(previous: str, turns: List[FollowupQuestion]) -> str:
+    exchanges = "".join(f"Q: {turn.question}\nA: {turn.response}\n\n" for turn in turns)
+    return (
+        "You maintain a running summary of a tarot reading conversation.\n"
+        f"Current summary:\n{previous or '(empty)'}\n\n"
+        f"New exchanges to fold in:\n{exchanges}"
+        f"Write the updated summary in at most {SUMMARY_MAX_WORDS} words. Keep the user's concerns, "
+        "the guidance already given and any decisions, and answer with the summary text only."
+    )
+
+
+def _extractive_summary(previous: str, turns: List[FollowupQuestion]) -> str:
+    """Fallback when the model is unavailable: first sentence of each answer."""
+    lines = [previous] if previous else []
+    for turn in turns:
+        first_sentence = turn.response.split(". ")[0].strip()
+        lines.append(f"- {turn.question} -> {first_sentence}")
+    words = "\n".join(lines).split(" ")
+    return " ".join(words[-SUMMARY_MAX_WORDS * 2:])
+
+
+def update_discussion_summary(discussion_id: str, history: List[FollowupQuestion], client,
+                              summarize: Callable[[str], str],
+                              keep_turns: int = FOLLOWUP_VERBATIM_TURNS) -> Optional[DiscussionSummary]:
+    """
+    Fold followups that fell out of the verbatim window into the rolling summary.
+    Only the new turns are summarized, together with the previous summary.
+    Returns the stored summary, or the current one if nothing had to change.
+    """
+    current = get_discussion_summary(discussion_id, client) or DiscussionSummary(discussion_id=discussion_id)
+    fold_until = len(history) - keep_turns
+    if fold_until <= current.turns_summarized:
+        return current
+
+    new_turns = history[current.turns_summarized:fold_until]
+    try:
+        text = summarize(build_summary_prompt(current.summary, new_turns)).strip()
+    except Exception as e:
+        logger.warning(f"Summary generation failed for {discussion_id}, using extractive summary: {e}")
+        text = ""
+    if not text:
+        text = _extractive_summary(current.summary, new_turns)
+
+    updated = DiscussionSummary(
+        discussion_id=discussion_id,
+        summary=text,
+        turns_summarized=fold_until,
+        updated_at=datetime.now()
+    )
+    store_discussion_summary(updated, client)
+    logger.info(f"Discussion {discussion_id} summary now covers {fold_until} followups")
+    return updated
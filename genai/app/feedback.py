@@ -8,13 +8,16 @@ import os
 import sys
 from typing import List, Dict, Optional
 import weaviate
+from weaviate.classes.query import Filter
 
 # Add the server directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Local imports
-from app.weaviate_client import get_weaviate_client
+from app.weaviate_client import get_shared_weaviate_client
 from app.models import Feedback, KeywordMeaning, TarotCard, CardLayout
+from app.card_codec import encode_cards
+from app.outbox import write_object
 from app.logger_config import get_tarot_logger
 from datetime import datetime
 
@@ -26,8 +29,9 @@ class FeedbackProcessor:
     Processes user feedback and updates KeywordMeaning data based on accuracy ratings.
     """
     
-    def __init__(self):
-        self.client = get_weaviate_client()
+    def __init__(self, client=None):
+        # Reuse the process-wide connection unless a client is injected
+        self.client = client or get_shared_weaviate_client()
         self.high_rating_threshold = 4  # Ratings of 4/5 or above are considered high
         
     def process_feedback(self, feedback: Feedback) -> Dict[str, str]:
@@ -90,16 +94,16 @@ class FeedbackProcessor:
                 "rating": feedback.rating,
                 "discussion_id": feedback.discussion_id,
                 "timestamp": datetime.now().isoformat(),
-                "cards_drawn": json.dumps([card.model_dump() for card in feedback.spread])
+                "cards": encode_cards(feedback.spread)
             }
             
-            # Store in Weaviate
-            result = self.client.collections.get("Feedback").data.insert(feedback_data)
+            # Spool for Weaviate; the ID is assigned up front
+            feedback_id = write_object(self.client, "Feedback", feedback_data)
             
             logger.info(f"Feedback stored successfully for user {feedback.user_id}")
             return {
                 "status": "success",
-                "feedback_id": str(result)
+                "feedback_id": feedback_id
             }
             
         except Exception as e:
@@ -211,10 +215,10 @@ class FeedbackProcessor:
         """
         try:
             collection = self.client.collections.get("KeywordMeaning")
-            # Use Weaviate's where filter for efficient search
-            where_filter = collection.query.Filter.by_property("card_name").equal(card_name) & \
-                           collection.query.Filter.by_property("keyword").equal(keyword)
-            result = collection.query.fetch_objects(where=where_filter, limit=10)
+            # Use Weaviate's filter for efficient search
+            where_filter = Filter.by_property("card_name").equal(card_name) & \
+                           Filter.by_property("keyword").equal(keyword)
+            result = collection.query.fetch_objects(filters=where_filter, limit=10)
             # Return both properties and uuid/object id for update
             return [{"properties": obj.properties, "uuid": obj.uuid} for obj in result.objects]
         except Exception as e:
@@ -325,8 +329,7 @@ class FeedbackProcessor:
             }
             
             # Store in ReadingContext collection
-            collection = self.client.collections.get("ReadingContext")
-            result = collection.data.insert(reading_context)
+            write_object(self.client, "ReadingContext", reading_context)
             
             logger.info(f"Stored reading context for question: {feedback.question[:50]}...")
             
@@ -378,10 +381,11 @@ class FeedbackProcessor:
             # Get all feedback (simplified approach with better error handling)
             try:
                 if user_id:
-                    # For user-specific stats, we'll need to filter manually
-                    result = collection.query.fetch_objects(limit=1000)
-                    # Filter manually
-                    filtered_objects = [obj for obj in result.objects if obj.properties.get("user_id") == user_id]
+                    result = collection.query.fetch_objects(
+                        filters=Filter.by_property("user_id").equal(user_id),
+                        limit=1000
+                    )
+                    filtered_objects = result.objects
                     total_feedback = len(filtered_objects)
                     ratings = [obj.properties.get("rating", 0) for obj in filtered_objects if obj.properties.get("rating")]
                 else:
@@ -542,11 +546,7 @@ def process_user_feedback(feedback: Feedback) -> Dict[str, str]:
         Processing result dictionary
     """
     processor = FeedbackProcessor()
-    try:
-        return processor.process_feedback(feedback)
-    finally:
-        if hasattr(processor, 'client') and processor.client:
-            processor.client.close()
+    return processor.process_feedback(feedback)
 
 def get_feedback_stats(user_id: Optional[str] = None) -> Dict:
     """
@@ -559,8 +559,4 @@ def get_feedback_stats(user_id: Optional[str] = None) -> Dict:
         Statistics dictionary
     """
     processor = FeedbackProcessor()
-    try:
-        return processor.get_feedback_statistics(user_id)
-    finally:
-        if hasattr(processor, 'client') and processor.client:
-            processor.client.close()
+    return processor.get_feedback_statistics(user_id)
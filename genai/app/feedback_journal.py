@@ -0,0 +1,259 @@
+"""
+Append-only JSONL journal for quick user feedback.
+
+Each entry is one JSON line appended to the current segment
+`feedback-YYYYMMDD[.N].jsonl`. Writes go through a descriptor opened with
+O_APPEND and are wrapped in an exclusive `flock`, so several worker
+processes can share the directory without losing or interleaving lines,
+and a write costs the same however large the journal is. `fsync` is batched:
+it runs every `FEEDBACK_JOURNAL_FSYNC_BATCH` entries and otherwise at most
+`FEEDBACK_JOURNAL_FSYNC_INTERVAL` seconds after a write.
+
+Segments roll over at midnight and when they exceed
+`FEEDBACK_JOURNAL_MAX_BYTES`. `compact()` merges the segments of past days
+into one gzip file per day, and `read()` streams entries back from all
+segments in order.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import re
+import threading
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from app.logger_config import get_tarot_logger
+from app.metrics import metrics
+
+logger = get_tarot_logger(__name__)
+
+FEEDBACK_JOURNAL_DIR = os.getenv(
+    "FEEDBACK_JOURNAL_DIR", os.path.join(os.path.dirname(__file__), "feedback_journal")
+)
+FEEDBACK_JOURNAL_MAX_BYTES = int(os.getenv("FEEDBACK_JOURNAL_MAX_BYTES", str(64 * 1024 * 1024)))
+FEEDBACK_JOURNAL_FSYNC_INTERVAL = float(os.getenv("FEEDBACK_JOURNAL_FSYNC_INTERVAL", "1.0"))
+FEEDBACK_JOURNAL_FSYNC_BATCH = int(os.getenv("FEEDBACK_JOURNAL_FSYNC_BATCH", "64"))
+FEEDBACK_JOURNAL_COMPACT_INTERVAL = float(os.getenv("FEEDBACK_JOURNAL_COMPACT_INTERVAL", "3600"))
+
+_SEGMENT = re.compile(r"^feedback-(\d{8})(?:\.(\d+))?\.jsonl(\.gz)?$")
+
+
+def _segment_sort_key(name: str) -> Tuple[str, int]:
+    match = _SEGMENT.match(name)
+    # A compacted day file sorts before any segment written to that day afterwards
+    return match.group(1), -1 if match.group(3) else int(match.group(2) or 0)
+
+
+class FeedbackJournal:
+    """
+    Process- and thread-safe appender plus reader for the feedback journal.
+    """
+
+    def __init__(self, directory: str = FEEDBACK_JOURNAL_DIR, max_bytes: int = FEEDBACK_JOURNAL_MAX_BYTES,
+                 fsync_interval: float = FEEDBACK_JOURNAL_FSYNC_INTERVAL,
+                 fsync_batch: int = FEEDBACK_JOURNAL_FSYNC_BATCH):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        self._fd: Optional[int] = None
+        self._path: Optional[str] = None
+        self._day: Optional[str] = None
+        self._unsynced = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._sync_thread: Optional[threading.Thread] = None
+
+    def append(self, entry: dict) -> None:
+        """Append one entry. Constant time regardless of the journal size."""
+        line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+        with self._lock:
+            fd = self._writable_fd(len(line))
+            _lock_file(fd)
+            try:
+                os.write(fd, line)
+            finally:
+                _unlock_file(fd)
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_batch:
+                self._sync_locked()
+            else:
+                self._ensure_sync_thread()
+        metrics.increment("feedback_journal.appends")
+
+    def flush(self) -> None:
+        """fsync everything appended so far."""
+        with self._lock:
+            self._sync_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._sync_locked()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = self._path = self._day = None
+        self._wakeup.set()
+
+    def segments(self) -> List[str]:
+        """Paths of all segments, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        names = [name for name in os.listdir(self.directory) if _SEGMENT.match(name)]
+        return [os.path.join(self.directory, name) for name in sorted(names, key=_segment_sort_key)]
+
+    def read(self, since: Optional[date] = None) -> Iterator[dict]:
+        """
+        Stream entries back in write order, optionally starting at a given day.
+        A truncated last line (crash during a write) is skipped.
+        """
+        for path in self.segments():
+            day = _SEGMENT.match(os.path.basename(path)).group(1)
+            if since is not None and day < since.strftime("%Y%m%d"):
+                continue
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping corrupt feedback journal line in {path}")
+
+    def compact(self, today: Optional[date] = None) -> List[str]:
+        """
+        Merge the segments of every day before `today` into one gzip file per
+        day and remove them. Segments of the current day are never touched,
+        since other processes may still be appending to them.
+        Returns the paths of the files written.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        lock_fd = os.open(os.path.join(self.directory, ".compact.lock"), os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            if not _try_lock_file(lock_fd):
+                logger.info("Feedback journal compaction already running in another process")
+                return []
+            return self._compact_locked((today or date.today()).strftime("%Y%m%d"))
+        finally:
+            os.close(lock_fd)
+
+    def _compact_locked(self, cutoff: str) -> List[str]:
+        by_day = {}
+        for path in self.segments():
+            match = _SEGMENT.match(os.path.basename(path))
+            if match.group(1) < cutoff:
+                by_day.setdefault(match.group(1), []).append(path)
+
+        written = []
+        for day, paths in sorted(by_day.items()):
+            if len(paths) == 1 and paths[0].endswith(".gz"):
+                continue
+            target = os.path.join(self.directory, f"feedback-{day}.jsonl.gz")
+            tmp = f"{target}.{os.getpid()}.tmp"
+            with gzip.open(tmp, "wb") as out:
+                for path in paths:
+                    opener = gzip.open if path.endswith(".gz") else open
+                    with opener(path, "rb") as f:
+                        for line in f:
+                            if line.strip():
+                                out.write(line if line.endswith(b"\n") else line + b"\n")
+            os.replace(tmp, target)
+            for path in paths:
+                if path != target:
+                    os.remove(path)
+            written.append(target)
+            logger.info(f"Compacted {len(paths)} feedback journal segments into {target}")
+        return written
+
+    def _writable_fd(self, incoming: int) -> int:
+        day = datetime.now().strftime("%Y%m%d")
+        if self._fd is not None and day == self._day:
+            if os.fstat(self._fd).st_size + incoming <= self.max_bytes:
+                return self._fd
+        # Day changed, segment full (possibly by another process) or first write
+        self._sync_locked()
+        if self._fd is not None:
+            os.close(self._fd)
+        os.makedirs(self.directory, exist_ok=True)
+        self._day = day
+        self._path = self._next_segment_path(day, incoming)
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _next_segment_path(self, day: str, incoming: int) -> str:
+        index = 0
+        while True:
+            name = f"feedback-{day}.jsonl" if index == 0 else f"feedback-{day}.{index}.jsonl"
+            path = os.path.join(self.directory, name)
+            if not os.path.exists(path) or os.path.getsize(path) + incoming <= self.max_bytes:
+                return path
+            index += 1
+
+    def _sync_locked(self) -> None:
+        if self._fd is not None and self._unsynced:
+            os.fsync(self._fd)
+            self._unsynced = 0
+
+    def _ensure_sync_thread(self) -> None:
+        if self._sync_thread is None or not self._sync_thread.is_alive():
+            self._closed = False
+            self._wakeup.clear()
+            self._sync_thread = threading.Thread(target=self._sync_loop, name="feedback-journal-fsync", daemon=True)
+            self._sync_thread.start()
+
+    def _sync_loop(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.fsync_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Feedback journal fsync failed: {e}")
+
+
+def _lock_file(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def _try_lock_file(fd: int) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _unlock_file(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+_journal = FeedbackJournal()
+
+
+def get_feedback_journal() -> FeedbackJournal:
+    """Return the process-wide feedback journal."""
+    return _journal
+
+
+async def run_compaction_scheduler(interval: float = FEEDBACK_JOURNAL_COMPACT_INTERVAL) -> None:
+    """Background task: compact past days of the journal every `interval` seconds."""
+    while True:
+        try:
+            await asyncio.to_thread(_journal.compact)
+        except Exception as e:
+            logger.error(f"Feedback journal compaction failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,143 @@
+"""
+Process-wide Gemini generation runtime.
+
+Holds one `genai.Client` backed by persistent keep-alive HTTP pools (sync and
+async) and the precompiled `GenerateContentConfig` built from
+`gemini_config.json`. The config file is re-checked at most every
+`GEMINI_CONFIG_CHECK_INTERVAL` seconds and atomically swapped when its mtime
+changes, so generation settings can be tuned without restarting workers.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+import httpx
+from google import genai
+from google.genai import types
+
+from app.logger_config import get_tarot_logger
+
+logger = get_tarot_logger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "gemini_config.json")
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+GEMINI_CONFIG_CHECK_INTERVAL = float(os.getenv("GEMINI_CONFIG_CHECK_INTERVAL", "5"))
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "20"))
+GEMINI_KEEPALIVE_EXPIRY = float(os.getenv("GEMINI_KEEPALIVE_EXPIRY", "60"))
+
+
+def build_generation_config(cfg: dict) -> types.GenerateContentConfig:
+    """Build the request config from the parsed gemini_config.json content."""
+    safe_cfg = [types.SafetySetting(**s) for s in cfg.get("safety_settings", [])]
+
+    return types.GenerateContentConfig(
+        **cfg.get("generation_config", {}),
+        safety_settings=safe_cfg,
+        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True)
+    )
+
+
+class GeminiRuntime:
+    """
+    Shared Gemini client plus hot-reloadable generation config.
+    """
+
+    def __init__(self, config_path: str = DEFAULT_CONFIG_PATH,
+                 check_interval: float = GEMINI_CONFIG_CHECK_INTERVAL):
+        self.config_path = config_path
+        self.check_interval = check_interval
+        self._client: Optional[genai.Client] = None
+        self._httpx_client: Optional[httpx.Client] = None
+        self._httpx_async_client: Optional[httpx.AsyncClient] = None
+        self._config: Optional[types.GenerateContentConfig] = None
+        self._config_mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> genai.Client:
+        """Return the shared client, creating it (and its HTTP pools) on first use."""
+        client = self._client
+        if client is not None:
+            return client
+        with self._lock:
+            if self._client is None:
+                limits = httpx.Limits(
+                    max_connections=GEMINI_MAX_CONNECTIONS,
+                    max_keepalive_connections=GEMINI_MAX_CONNECTIONS,
+                    keepalive_expiry=GEMINI_KEEPALIVE_EXPIRY,
+                )
+                self._httpx_client = httpx.Client(limits=limits)
+                self._httpx_async_client = httpx.AsyncClient(limits=limits)
+                self._client = genai.Client(
+                    api_key=os.getenv("GEMINI_API_KEY"),
+                    http_options=types.HttpOptions(
+                        httpx_client=self._httpx_client,
+                        httpx_async_client=self._httpx_async_client,
+                    ),
+                )
+                logger.info("Created shared Gemini client")
+            return self._client
+
+    def generation_config(self) -> types.GenerateContentConfig:
+        """
+        Return the precompiled config, reloading it if the file changed.
+        The first load raises on a missing or invalid file; later reload
+        failures keep serving the previous config.
+        """
+        config = self._config
+        if config is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return config
+
+        with self._lock:
+            if self._config is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._config
+
+            try:
+                mtime = os.stat(self.config_path).st_mtime
+                if self._config is None or mtime != self._config_mtime:
+                    self._config = self._load_config()
+                    self._config_mtime = mtime
+                    logger.info(f"Loaded Gemini generation config from {self.config_path}")
+            except Exception as e:
+                if self._config is None:
+                    raise
+                logger.error(f"Failed to reload Gemini config, keeping previous version: {e}")
+
+            self._checked_at = time.monotonic()
+            return self._config
+
+    def reload_config(self) -> types.GenerateContentConfig:
+        """Force a reload of the config file on the next access and return it."""
+        with self._lock:
+            self._config_mtime = None
+            self._checked_at = 0.0
+        return self.generation_config()
+
+    def _load_config(self) -> types.GenerateContentConfig:
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+        return build_generation_config(cfg)
+
+    async def aclose(self) -> None:
+        """Close the HTTP pools (called from the server lifespan on shutdown)."""
+        with self._lock:
+            httpx_client, httpx_async_client = self._httpx_client, self._httpx_async_client
+            self._client = self._httpx_client = self._httpx_async_client = None
+        if httpx_async_client is not None:
+            await httpx_async_client.aclose()
+        if httpx_client is not None:
+            httpx_client.close()
+
+
+_runtime = GeminiRuntime()
+
+
+def get_gemini_runtime() -> GeminiRuntime:
+    """Return the process-wide Gemini runtime."""
+    return _runtime
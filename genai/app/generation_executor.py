@@ -0,0 +1,289 @@
+"""
+Deadline-aware execution of Gemini generation calls.
+
+Every call runs under an overall deadline (`GEMINI_DEADLINE`) and each
+attempt under a per-attempt timeout (`GEMINI_ATTEMPT_TIMEOUT`, passed down
+to the HTTP request so the connection is really abandoned). Retryable
+failures (timeouts, transport errors, 408/429/5xx) are retried with jittered
+exponential backoff while the deadline allows, at most `GEMINI_MAX_RETRIES`
+times per call, and only while the shared `RetryBudget` has tokens: each call
+earns `GEMINI_RETRY_BUDGET_RATIO` tokens and each retry or hedge spends one,
+so an upstream outage cannot multiply our load on it.
+
+With `GEMINI_HEDGE_ENABLED`, an attempt that has not returned after the
+observed p95 attempt latency gets a second, identical request, and whichever
+finishes first wins. Hedges spend retry budget as well.
+
+Metrics: `gemini.attempts`, `gemini.retries`, `gemini.hedges`,
+`gemini.hedge_wins`, `gemini.timeouts`, `gemini.retry_budget_exhausted`
+(counters), `gemini.attempt` / `gemini.call` (timings) and
+`gemini.retry_budget_tokens` (gauge).
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+from google.genai import errors
+
+from app.logger_config import get_tarot_logger
+from app.metrics import metrics
+
+logger = get_tarot_logger(__name__)
+
+T = TypeVar("T")
+
+GEMINI_DEADLINE = float(os.getenv("GEMINI_DEADLINE", "45"))
+GEMINI_ATTEMPT_TIMEOUT = float(os.getenv("GEMINI_ATTEMPT_TIMEOUT", "20"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+GEMINI_RETRY_BASE_DELAY = float(os.getenv("GEMINI_RETRY_BASE_DELAY", "0.5"))
+GEMINI_RETRY_BUDGET_RATIO = float(os.getenv("GEMINI_RETRY_BUDGET_RATIO", "0.1"))
+GEMINI_HEDGE_ENABLED = os.getenv("GEMINI_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+GEMINI_HEDGE_PERCENTILE = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "95"))
+
+# Hedging waits for this many latency samples before trusting the percentile
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.2
+RETRY_BUDGET_MAX_TOKENS = 20.0
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+ATTEMPT_METRIC = "gemini.attempt"
+
+
+class GenerationTimeout(TimeoutError):
+    """The call did not complete before its deadline."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return False
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries and hedges to a fraction of all calls.
+    """
+
+    def __init__(self, ratio: float = GEMINI_RETRY_BUDGET_RATIO, max_tokens: float = RETRY_BUDGET_MAX_TOKENS):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def record_call(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+            tokens = self._tokens
+        metrics.set_gauge("gemini.retry_budget_tokens", tokens)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                allowed = False
+            else:
+                self._tokens -= 1
+                allowed = True
+            tokens = self._tokens
+        metrics.set_gauge("gemini.retry_budget_tokens", tokens)
+        if not allowed:
+            metrics.increment("gemini.retry_budget_exhausted")
+        return allowed
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            return self._tokens
+
+
+class GenerationExecutor:
+    """
+    Runs `attempt(timeout_seconds)` callables with deadline, retries and hedging.
+    """
+
+    def __init__(self, deadline: float = GEMINI_DEADLINE, attempt_timeout: float = GEMINI_ATTEMPT_TIMEOUT,
+                 max_retries: int = GEMINI_MAX_RETRIES, base_delay: float = GEMINI_RETRY_BASE_DELAY,
+                 budget: Optional[RetryBudget] = None, hedge: bool = GEMINI_HEDGE_ENABLED,
+                 hedge_percentile: float = GEMINI_HEDGE_PERCENTILE):
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.budget = budget or RetryBudget()
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging an attempt, or None to not hedge."""
+        if not self.hedge:
+            return None
+        if metrics.count(ATTEMPT_METRIC) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, metrics.percentile(ATTEMPT_METRIC, self.hedge_percentile))
+
+    def run(self, attempt: Callable[[float], T]) -> T:
+        """Blocking variant, for worker threads and scripts."""
+        self.budget.record_call()
+        started = time.monotonic()
+        deadline = started + self.deadline
+        retries = 0
+        try:
+            while True:
+                timeout = self._attempt_timeout(deadline)
+                try:
+                    return self._attempt_sync(attempt, timeout, deadline)
+                except Exception as e:
+                    delay = self._retry_delay(e, retries, deadline)
+                    if delay is None:
+                        raise self._final_error(e)
+                    retries += 1
+                    time.sleep(delay)
+        finally:
+            metrics.observe("gemini.call", time.monotonic() - started)
+
+    async def run_async(self, attempt: Callable[[float], Awaitable[T]]) -> T:
+        """Non-blocking variant for the event loop."""
+        self.budget.record_call()
+        started = time.monotonic()
+        deadline = started + self.deadline
+        retries = 0
+        try:
+            while True:
+                timeout = self._attempt_timeout(deadline)
+                try:
+                    return await self._attempt_async(attempt, timeout, deadline)
+                except Exception as e:
+                    delay = self._retry_delay(e, retries, deadline)
+                    if delay is None:
+                        raise self._final_error(e)
+                    retries += 1
+                    await asyncio.sleep(delay)
+        finally:
+            metrics.observe("gemini.call", time.monotonic() - started)
+
+    def _attempt_timeout(self, deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            metrics.increment("gemini.timeouts")
+            raise GenerationTimeout(f"Gemini call exceeded its {self.deadline:.1f}s deadline")
+        return min(self.attempt_timeout, remaining)
+
+    def _retry_delay(self, error: Exception, retries: int, deadline: float) -> Optional[float]:
+        """Backoff before the next attempt, or None if the error must be raised."""
+        if isinstance(error, (TimeoutError, asyncio.TimeoutError, httpx.TimeoutException)):
+            metrics.increment("gemini.timeouts")
+        if not is_retryable(error) or retries >= self.max_retries:
+            return None
+        delay = random.uniform(0, self.base_delay * (2 ** retries))
+        if time.monotonic() + delay >= deadline or not self.budget.try_spend():
+            return None
+        metrics.increment("gemini.retries")
+        logger.warning(f"Retrying Gemini call in {delay:.2f}s after: {error}")
+        return delay
+
+    def _final_error(self, error: Exception) -> Exception:
+        if isinstance(error, (asyncio.TimeoutError, concurrent.futures.TimeoutError)) \
+                and not isinstance(error, GenerationTimeout):
+            return GenerationTimeout(f"Gemini call timed out: {error}")
+        return error
+
+    async def _attempt_async(self, attempt: Callable[[float], Awaitable[T]], timeout: float, deadline: float) -> T:
+        hedge_delay = self.hedge_delay()
+        primary = asyncio.ensure_future(self._timed_async(attempt, timeout))
+        if hedge_delay is None or hedge_delay >= timeout:
+            return await primary
+
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+            if done:
+                return primary.result()
+            if self.budget.try_spend():
+                metrics.increment("gemini.hedges")
+                hedge = asyncio.ensure_future(self._timed_async(attempt, min(timeout, deadline - time.monotonic())))
+                pending.add(hedge)
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            metrics.increment("gemini.hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _timed_async(self, attempt: Callable[[float], Awaitable[T]], timeout: float) -> T:
+        metrics.increment("gemini.attempts")
+        started = time.monotonic()
+        result = await asyncio.wait_for(attempt(timeout), timeout)
+        metrics.observe(ATTEMPT_METRIC, time.monotonic() - started)
+        return result
+
+    def _attempt_sync(self, attempt: Callable[[float], T], timeout: float, deadline: float) -> T:
+        hedge_delay = self.hedge_delay()
+        if hedge_delay is None or hedge_delay >= timeout:
+            # The timeout is enforced by the HTTP request itself
+            return self._timed_sync(attempt, timeout)
+
+        pool = self._hedge_pool()
+        primary = pool.submit(self._timed_sync, attempt, timeout)
+        done, _ = concurrent.futures.wait([primary], timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        futures = [primary]
+        if self.budget.try_spend():
+            metrics.increment("gemini.hedges")
+            futures.append(pool.submit(self._timed_sync, attempt, min(timeout, deadline - time.monotonic())))
+
+        error = None
+        pending = set(futures)
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, timeout=max(0.0, deadline - time.monotonic()),
+                return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            if not done:
+                raise GenerationTimeout(f"Gemini call exceeded its {self.deadline:.1f}s deadline")
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        metrics.increment("gemini.hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _timed_sync(self, attempt: Callable[[float], T], timeout: float) -> T:
+        metrics.increment("gemini.attempts")
+        started = time.monotonic()
+        result = attempt(timeout)
+        metrics.observe(ATTEMPT_METRIC, time.monotonic() - started)
+        return result
+
+    def _hedge_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix="gemini-hedge")
+            return self._pool
+
+
+_executor = GenerationExecutor()
+
+
+def get_generation_executor() -> GenerationExecutor:
+    """Return the process-wide generation executor."""
+    return _executor
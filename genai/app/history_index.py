@@ -0,0 +1,165 @@
+"""
+Relevance-based retrieval of earlier followups.
+
+Every followup is embedded when it is stored (question and answer together)
+and the vector travels with the `FollowupQuestion` object into Weaviate. When
+a new followup is asked, the question is embedded and the `HISTORY_TOP_K`
+most similar earlier turns of the same discussion are looked up with a
+`near_vector` query, so the prompt carries those turns plus the most recent
+one instead of a window that grows with the discussion.
+
+With `HISTORY_INDEX_BACKEND=local` the vectors are kept in an in-process
+index instead and ranked by cosine similarity, for running without Weaviate.
+Whenever embedding or the lookup fails, retrieval returns None and callers
+fall back to the most recent turns.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from weaviate.classes.query import Filter
+
+from app.models import FollowupQuestion
+from app.logger_config import get_tarot_logger
+from app.metrics import metrics
+from app.reading_cache import cosine_similarity, embed_question
+from app.schema import collection_available
+
+logger = get_tarot_logger(__name__)
+
+HISTORY_INDEX_BACKEND = os.getenv("HISTORY_INDEX_BACKEND", "weaviate").lower()
+HISTORY_TOP_K = int(os.getenv("HISTORY_TOP_K", "3"))
+# Vectors kept by the local index, oldest dropped first
+HISTORY_LOCAL_INDEX_SIZE = int(os.getenv("HISTORY_LOCAL_INDEX_SIZE", "10000"))
+# Characters of a turn that are embedded
+EMBED_MAX_CHARS = 2000
+
+FOLLOWUP_COLLECTION = "FollowupQuestion"
+
+
+def turn_text(turn: FollowupQuestion) -> str:
+    return f"Q: {turn.question}\nA: {turn.response}"[:EMBED_MAX_CHARS]
+
+
+class HistoryIndex:
+    """
+    Embeds followups and finds the earlier turns most relevant to a question.
+    """
+
+    def __init__(self, backend: str = HISTORY_INDEX_BACKEND, top_k: int = HISTORY_TOP_K,
+                 embedder: Callable[[str], List[float]] = embed_question,
+                 local_size: int = HISTORY_LOCAL_INDEX_SIZE):
+        self.backend = backend
+        self.top_k = top_k
+        self.local_size = local_size
+        self._embedder = embedder
+        self._vectors: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed_turn(self, turn: FollowupQuestion) -> Optional[List[float]]:
+        """
+        Vector of a followup about to be stored, or None if embedding failed
+        (the turn then only shows up as the most recent one).
+        """
+        vector = self._embed(turn_text(turn))
+        if vector is not None:
+            self._remember(turn.question_id, vector)
+        return vector
+
+    def relevant_turns(self, question: str, history: List[FollowupQuestion],
+                       client=None) -> Optional[List[FollowupQuestion]]:
+        """
+        The earlier turns (all but the most recent one) most relevant to
+        `question`, in chronological order. Returns None when retrieval is
+        unavailable, in which case callers use the most recent turns.
+        """
+        earlier = history[:-1]
+        if len(earlier) <= self.top_k:
+            # Everything fits, nothing to rank
+            return list(earlier)
+
+        started = time.perf_counter()
+        query = self._embed(question)
+        if query is None:
+            return None
+        try:
+            if self.backend == "local":
+                selected = self._rank_local(query, earlier)
+            else:
+                selected = self._rank_weaviate(query, earlier, client)
+        except Exception as e:
+            metrics.increment("history.retrieval_errors")
+            logger.warning(f"History retrieval failed, using the most recent turns: {e}")
+            return None
+        metrics.observe("history.retrieval", time.perf_counter() - started)
+        if not selected:
+            return None
+        return [turn for turn in earlier if turn.question_id in selected]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors.clear()
+
+    def _rank_weaviate(self, query: List[float], earlier: List[FollowupQuestion], client) -> set:
+        if client is None or not collection_available(client, FOLLOWUP_COLLECTION):
+            return set()
+        discussion_id = earlier[0].discussion_id
+        candidates = {turn.question_id for turn in earlier}
+        # One extra hit in case the most recent turn is among the closest
+        response = client.collections.get(FOLLOWUP_COLLECTION).query.near_vector(
+            near_vector=query,
+            limit=self.top_k + 1,
+            filters=Filter.by_property("discussion_id").equal(discussion_id),
+            return_properties=["question_id"]
+        )
+        hits = [obj.properties.get("question_id") for obj in response.objects]
+        return set([question_id for question_id in hits if question_id in candidates][:self.top_k])
+
+    def _rank_local(self, query: List[float], earlier: List[FollowupQuestion]) -> set:
+        scored = []
+        for turn in earlier:
+            vector = self._local_vector(turn)
+            if vector is not None:
+                scored.append((cosine_similarity(query, vector), turn.question_id))
+        scored.sort(reverse=True)
+        return {question_id for _, question_id in scored[:self.top_k]}
+
+    def _local_vector(self, turn: FollowupQuestion) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._vectors.get(turn.question_id)
+            if vector is not None:
+                self._vectors.move_to_end(turn.question_id)
+                return vector
+        # Turns stored by another worker or before a restart are embedded on first use
+        vector = self._embed(turn_text(turn))
+        if vector is not None:
+            self._remember(turn.question_id, vector)
+        return vector
+
+    def _remember(self, question_id: str, vector: List[float]) -> None:
+        if self.backend != "local":
+            return
+        with self._lock:
+            self._vectors[question_id] = vector
+            self._vectors.move_to_end(question_id)
+            while len(self._vectors) > self.local_size:
+                self._vectors.popitem(last=False)
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        try:
+            return self._embedder(text)
+        except Exception as e:
+            metrics.increment("history.embed_errors")
+            logger.warning(f"Embedding failed: {e}")
+            return None
+
+
+_history_index = HistoryIndex()
+
+
+def get_history_index() -> HistoryIndex:
+    """Return the process-wide followup history index."""
+    return _history_index
@@ -1,16 +1,17 @@
 # Standard library imports
+import asyncio
 import os
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Sequence
 
 # Third-party imports
 from dotenv import load_dotenv
 
 # Local imports
-from app.rag_engine import call_gemini_api, build_tarot_prompt, fetch_full_deck
+from app.rag_engine import generate_reading, generate_reading_async, fetch_full_deck
+from app.daily_reading import get_daily_reading, get_daily_reading_async
 from app.models import TarotCard, CardLayout
-from app.card_engine import layout_three_card
+from app.card_engine import THREE_CARD, draw_spreads, layout_three_card
 from app.logger_config import get_tarot_logger
-from app.weaviate_client import get_weaviate_client
 
 # Setup logger
 logger = get_tarot_logger(__name__)
@@ -22,35 +23,31 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise RuntimeError("Missing GEMINI_API_KEY in environment")
 
-client = get_weaviate_client()
-
-print("Weaviate is ready:", client.is_ready())
+# Concurrent Gemini calls per batch request
+READINGS_BATCH_CONCURRENCY = int(os.getenv("READINGS_BATCH_CONCURRENCY", "8"))
 
 
 def generate_daily_reading(user_id: Optional[str] = None) -> dict:
     """
     Generate a daily reading - standalone function for external import.
     This function can be imported by other modules.
+    The cards are seeded by (user_id, date) and the reading is generated once
+    per day, later calls are served from the daily reading store.
     """
     logger.info(f"Generating daily reading for user: {user_id or 'anonymous'}")
     try:
-        deck = fetch_full_deck()
-        if not deck:
-            raise Exception("Failed to fetch tarot deck")
-            
-        picks = layout_three_card(deck)
-        
-        question = "What guidance do I need for today?"
-        prompt = build_tarot_prompt(question, picks)
-        answer = call_gemini_api(prompt)
+        return get_daily_reading(user_id)
+    except Exception as e:
+        raise Exception(f"Failed to generate daily reading: {str(e)}")
 
-        return {
-            "reading_type": "daily_three_card",
-            "question": question,
-            "cards": picks,
-            "answer": answer,
-            "user_id": user_id
-        }
+async def generate_daily_reading_async(user_id: Optional[str] = None) -> dict:
+    """
+    Async variant of `generate_daily_reading` that awaits Gemini without
+    blocking the event loop.
+    """
+    logger.info(f"Generating daily reading for user: {user_id or 'anonymous'}")
+    try:
+        return await get_daily_reading_async(user_id)
     except Exception as e:
         raise Exception(f"Failed to generate daily reading: {str(e)}")
 
@@ -62,8 +59,7 @@ def generate_ask_reading(question: str, user_id: Optional[str] = None) -> dict:
     try:
         deck = fetch_full_deck()
         picks = layout_three_card(deck)
-        prompt = build_tarot_prompt(question, picks)
-        answer = call_gemini_api(prompt)
+        answer = generate_reading(question, picks)
         
         return {
             "question": question,
@@ -72,4 +68,45 @@ def generate_ask_reading(question: str, user_id: Optional[str] = None) -> dict:
             "user_id": user_id
         }
     except Exception as e:
-        raise Exception(f"Failed to generate ask reading: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Failed to generate ask reading: {str(e)}")
+
+async def generate_batch_readings(
+    items: Sequence[dict],
+    deck: Optional[Sequence[TarotCard]] = None,
+    concurrency: int = READINGS_BATCH_CONCURRENCY
+) -> AsyncIterator[dict]:
+    """
+    Generate many readings at once and yield them in completion order.
+    Each item is a dict with `question` and optional `id`/`user_id`. The deck
+    is fetched once, every spread is drawn up front and the Gemini calls are
+    fanned out under a semaphore of `concurrency`. A failing item yields a
+    result with an `error` field instead of aborting the batch.
+    """
+    if deck is None:
+        deck = await asyncio.to_thread(fetch_full_deck)
+    if not deck:
+        raise Exception("Failed to fetch tarot deck")
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    spreads = draw_spreads(deck, THREE_CARD, len(items))
+
+    async def run(index: int, item: dict, picks: List[CardLayout]) -> dict:
+        result = {"index": index, "id": item.get("id"), "question": item["question"], "user_id": item.get("user_id")}
+        try:
+            async with semaphore:
+                answer = await generate_reading_async(item["question"], picks)
+            result.update(cards=[card.model_dump() for card in picks], answer=answer)
+        except Exception as e:
+            logger.error(f"Batch reading {index} failed: {e}")
+            result["error"] = str(e)
+        return result
+
+    tasks = [asyncio.ensure_future(run(i, item, picks)) for i, (item, picks) in enumerate(zip(items, spreads))]
+    logger.info(f"Generating batch of {len(tasks)} readings with concurrency {concurrency}")
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away or the consumer stopped early: drop the remaining work
+        for task in tasks:
+            task.cancel()
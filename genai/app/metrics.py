@@ -0,0 +1,95 @@
+"""
+Lightweight in-process metrics for TarotAI.
+
+Counters and timing samples are kept in memory per worker process and exposed
+through the `/metrics` endpoint as JSON.
+"""
+
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict
+
+# Number of most recent samples kept per timing series
+TIMING_WINDOW = 1000
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of counters, gauges and timing samples.
+    """
+
+    def __init__(self, window: int = TIMING_WINDOW):
+        self._window = window
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increase a counter."""
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a point-in-time value (queue depth, lag, ...)."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration sample in seconds."""
+        with self._lock:
+            samples = self._timings.get(name)
+            if samples is None:
+                samples = self._timings[name] = deque(maxlen=self._window)
+            samples.append(seconds)
+
+    def count(self, name: str) -> int:
+        """Number of samples currently kept for a timing series."""
+        with self._lock:
+            return len(self._timings.get(name, ()))
+
+    def percentile(self, name: str, pct: float) -> float:
+        """Return the given percentile (0-100) of a timing series, or 0.0 if empty."""
+        with self._lock:
+            samples = sorted(self._timings.get(name, ()))
+        return _percentile(samples, pct)
+
+    def snapshot(self) -> dict:
+        """Return all metrics as a JSON-serializable dict."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            timings = {name: sorted(samples) for name, samples in self._timings.items()}
+
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "timings": {
+                name: {
+                    "count": len(samples),
+                    "avg_ms": round(sum(samples) / len(samples) * 1000, 2) if samples else 0.0,
+                    "p50_ms": round(_percentile(samples, 50) * 1000, 2),
+                    "p95_ms": round(_percentile(samples, 95) * 1000, 2),
+                    "max_ms": round(samples[-1] * 1000, 2) if samples else 0.0,
+                }
+                for name, samples in timings.items()
+            },
+        }
+
+    def reset(self) -> None:
+        """Clear every metric (mainly for tests)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timings.clear()
+
+
+def _percentile(sorted_samples, pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(pct / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+# Global registry
+metrics = MetricsRegistry()
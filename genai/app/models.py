@@ -54,6 +54,19 @@ class FollowupQuestion(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
     cards_drawn: Optional[List[TarotCard]] = Field(default_factory=list)
 
+class DiscussionListItem(BaseModel):
+    discussion_id: str
+    initial_question: str
+    created_at: datetime
+    card_names: List[str] = Field(default_factory=list)
+    response_preview: str = ""
+
+class DiscussionSummary(BaseModel):
+    discussion_id: str
+    summary: str = ""
+    turns_summarized: int = 0  # number of leading followups folded into `summary`
+    updated_at: datetime = Field(default_factory=datetime.now)
+
 class AskRequest(BaseModel):
     question: str
     spread: Optional[str] = "three"    
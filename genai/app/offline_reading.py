@@ -0,0 +1,97 @@
+"""
+Offline reading composer.
+
+Builds a complete interpretation from local data only: the drawn
+`CardLayout` (meaning and orientation), the positional keywords from
+`card_engine.POSITION_KEYWORDS` and the card's `fortune_telling` lines from
+the in-memory deck snapshot. Used while the Gemini circuit is open or a
+generation call failed, so readings stay fast and meaningful without any
+network access. The same question and spread always yield the same text.
+"""
+
+import hashlib
+import random
+from typing import List, Mapping, Optional
+
+from app.card_engine import POSITION_KEYWORDS
+from app.deck_cache import get_deck_cache
+from app.models import CardLayout, TarotCard
+
+_POSITION_OPENINGS = {
+    "past": "Looking back, {card} shapes the {keywords} of this question.",
+    "present": "Right now, {card} marks your {keywords}.",
+    "future": "Ahead, {card} points to the {keywords} this path can bring.",
+}
+_DEFAULT_OPENING = "In the {position} position, {card} speaks of {keywords}."
+
+
+class OfflineReading(str):
+    """
+    A reading composed locally. Behaves like the generated text, but callers
+    can tell it apart to avoid caching it in place of a real one.
+    """
+
+
+def _joined(words: List[str]) -> str:
+    if len(words) <= 1:
+        return "".join(words)
+    return ", ".join(words[:-1]) + " and " + words[-1]
+
+
+def _meaning_phrases(meaning: str) -> List[str]:
+    return [part.strip().rstrip(".") for part in (meaning or "").split("|") if part.strip()]
+
+
+def _compose_card(layout: CardLayout, card: Optional[TarotCard], rng: random.Random) -> str:
+    keywords = layout.position_keywords or POSITION_KEYWORDS.get(layout.position, [])
+    orientation = "upright" if layout.upright else "reversed"
+    template = _POSITION_OPENINGS.get(layout.position, _DEFAULT_OPENING)
+    sentences = [template.format(
+        card=f"{layout.name} ({orientation})",
+        position=layout.position,
+        keywords=_joined(keywords[:2]) or "themes",
+    )]
+
+    phrases = _meaning_phrases(layout.meaning)
+    if phrases:
+        chosen = rng.sample(phrases, min(2, len(phrases)))
+        sentences.append(f"It speaks of {_joined([p[0].lower() + p[1:] for p in chosen])}.")
+
+    if card is not None and card.fortune_telling:
+        sentences.append(f"{rng.choice(card.fortune_telling).rstrip('.')}.")
+    return " ".join(sentences)
+
+
+def _compose_closing(picks: List[CardLayout]) -> str:
+    reversed_count = sum(1 for layout in picks if not layout.upright)
+    if reversed_count == 0:
+        tone = "All cards are upright: the energy is open and supportive, so act on what feels right."
+    elif reversed_count == len(picks):
+        tone = "All cards are reversed: slow down and look at what is being held back before you move."
+    elif reversed_count * 2 > len(picks):
+        tone = "Most cards are reversed: inner obstacles deserve attention before outer action."
+    elif reversed_count * 2 == len(picks):
+        tone = "Upright and reversed cards are in balance: weigh what supports you against what holds you back."
+    else:
+        tone = "Most cards are upright: the way forward is open, with a few points to handle with care."
+    return f"{tone} Let {picks[-1].name} guide your next step."
+
+
+def compose_offline_reading(question: str, picks: List[CardLayout],
+                            deck: Optional[Mapping[str, TarotCard]] = None) -> OfflineReading:
+    """
+    Compose a deterministic reading for `question` and the drawn `picks`.
+    `deck` maps card names to cards; defaults to the cached deck snapshot.
+    """
+    if deck is None:
+        snapshot = get_deck_cache().snapshot
+        deck = snapshot.by_name if snapshot is not None else {}
+
+    seed_source = "\x1f".join([question or ""] + [f"{p.name}:{p.position}:{p.upright}" for p in picks])
+    rng = random.Random(int.from_bytes(hashlib.sha256(seed_source.encode("utf-8")).digest()[:8], "big"))
+
+    paragraphs = [f"Your question: \"{question}\"" if question else "Your reading:"]
+    paragraphs.extend(_compose_card(layout, deck.get(layout.name), rng) for layout in picks)
+    if picks:
+        paragraphs.append(_compose_closing(picks))
+    return OfflineReading("\n\n".join(paragraphs))
@@ -0,0 +1,324 @@
+"""
+Durable write-behind outbox for Weaviate inserts.
+
+Request handlers no longer insert Discussion, FollowupQuestion, Feedback and
+ReadingContext objects themselves: `write_object` appends the object to a
+local SQLite spool (WAL, synchronous=FULL, so an acknowledged write survives
+a crash) and returns its UUID right away. `run_outbox_flusher` then pushes
+spooled objects to Weaviate with `insert_many` in micro-batches of at most
+`OUTBOX_BATCH_SIZE` objects, flushing as soon as a batch is full and at the
+latest `OUTBOX_FLUSH_INTERVAL` seconds after the previous flush.
+
+Every object carries its UUID from the moment it is spooled, so retrying a
+batch (or two workers delivering the same row) overwrites instead of
+duplicating. Objects Weaviate rejects are retried up to `OUTBOX_MAX_ATTEMPTS`
+times and then moved to the `outbox_dead` table; when Weaviate is unreachable
+the whole spool waits with exponential backoff, so writes keep being accepted
+through short outages. Shutdown drains the spool; anything left over is
+delivered after the next start.
+
+Setting `OUTBOX_ENABLED=false` restores synchronous inserts.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from weaviate.classes.data import DataObject
+
+from app.logger_config import get_tarot_logger
+from app.metrics import metrics
+from app.schema import ensure_collection
+
+logger = get_tarot_logger(__name__)
+
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "true").lower() not in ("0", "false", "no")
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", os.path.join(os.path.dirname(__file__), "outbox.sqlite3"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_FLUSH_INTERVAL = float(os.getenv("OUTBOX_FLUSH_INTERVAL", "0.5"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_DRAIN_TIMEOUT = float(os.getenv("OUTBOX_DRAIN_TIMEOUT", "10"))
+
+# Rows handed to a flusher are invisible to other workers for this long
+LEASE_SECONDS = 30.0
+MAX_BACKOFF_SECONDS = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    collection TEXT NOT NULL,
+    object_uuid TEXT NOT NULL,
+    properties TEXT NOT NULL,
+    vector TEXT,
+    enqueued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    leased_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE TABLE IF NOT EXISTS outbox_dead (
+    id INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL,
+    object_uuid TEXT NOT NULL,
+    properties TEXT NOT NULL,
+    vector TEXT,
+    enqueued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT
+);
+"""
+
+
+class WriteOutbox:
+    """
+    SQLite-backed spool of pending Weaviate inserts.
+    """
+
+    def __init__(self, path: str = OUTBOX_PATH, batch_size: int = OUTBOX_BATCH_SIZE,
+                 flush_interval: float = OUTBOX_FLUSH_INTERVAL, max_attempts: int = OUTBOX_MAX_ATTEMPTS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def enqueue(self, collection: str, properties: dict, object_uuid: Optional[str] = None,
+                vector: Optional[List[float]] = None) -> str:
+        """Spool one object, with its vector if it has one, and return its UUID."""
+        object_uuid = str(object_uuid or uuid.uuid4())
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO outbox (collection, object_uuid, properties, vector, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (collection, object_uuid, json.dumps(properties, default=str),
+                 json.dumps(vector) if vector is not None else None, time.time())
+            )
+            depth = self._depth_locked(conn)
+        metrics.increment("outbox.enqueued")
+        metrics.set_gauge("outbox.depth", depth)
+        if depth >= self.batch_size:
+            self._ready.set()
+        return object_uuid
+
+    def wait_ready(self, timeout: float) -> None:
+        """Block until a full batch is spooled or `timeout` seconds have passed."""
+        if self.depth() >= self.batch_size:
+            return
+        self._ready.wait(timeout)
+        self._ready.clear()
+
+    def flush_once(self, client) -> int:
+        """
+        Deliver up to `batch_size` spooled objects. Returns how many were
+        delivered or dead-lettered. Raises if Weaviate cannot be reached, after
+        handing the rows back to the spool.
+        """
+        rows = self._lease(self.batch_size)
+        if not rows:
+            self._update_gauges()
+            return 0
+
+        started = time.perf_counter()
+        by_collection: Dict[str, list] = {}
+        for row in rows:
+            by_collection.setdefault(row[1], []).append(row)
+
+        done: List[int] = []
+        failed: Dict[int, str] = {}
+        try:
+            for name, group in by_collection.items():
+                ensure_collection(client, name)
+                result = client.collections.get(name).data.insert_many([
+                    DataObject(properties=json.loads(properties), uuid=object_uuid,
+                               vector=json.loads(vector) if vector else None)
+                    for _, _, object_uuid, properties, _, _, vector in group
+                ])
+                errors = result.errors or {}
+                for index, row in enumerate(group):
+                    if index in errors:
+                        failed[row[0]] = errors[index].message
+                    else:
+                        done.append(row[0])
+        except Exception:
+            # Delivered groups are kept; the rest goes back without using up an attempt
+            self._settle(done, {})
+            self._release([row[0] for row in rows if row[0] not in done])
+            raise
+
+        dead = self._settle(done, failed)
+        metrics.observe("outbox.flush", time.perf_counter() - started)
+        metrics.observe("outbox.delivery_lag", time.time() - min(row[4] for row in rows))
+        metrics.increment("outbox.flushed", len(done))
+        if failed:
+            metrics.increment("outbox.failed", len(failed))
+            logger.warning(f"Outbox: {len(failed)} objects rejected by Weaviate, e.g. {next(iter(failed.values()))}")
+        if dead:
+            metrics.increment("outbox.dead_lettered", dead)
+            logger.error(f"Outbox: moved {dead} objects to outbox_dead after {self.max_attempts} attempts")
+        self._update_gauges()
+        return len(done) + dead
+
+    def drain(self, client, timeout: float = OUTBOX_DRAIN_TIMEOUT) -> int:
+        """Flush until the spool is empty or `timeout` expires. Returns the objects left."""
+        deadline = time.monotonic() + timeout
+        while self.depth() and time.monotonic() < deadline:
+            try:
+                if self.flush_once(client) == 0:
+                    # Everything left is leased by a flush still in flight
+                    time.sleep(0.05)
+            except Exception as e:
+                logger.error(f"Outbox drain failed: {e}")
+                break
+        remaining = self.depth()
+        if remaining:
+            logger.warning(f"Outbox: {remaining} objects left in {self.path}, delivered after restart")
+        return remaining
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._depth_locked(self._connection())
+
+    def stats(self) -> dict:
+        with self._lock:
+            conn = self._connection()
+            depth = self._depth_locked(conn)
+            oldest = conn.execute("SELECT MIN(enqueued_at) FROM outbox").fetchone()[0]
+            dead = conn.execute("SELECT COUNT(*) FROM outbox_dead").fetchone()[0]
+        return {
+            "depth": depth,
+            "lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "dead_lettered": dead,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.executescript(_SCHEMA)
+            self._migrate(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """Add columns introduced after a spool file was created."""
+        for table in ("outbox", "outbox_dead"):
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if "vector" not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN vector TEXT")
+
+    @staticmethod
+    def _depth_locked(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def _lease(self, limit: int) -> list:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT id, collection, object_uuid, properties, enqueued_at, attempts, vector FROM outbox "
+                    "WHERE leased_until <= ? ORDER BY id LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE outbox SET leased_until = ? WHERE id = ?",
+                    [(now + LEASE_SECONDS, row[0]) for row in rows]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def _settle(self, done: List[int], failed: Dict[int, str]) -> int:
+        """Delete delivered rows, schedule retries, dead-letter exhausted rows."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("DELETE FROM outbox WHERE id = ?", [(row_id,) for row_id in done])
+                conn.executemany(
+                    "UPDATE outbox SET attempts = attempts + 1, leased_until = 0, last_error = ? WHERE id = ?",
+                    [(error, row_id) for row_id, error in failed.items()]
+                )
+                exhausted = "FROM outbox WHERE attempts >= ?"
+                dead = conn.execute(f"SELECT COUNT(*) {exhausted}", (self.max_attempts,)).fetchone()[0]
+                if dead:
+                    conn.execute(
+                        "INSERT INTO outbox_dead (id, collection, object_uuid, properties, vector, enqueued_at, "
+                        "attempts, last_error) SELECT id, collection, object_uuid, properties, vector, enqueued_at, "
+                        f"attempts, last_error {exhausted}", (self.max_attempts,)
+                    )
+                    conn.execute(f"DELETE {exhausted}", (self.max_attempts,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return dead
+
+    def _release(self, row_ids: List[int]) -> None:
+        with self._lock:
+            self._connection().executemany(
+                "UPDATE outbox SET leased_until = 0 WHERE id = ?", [(row_id,) for row_id in row_ids]
+            )
+
+    def _update_gauges(self) -> None:
+        stats = self.stats()
+        metrics.set_gauge("outbox.depth", stats["depth"])
+        metrics.set_gauge("outbox.lag_seconds", stats["lag_seconds"])
+
+
+_outbox = WriteOutbox()
+
+
+def get_write_outbox() -> WriteOutbox:
+    """Return the process-wide write outbox."""
+    return _outbox
+
+
+def write_object(client, collection: str, properties: dict, object_uuid: Optional[str] = None,
+                 vector: Optional[List[float]] = None) -> str:
+    """
+    Write one object to `collection`: spooled through the outbox, or inserted
+    directly with `client` when the outbox is disabled. Returns the object UUID.
+    """
+    if OUTBOX_ENABLED:
+        return _outbox.enqueue(collection, properties, object_uuid, vector)
+    ensure_collection(client, collection)
+    return str(client.collections.get(collection).data.insert(properties=properties, uuid=object_uuid,
+                                                              vector=vector))
+
+
+async def run_outbox_flusher(client_getter: Callable) -> None:
+    """Background task: deliver spooled objects until cancelled."""
+    backoff = _outbox.flush_interval
+    while True:
+        await asyncio.to_thread(_outbox.wait_ready, _outbox.flush_interval)
+        try:
+            while await asyncio.to_thread(_outbox.flush_once, client_getter()) >= _outbox.batch_size:
+                pass
+            backoff = _outbox.flush_interval
+        except Exception as e:
+            metrics.increment("outbox.flush_errors")
+            logger.error(f"Outbox flush failed, retrying in {backoff:.1f}s: {e}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
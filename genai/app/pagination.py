@@ -0,0 +1,93 @@
+"""
+Keyset (cursor) pagination over Weaviate collections.
+
+Pages are fetched with a server-side filter and sort on an indexed property
+(ISO timestamps sort lexicographically; the property must be FIELD-tokenized
+so range filters compare the whole value, see app/schema.py), so the cost of a page does not
+depend on the collection size or on how deep the caller paginated. The opaque
+`after` cursor holds the sort value of the last returned object plus the IDs
+already returned with that same value, which keeps pages stable when several
+objects share a timestamp.
+"""
+
+import base64
+import json
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from weaviate.classes.query import Filter, Sort
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+class Page(NamedTuple):
+    objects: list
+    next_cursor: Optional[str]
+
+
+def encode_cursor(value: str, ids: Sequence[str]) -> str:
+    raw = json.dumps({"v": value, "ids": list(ids)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, List[str]]:
+    """Return (sort value, ids seen at that value). Raises ValueError on a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(data["v"]), [str(i) for i in data.get("ids", [])]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def fetch_page(collection, sort_property: str, filters=None, limit: int = DEFAULT_PAGE_SIZE,
+               after: Optional[str] = None, ascending: bool = True,
+               return_properties: Optional[List[str]] = None) -> Page:
+    """
+    Fetch one page of `collection` ordered by `sort_property` (then by ID).
+    `filters` narrows the result server side; `after` is a cursor returned by a
+    previous call with the same arguments.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    seen: List[str] = []
+    if after:
+        value, seen = decode_cursor(after)
+        by_sort = Filter.by_property(sort_property)
+        edge = by_sort.greater_or_equal(value) if ascending else by_sort.less_or_equal(value)
+        if seen:
+            edge = edge & Filter.by_id().contains_none(seen)
+        filters = edge if filters is None else filters & edge
+
+    query_kwargs = {}
+    if return_properties is not None:
+        query_kwargs["return_properties"] = return_properties
+    result = collection.query.fetch_objects(
+        filters=filters,
+        sort=Sort.by_property(sort_property, ascending=ascending).by_id(ascending=ascending),
+        limit=limit + 1,
+        **query_kwargs
+    )
+
+    objects = list(result.objects)
+    if len(objects) <= limit:
+        return Page(objects, None)
+
+    objects = objects[:limit]
+    last_value = objects[-1].properties.get(sort_property)
+    tied = [str(obj.uuid) for obj in objects if obj.properties.get(sort_property) == last_value]
+    if after and last_value == value:
+        tied = seen + tied
+    return Page(objects, encode_cursor(last_value, tied))
+
+
+def iterate_all(collection, sort_property: str, filters=None, page_size: int = MAX_PAGE_SIZE,
+                ascending: bool = True, return_properties: Optional[List[str]] = None) -> Iterator:
+    """Yield every matching object, one page at a time."""
+    cursor = None
+    while True:
+        page = fetch_page(collection, sort_property, filters=filters, limit=page_size, after=cursor,
+                          ascending=ascending, return_properties=return_properties)
+        yield from page.objects
+        if page.next_cursor is None:
+            return
+        cursor = page.next_cursor
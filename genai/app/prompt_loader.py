@@ -1,73 +1,249 @@
 # app/prompt_loader.py
+"""
+Prompt templates and prompt assembly.
+
+Templates (basic, with-history and the optional per-spread
+`tarot_prompt_<spread>.txt` files, used instead of the basic template for
+that spread) are loaded once and compiled into literal fragments and
+placeholders, so rendering is a single join. Their mtimes are re-checked at
+most every `PROMPT_TEMPLATE_CHECK_INTERVAL` seconds and changed files are
+recompiled. Card blocks are rendered once per card, orientation and position
+and then served from a cache.
+
+With the Gemini context cache active (`app.context_cache`), the persona
+(`tarot_system_instruction.txt`) and the card glossary live in the cached
+context and prompts use `tarot_prompt_cached_template.txt`, which only names
+the drawn cards.
+"""
+
 import os
+import threading
+import time
 from string import Template
-from typing import List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from functools import lru_cache
 from app.models import TarotCard, CardLayout
+from app.card_engine import SPREADS, spread_for_positions
+from app.discussion_memory import estimate_tokens, truncate_to_tokens, FOLLOWUP_HISTORY_TOKEN_BUDGET
+from app.logger_config import get_tarot_logger
 
-@lru_cache(maxsize=2)
-def load_tarot_template(path: str = None) -> str:
-    """Load tarot prompt template with caching"""
-    if path is None:
-        # Get the directory of this file and construct the path to the template
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        path = os.path.join(current_dir, "tarot_prompt_template.txt")
-    
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
+logger = get_tarot_logger(__name__)
+
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASIC_TEMPLATE = "tarot_prompt_template.txt"
+HISTORY_TEMPLATE = "tarot_prompt_with_history_template.txt"
+SPREAD_TEMPLATE = "tarot_prompt_{spread}.txt"
+CACHED_TEMPLATE = "tarot_prompt_cached_template.txt"
+SYSTEM_INSTRUCTION = "tarot_system_instruction.txt"
+
+PROMPT_TEMPLATE_CHECK_INTERVAL = float(os.getenv("PROMPT_TEMPLATE_CHECK_INTERVAL", "5"))
+CARD_BLOCK_CACHE_SIZE = 4096
+
+
+class CompiledTemplate:
+    """
+    A `string.Template` split into literal fragments and placeholder slots.
+    `render` behaves like `safe_substitute`: unknown placeholders are kept.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._pieces: List[str] = []
+        self._slots: List[Tuple[int, str]] = []
+        last = 0
+        for match in Template.pattern.finditer(source):
+            self._pieces.append(source[last:match.start()])
+            name = match.group("named") or match.group("braced")
+            if name is not None:
+                self._slots.append((len(self._pieces), name))
+                self._pieces.append(match.group(0))
+            elif match.group("escaped") is not None:
+                self._pieces.append(Template.delimiter)
+            else:
+                self._pieces.append(match.group(0))
+            last = match.end()
+        self._pieces.append(source[last:])
+
+    def render(self, **values) -> str:
+        pieces = self._pieces.copy()
+        for index, name in self._slots:
+            if name in values:
+                pieces[index] = str(values[name])
+        return "".join(pieces)
+
+
+@lru_cache(maxsize=32)
+def compile_template(template_str: str) -> CompiledTemplate:
+    return CompiledTemplate(template_str)
+
+
+class PromptTemplates:
+    """
+    Loaded templates by path, recompiled when the file's mtime changes.
+    """
+
+    def __init__(self, directory: str = TEMPLATE_DIR, check_interval: float = PROMPT_TEMPLATE_CHECK_INTERVAL):
+        self.directory = directory
+        self.check_interval = check_interval
+        # path -> (mtime, compiled template or None for a missing file, last check)
+        self._entries: Dict[str, Tuple[Optional[float], Optional[CompiledTemplate], float]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def get(self, path: str) -> CompiledTemplate:
+        """The compiled template at `path`. Raises FileNotFoundError if there is none."""
+        template = self.find(path)
+        if template is None:
+            raise FileNotFoundError(f"Prompt template not found: {path}")
+        return template
+
+    def find(self, path: str) -> Optional[CompiledTemplate]:
+        """The compiled template at `path`, or None if the file does not exist."""
+        entry = self._entries.get(path)
+        if entry is not None and time.monotonic() - entry[2] < self.check_interval:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and time.monotonic() - entry[2] < self.check_interval:
+                return entry[1]
+            mtime, template = entry[:2] if entry is not None else (None, None)
+            try:
+                current = os.stat(path).st_mtime
+                if template is None or current != mtime:
+                    with open(path, "r", encoding="utf-8") as f:
+                        template = compile_template(f.read())
+                    if mtime is not None:
+                        logger.info(f"Reloaded prompt template {path}")
+                    mtime = current
+            except FileNotFoundError:
+                mtime, template = None, None
+            except Exception as e:
+                if template is None:
+                    raise
+                logger.error(f"Failed to reload prompt template {path}, keeping previous version: {e}")
+            self._entries[path] = (mtime, template, time.monotonic())
+            return template
+
+    def preload(self) -> List[str]:
+        """Compile every template up front. Returns the names of those found."""
+        names = [BASIC_TEMPLATE, HISTORY_TEMPLATE, CACHED_TEMPLATE, SYSTEM_INSTRUCTION]
+        names += [SPREAD_TEMPLATE.format(spread=key) for key in SPREADS]
+        return [name for name in names if self.find(self.path(name)) is not None]
+
+    def basic(self, spread: Optional[str] = None) -> CompiledTemplate:
+        """The per-spread template when one exists, else the basic template."""
+        if spread is not None:
+            template = self.find(self.path(SPREAD_TEMPLATE.format(spread=spread)))
+            if template is not None:
+                return template
+        return self.get(self.path(BASIC_TEMPLATE))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_templates = PromptTemplates()
+
+
+def get_prompt_templates() -> PromptTemplates:
+    """Return the process-wide prompt template store."""
+    return _templates
+
+
+def spread_of(picks: Sequence[CardLayout]) -> Optional[str]:
+    return spread_for_positions([card.position for card in picks])
+
+
+def load_tarot_template(path: str = None, spread: Optional[str] = None) -> str:
+    """Load the tarot prompt template (the per-spread one for `spread` if present)"""
+    if path is not None:
+        return _templates.get(path).source
+    return _templates.basic(spread).source
+
+@lru_cache(maxsize=CARD_BLOCK_CACHE_SIZE)
+def _card_block(name: str, upright: bool, position: str, meaning: str, position_keywords: Tuple[str, ...]) -> str:
+    orient = "Upright" if upright else "Reversed"
+    card_info = []
+    card_info.append(f"- [{position.capitalize()}] {name}")
+    card_info.append(f"  Orientation: {orient}")
+    card_info.append(f"  Meaning: {meaning}")
+    if position_keywords:
+        card_info.append(f"  Position Keywords: {', '.join(position_keywords)}")
+    return "\n".join(card_info)
 
 def render_card_blocks(picks: List[CardLayout]) -> str:
     """
     Render card information blocks for CardLayout objects.
+    Each block is rendered once per card, orientation and position.
     """
-    cards_lines = []
-    for card in picks:
-        orient = "Upright" if card.upright else "Reversed"
-        card_info = []
-        card_info.append(f"- [{card.position.capitalize()}] {card.name}")
-        card_info.append(f"  Orientation: {orient}")
-        card_info.append(f"  Meaning: {card.meaning}")
-        if card.position_keywords:
-            card_info.append(f"  Position Keywords: {', '.join(card.position_keywords)}")
-        cards_lines.append("\n".join(card_info))
-    return "\n\n".join(cards_lines)
+    return "\n\n".join(
+        _card_block(card.name, card.upright, card.position, card.meaning, tuple(card.position_keywords))
+        for card in picks
+    )
+
+@lru_cache(maxsize=CARD_BLOCK_CACHE_SIZE)
+def _card_reference(name: str, upright: bool, position: str) -> str:
+    return f"- [{position.capitalize()}] {name} ({'Upright' if upright else 'Reversed'})"
+
+def render_cached_prompt(question: str, picks: List[CardLayout]) -> str:
+    """
+    Prompt for use with the cached context: the question and the drawn cards
+    by position, name and orientation, without their meanings.
+    """
+    cards = "\n".join(_card_reference(card.name, card.upright, card.position) for card in picks)
+    return _templates.get(_templates.path(CACHED_TEMPLATE)).render(
+        question=question, spread=spread_of(picks) or "custom", cards=cards
+    )
+
+def load_system_instruction() -> str:
+    """Persona and answer instructions sent once as the cached context's system instruction."""
+    return _templates.get(_templates.path(SYSTEM_INSTRUCTION)).source
 
 def render_prompt(template_str: str, question: str, 
                   picks: List[CardLayout]
                  ) -> str:
     """Render prompt using the basic template"""
-    cards_text = render_card_blocks(picks)
-    
-    tpl = Template(template_str)
-    return tpl.safe_substitute(question=question, cards=cards_text)
+    return compile_template(template_str).render(question=question, cards=render_card_blocks(picks))
 
 
-@lru_cache(maxsize=2)
 def load_tarot_with_history_template(path: str = None) -> str:
-    """Load template for tarot reading with conversation history (cached)"""
-    if path is None:
-        # Get the directory of this file and construct the path to the template
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        path = os.path.join(current_dir, "tarot_prompt_with_history_template.txt")
-    
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
+    """Load template for tarot reading with conversation history"""
+    return _templates.get(path or _templates.path(HISTORY_TEMPLATE)).source
 
-def render_history_context(history: List[dict], max_messages: int = 5) -> str:
-    """Render conversation history into readable format"""
+def render_history_context(history: List[dict], max_messages: int = 5,
+                           max_tokens: int = FOLLOWUP_HISTORY_TOKEN_BUDGET) -> str:
+    """
+    Render conversation history into readable format.
+    Keeps the newest messages that fit in `max_tokens` (at most `max_messages`);
+    the newest one is shortened rather than dropped when it alone is too long.
+    """
     if not history:
         return ""
     
     context_lines = []
-    for msg in history[-max_messages:]:
+    remaining = max_tokens
+    for msg in reversed(history[-max_messages:]):
         role = msg.get('role', '')
         content = msg.get('content', '')
         if role == 'user':
-            context_lines.append(f"User: {content}")
+            line = f"User: {content}"
         elif role == 'assistant':
-            context_lines.append(f"Assistant: {content}")
+            line = f"Assistant: {content}"
+        else:
+            continue
+        cost = estimate_tokens(line)
+        if cost > remaining:
+            if not context_lines and remaining > 0:
+                context_lines.append(truncate_to_tokens(line, remaining))
+            break
+        remaining -= cost
+        context_lines.append(line)
     
-    return "\n".join(context_lines)
+    return "\n".join(reversed(context_lines))
 
 def render_prompt_with_history(
     template_str: str, 
@@ -85,8 +261,7 @@ def render_prompt_with_history(
     """
     tarot_context = render_card_blocks(picks)
     
-    tpl = Template(template_str)
-    return tpl.safe_substitute(
+    return compile_template(template_str).render(
         question=question, 
         tarot_context=tarot_context,
         history_context=history_context
@@ -116,8 +291,8 @@ def build_tarot_prompt_smart(
         except FileNotFoundError as e:
             print(f"[Warning] Failed to load history template: {e}")
             print(f"[Warning] Falling back to basic template")
-            template_str = load_tarot_template()
+            template_str = load_tarot_template(spread=spread_of(picks))
             return render_prompt(template_str, question, picks)
     else:
-        template_str = load_tarot_template()
+        template_str = load_tarot_template(spread=spread_of(picks))
         return render_prompt(template_str, question, picks)
\ No newline at end of file
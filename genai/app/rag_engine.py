@@ -1,27 +1,46 @@
 # Standard library imports
-import json
+import asyncio
 import os
 import random
+import time
 import uuid
 from datetime import datetime
-from typing import List, Tuple, Optional
-import ast
+from typing import AsyncIterator, List, Tuple, Optional
 
 # Third-party imports
 from langchain.prompts import PromptTemplate
 from dotenv import load_dotenv
-from google import genai
 from google.genai import types
 import weaviate
 from weaviate.classes.query import Filter, Sort
 
 # Local imports
-from app.models import TarotCard, Discussion, FollowupQuestion, CardLayout
-from app.prompt_loader import load_tarot_template, render_prompt, build_tarot_prompt_smart
+from app.models import (
+    TarotCard, Discussion, FollowupQuestion, CardLayout, DiscussionSummary, DiscussionListItem
+)
+from app.prompt_loader import load_tarot_template, render_prompt, build_tarot_prompt_smart, spread_of
 from app.card_engine import layout_three_card
 from app.logger_config import get_tarot_logger
-from app.weaviate_client import get_weaviate_client
+from app.metrics import metrics
+from app.gemini_runtime import GEMINI_MODEL, get_gemini_runtime
+from app.context_cache import (
+    get_context_cache, is_cache_miss, prefix_prompt, record_usage, with_context_cache
+)
+from app.generation_executor import GenerationTimeout, get_generation_executor, is_retryable
+from app.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.offline_reading import compose_offline_reading
+from app.singleflight import SingleFlight, prompt_key
+from app.deck_cache import get_deck
+from app.reading_cache import get_reading_cache
 from app.context_aware_reading import enhance_reading_with_feedback_context
+from app.discussion_memory import render_followup_context, update_discussion_summary
+from app.history_index import get_history_index
+from app.pagination import DEFAULT_PAGE_SIZE, fetch_page, iterate_all
+from app.discussion_cache import get_discussion_cache
+from app.feedback_journal import get_feedback_journal
+from app.card_codec import encode_cards, cards_from_properties, parse_legacy_cards
+from app.outbox import write_object
+from app.schema import collection_available
 
 
 # Setup logger
@@ -35,36 +54,27 @@ def check_environment_variables():
     if not API_KEY :
         raise RuntimeError("Missing GEMINI_API_KEY in environment")
 
-def fetch_full_deck() -> List[TarotCard]:
-    """Fetch all tarot cards from Weaviate"""
-    logger.info("Fetching full tarot deck from Weaviate")
-    client = get_weaviate_client()
+def fetch_full_deck(client=None) -> Tuple[TarotCard, ...]:
+    """
+    Return all tarot cards from the process-level deck cache.
+    Weaviate is only queried when the cache is cold, expired with a new deck
+    version, or explicitly invalidated.
+    """
     try:
-        tarot_col = client.collections.get("TarotCard")
-        # Use the correct API method
-        all_objs = tarot_col.query.fetch_objects(limit=78)  # 78 cards in a tarot deck
-        
-        cards = []
-        for obj in all_objs.objects:
-            card_data = {
-                "name": obj.properties.get("name", ""),
-                "arcana": obj.properties.get("arcana", ""),
-                "meanings_light": obj.properties.get("meanings_light", []),
-                "meanings_shadow": obj.properties.get("meanings_shadow", []),
-                "keywords": obj.properties.get("keywords", []),
-                "fortune_telling": obj.properties.get("fortune_telling", []),
-            }
-            cards.append(TarotCard(**card_data))
-        
-        logger.info(f"Successfully fetched {len(cards)} tarot cards")
-        return cards
+        snapshot = get_deck(client)
+        logger.info(f"Using cached tarot deck with {len(snapshot.cards)} cards")
+        return snapshot.cards
     except Exception as e:
         logger.error(f"Error fetching deck: {e}")
-        return []
+        return ()
 
 def build_tarot_prompt(question: str, picks):
-    template_str = load_tarot_template()  
-    return render_prompt(template_str, question, picks)
+    """
+    Full reading prompt, or the short prompt for the Gemini context cache when
+    one is active (it still carries the full prompt as a fallback).
+    """
+    template_str = load_tarot_template(spread=spread_of(picks))
+    return with_context_cache(question, picks, render_prompt(template_str, question, picks))
 
 def build_tarot_prompt_with_history(question: str, picks, history: List[dict] = None):
     """
@@ -73,33 +83,117 @@ def build_tarot_prompt_with_history(question: str, picks, history: List[dict] =
     """
     return build_tarot_prompt_smart(question, picks, history)
 
+# Identical prompts in flight at the same time share one Gemini call
+_gemini_flight = SingleFlight("gemini")
+
+# Stops calling Gemini while it is failing or slow; readings are then composed offline
+_gemini_breaker = CircuitBreaker("gemini", is_failure=is_retryable)
+
 def call_gemini_api(prompt: str) -> str:
     """
     Call the Gemini API with the provided prompt and return the response.
+    Concurrent calls with the same prompt are coalesced into one request, which
+    runs under the generation executor's deadline, retry and hedging policy.
     """
-    logger.info("Calling Gemini API for content generation")
     check_environment_variables()
-    
-    try:
-        # Load the configuration from the JSON file
-        with open(os.path.join(os.path.dirname(__file__), "gemini_config.json"), "r", encoding="utf-8") as f:
-            cfg = json.load(f)
+    executor = get_generation_executor()
+    return _gemini_flight.do(prompt_key(prompt), lambda: _gemini_breaker.call(
+        lambda: executor.run(lambda timeout: _generate_content(prompt, timeout))
+    ))
 
-        gen_cfg = types.GenerationConfig(**cfg["generation_config"])
-        safe_cfg = [types.SafetySetting(**s) for s in cfg["safety_settings"]]
+async def call_gemini_api_async(prompt: str) -> str:
+    """
+    Non-blocking variant of `call_gemini_api` built on the google-genai async client.
+    Concurrent calls with the same prompt are coalesced into one request.
+    """
+    check_environment_variables()
+    executor = get_generation_executor()
+    return await _gemini_flight.do_async(prompt_key(prompt), lambda: _gemini_breaker.call_async(
+        lambda: executor.run_async(lambda timeout: _generate_content_async(prompt, timeout))
+    ))
 
-        gen_cfg = types.GenerateContentConfig(
-            **cfg["generation_config"],
-            safety_settings=safe_cfg,
-            automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True)
-        )
+def get_gemini_flight_stats() -> dict:
+    """Executions vs. coalesced callers of the Gemini single-flight layer."""
+    return _gemini_flight.stats()
 
-        client = genai.Client(api_key = API_KEY)
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=gen_cfg
-        )
+def get_gemini_breaker() -> CircuitBreaker:
+    """The circuit breaker guarding Gemini calls."""
+    return _gemini_breaker
+
+def _request_config(runtime, timeout: Optional[float] = None, cached_content: Optional[str] = None):
+    """
+    Generation config, with the attempt timeout applied to the HTTP request and
+    the Gemini context cache the prompt relies on, if any.
+    """
+    config = runtime.generation_config()
+    update = {}
+    if timeout is not None:
+        update["http_options"] = types.HttpOptions(timeout=int(timeout * 1000))
+    if cached_content is not None:
+        update["cached_content"] = cached_content
+    return config.model_copy(update=update) if update else config
+
+def _without_cache(prompt: str, error: Exception) -> Optional[str]:
+    """
+    The full prompt to resend after Gemini rejected the context cache `prompt`
+    relies on (it expired or was deleted), or None to re-raise `error`.
+    """
+    cache_name = getattr(prompt, "cache_name", None)
+    if cache_name is None or not is_cache_miss(error):
+        return None
+    get_context_cache().invalidate(cache_name)
+    return prompt.full_prompt
+
+def _generate_content(prompt: str, timeout: Optional[float] = None) -> str:
+    logger.info("Calling Gemini API for content generation")
+    
+    try:
+        runtime = get_gemini_runtime()
+        try:
+            response = runtime.client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=str(prompt),
+                config=_request_config(runtime, timeout, getattr(prompt, "cache_name", None))
+            )
+        except Exception as e:
+            full_prompt = _without_cache(prompt, e)
+            if full_prompt is None:
+                raise
+            response = runtime.client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=full_prompt,
+                config=_request_config(runtime, timeout)
+            )
+        record_usage(response)
+        
+        logger.info(f"Successfully generated content with Gemini API (response length: {len(response.text) if response.text else 0} characters)")
+        return response.text
+        
+    except Exception as e:
+        logger.error(f"Error calling Gemini API: {e}")
+        raise 
+
+async def _generate_content_async(prompt: str, timeout: Optional[float] = None) -> str:
+    logger.info("Calling Gemini API (async) for content generation")
+    
+    try:
+        runtime = get_gemini_runtime()
+        try:
+            response = await runtime.client.aio.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=str(prompt),
+                config=_request_config(runtime, timeout, getattr(prompt, "cache_name", None))
+            )
+        except Exception as e:
+            full_prompt = _without_cache(prompt, e)
+            if full_prompt is None:
+                raise
+            response = await runtime.client.aio.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=full_prompt,
+                config=_request_config(runtime, timeout)
+            )
+        record_usage(response)
         
         logger.info(f"Successfully generated content with Gemini API (response length: {len(response.text) if response.text else 0} characters)")
         return response.text
@@ -108,6 +202,108 @@ def call_gemini_api(prompt: str) -> str:
         logger.error(f"Error calling Gemini API: {e}")
         raise 
 
+async def stream_gemini_api(prompt: str) -> AsyncIterator[str]:
+    """
+    Stream generated text from Gemini chunk by chunk (generate_content_stream).
+    """
+    logger.info("Streaming content generation from Gemini API")
+    check_environment_variables()
+
+    runtime = get_gemini_runtime()
+    try:
+        stream = await runtime.client.aio.models.generate_content_stream(
+            model=GEMINI_MODEL,
+            contents=str(prompt),
+            config=_request_config(runtime, cached_content=getattr(prompt, "cache_name", None))
+        )
+    except Exception as e:
+        full_prompt = _without_cache(prompt, e)
+        if full_prompt is None:
+            raise
+        stream = await runtime.client.aio.models.generate_content_stream(
+            model=GEMINI_MODEL,
+            contents=full_prompt,
+            config=runtime.generation_config()
+        )
+    last_chunk = None
+    async for chunk in stream:
+        last_chunk = chunk
+        if chunk.text:
+            yield chunk.text
+    record_usage(last_chunk)
+
+async def _stream_with_timing(prompt: str, label: str, timing: dict) -> AsyncIterator[str]:
+    """
+    Relay `stream_gemini_api` while recording time-to-first-token and total stream time.
+    Results are written into `timing` (milliseconds) and the metrics registry.
+    """
+    started = time.perf_counter()
+    first_token_at = None
+    async for text in stream_gemini_api(prompt):
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+            timing["ttft_ms"] = round((first_token_at - started) * 1000, 2)
+            metrics.observe(f"{label}.ttft", first_token_at - started)
+        yield text
+    total = time.perf_counter() - started
+    timing["total_ms"] = round(total * 1000, 2)
+    metrics.observe(f"{label}.total", total)
+    logger.info(f"Gemini stream '{label}' finished: ttft={timing.get('ttft_ms')}ms total={timing['total_ms']}ms")
+
+def generate_reading(question: str, picks: List[CardLayout]) -> str:
+    """
+    Generate a reading for a question and spread, served from the reading cache when possible.
+    Falls back to an offline reading when Gemini is unavailable.
+    """
+    cache = get_reading_cache()
+    cached = cache.get(question, picks)
+    if cached is not None:
+        logger.info("Serving reading from cache")
+        return cached
+
+    try:
+        answer = call_gemini_api(build_tarot_prompt(question, picks))
+    except Exception as e:
+        if not gemini_unavailable(e):
+            raise
+        return _offline_reading(question, picks, e)
+    cache.set(question, picks, answer)
+    return answer
+
+async def generate_reading_async(question: str, picks: List[CardLayout]) -> str:
+    """
+    Async variant of `generate_reading`. Cache tiers that may block (Redis,
+    embeddings) are consulted from a worker thread.
+    """
+    cache = get_reading_cache()
+    cached = await asyncio.to_thread(cache.get, question, picks)
+    if cached is not None:
+        logger.info("Serving reading from cache")
+        return cached
+
+    try:
+        answer = await call_gemini_api_async(build_tarot_prompt(question, picks))
+    except Exception as e:
+        if not gemini_unavailable(e):
+            raise
+        return _offline_reading(question, picks, e)
+    await asyncio.to_thread(cache.set, question, picks, answer)
+    return answer
+
+def gemini_unavailable(error: BaseException) -> bool:
+    """
+    Whether `error` means Gemini is down or short-circuited, so an offline
+    reading may stand in. Misconfiguration (missing API key, 400/403) and
+    programming errors are not, and must surface.
+    """
+    return isinstance(error, (CircuitOpenError, GenerationTimeout)) or is_retryable(error)
+
+def _offline_reading(question: str, picks: List[CardLayout], error: Exception) -> str:
+    """Compose a reading locally after Gemini failed or was short-circuited. Not cached."""
+    logger.warning(f"Gemini unavailable, composing reading offline: {error}")
+    metrics.increment("readings.offline")
+    return compose_offline_reading(question, picks)
+
 def call_gemini_api_with_history(question: str, picks, history: List[dict] = None) -> str:
     """
     Call the Gemini API with tarot prompt that includes conversation history.
@@ -117,7 +313,7 @@ def call_gemini_api_with_history(question: str, picks, history: List[dict] = Non
     return call_gemini_api(prompt)
 
 def store_feedback(user_id: str, question: str, feedback: str) -> None:
-    """Store user feedback for a question in a local JSON file (feedback.json)."""
+    """Append user feedback for a question to the JSONL feedback journal."""
     logger.info(f"Storing feedback for user {user_id} on question '{question}': {feedback}")
     feedback_entry = {
         "user_id": user_id,
@@ -125,104 +321,63 @@ def store_feedback(user_id: str, question: str, feedback: str) -> None:
         "feedback": feedback,
         "timestamp": datetime.now().isoformat()
     }
-    feedback_file = os.path.join(os.path.dirname(__file__), "feedback.json")
     try:
-        # Read existing feedbacks
-        if os.path.exists(feedback_file):
-            with open(feedback_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if not isinstance(data, list):
-                data = []
-        else:
-            data = []
-        # Append new feedback
-        data.append(feedback_entry)
-        # Write back
-        with open(feedback_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        get_feedback_journal().append(feedback_entry)
         logger.info("Feedback stored successfully.")
     except Exception as e:
         logger.error(f"Failed to store feedback: {e}")
 
+# Length of the stored initial_response excerpt returned by discussion listings
+RESPONSE_PREVIEW_CHARS = 200
+
+def response_preview(text: str) -> str:
+    """Short excerpt of a reading, cut at a word boundary."""
+    text = " ".join((text or "").split())
+    if len(text) <= RESPONSE_PREVIEW_CHARS:
+        return text
+    return text[:RESPONSE_PREVIEW_CHARS].rsplit(" ", 1)[0] + "..."
+
 def store_discussion(discussion: Discussion, client) -> None:
     """
-    sture a discussion in Weaviate.
+    Store a discussion in Weaviate through the write-behind outbox.
     """
     try:
-        if not client.collections.exists("Discussion"):
-            client.collections.create(
-                name="Discussion",
-                properties=[
-                    weaviate.classes.config.Property(
-                        name="discussion_id",
-                        data_type=weaviate.classes.config.DataType.TEXT
-                    ),
-                    weaviate.classes.config.Property(
-                        name="user_id",
-                        data_type=weaviate.classes.config.DataType.TEXT
-                    ),
-                    weaviate.classes.config.Property(
-                        name="created_at",
-                        data_type=weaviate.classes.config.DataType.TEXT
-                    ),
-                    weaviate.classes.config.Property(
-                        name="initial_question",
-                        data_type=weaviate.classes.config.DataType.TEXT
-                    ),
-                    weaviate.classes.config.Property(
-                        name="initial_response",
-                        data_type=weaviate.classes.config.DataType.TEXT
-                    ),
-                    weaviate.classes.config.Property(
-                        name="cards_drawn",
-                        data_type=weaviate.classes.config.DataType.TEXT
-                    )
-                ]
-            )
-        
-        discussion_col = client.collections.get("Discussion")
-        discussion_col.data.insert(
-            properties={
-                "discussion_id": discussion.discussion_id,
-                "user_id": discussion.user_id,
-                "created_at": discussion.created_at.isoformat(),
-                "initial_question": discussion.initial_question,
-                "initial_response": discussion.initial_response,
-                "cards_drawn": json.dumps([card.model_dump() for card in discussion.cards_drawn])
-            }
-        )
+        write_object(client, "Discussion", {
+            "discussion_id": discussion.discussion_id,
+            "user_id": discussion.user_id,
+            "created_at": discussion.created_at.isoformat(),
+            "initial_question": discussion.initial_question,
+            "initial_response": discussion.initial_response,
+            "cards": encode_cards(discussion.cards_drawn),
+            "card_names": [card.name for card in discussion.cards_drawn],
+            "response_preview": response_preview(discussion.initial_response)
+        })
+        get_discussion_cache().put_discussion(discussion)
         print(f"Stored discussion: {discussion.discussion_id}")
     except Exception as e:
         print(f"Error storing discussion: {e}")
 
 def get_discussion(discussion_id: str, client) -> Optional[Discussion]:
+    """
+    Get a discussion, served from the write-through discussion cache when possible.
+    """
+    state = get_discussion_cache().get(discussion_id)
+    if state is not None and state.discussion is not None:
+        return state.discussion
     try:
-        if not client.collections.exists("Discussion"):
-            print("[DEBUG] Discussion collection does not exist")
+        if not collection_available(client, "Discussion"):
+            logger.debug("Discussion collection does not exist")
             return None
 
         discussion_col = client.collections.get("Discussion")
-        try:
-            result = discussion_col.query.fetch_objects(
-                where=Filter.by_property("discussion_id").equal(discussion_id),
-                limit=1
-            )
-        except Exception as e:
-            print(f"[DEBUG] Where query not supported, fallback to full scan: {e}")
-            result = discussion_col.query.fetch_objects(limit=1000)
-
-        found_discussion = None
-        for obj in result.objects:
-            print(f"[DEBUG] Found discussion_id in DB: {obj.properties.get('discussion_id')}")
-            if obj.properties.get("discussion_id") == discussion_id:
-                found_discussion = obj
-                break
-
-        if found_discussion:
-            props = found_discussion.properties
-            cards_drawn = []
-            if props.get("cards_drawn"):
-                cards_drawn = parse_cards_drawn(props.get("cards_drawn"))
+        result = discussion_col.query.fetch_objects(
+            filters=Filter.by_property("discussion_id").equal(discussion_id),
+            limit=1
+        )
+
+        if result.objects:
+            props = result.objects[0].properties
+            cards_drawn = cards_from_properties(props, legacy_parser=parse_cards_drawn)
             discussion_data = {
                 "discussion_id": props.get("discussion_id"),
                 "user_id": props.get("user_id"),
@@ -231,8 +386,10 @@ def get_discussion(discussion_id: str, client) -> Optional[Discussion]:
                 "initial_response": props.get("initial_response"),
                 "cards_drawn": cards_drawn
             }
-            return Discussion(**discussion_data)
-        print("[DEBUG] No matching discussion_id found")
+            discussion = Discussion(**discussion_data)
+            get_discussion_cache().remember_discussion(discussion)
+            return discussion
+        logger.debug(f"No discussion found for {discussion_id}")
         return None
     except Exception as e:
         print(f"Error getting discussion: {e}")
@@ -240,142 +397,177 @@ def get_discussion(discussion_id: str, client) -> Optional[Discussion]:
 
 def store_followup_question(followup: FollowupQuestion, client) -> None:
     """
-    Store a followup question in Weaviate."""
+    Store a followup question in Weaviate through the write-behind outbox,
+    together with its embedding for relevance-based history retrieval."""
     try:
-        if not client.collections.exists("FollowupQuestion"):
-            client.collections.create(
-                name="FollowupQuestion",
-                properties=[
-                    weaviate.classes.config.Property(
-                        name="question_id",
-                        data_type=weaviate.classes.config.DataType.TEXT
-                    ),
-                    weaviate.classes.config.Property(
-                        name="discussion_id",
-                        data_type=weaviate.classes.config.DataType.TEXT
-                    ),
-                    weaviate.classes.config.Property(
-                        name="question",
-                        data_type=weaviate.classes.config.DataType.TEXT
-                    ),
-                    weaviate.classes.config.Property(
-                        name="response",
-                        data_type=weaviate.classes.config.DataType.TEXT
-                    ),
-                    weaviate.classes.config.Property(
-                        name="timestamp",
-                        data_type=weaviate.classes.config.DataType.TEXT
-                    )
-                ]
-            )
-        
-        followup_col = client.collections.get("FollowupQuestion")
-        followup_col.data.insert(
-            properties={
-                "question_id": followup.question_id,
-                "discussion_id": followup.discussion_id,
-                "question": followup.question,
-                "response": followup.response,
-                "timestamp": followup.timestamp.isoformat()
-            }
-        )
+        write_object(client, "FollowupQuestion", {
+            "question_id": followup.question_id,
+            "discussion_id": followup.discussion_id,
+            "question": followup.question,
+            "response": followup.response,
+            "timestamp": followup.timestamp.isoformat()
+        }, vector=get_history_index().embed_turn(followup))
+        get_discussion_cache().append_followup(followup)
         print(f"Stored followup question: {followup.question_id}")
     except Exception as e:
         print(f"Error storing followup question: {e}")
 
+def _followup_from_properties(props: dict) -> FollowupQuestion:
+    return FollowupQuestion(
+        question_id=props.get("question_id"),
+        discussion_id=props.get("discussion_id"),
+        question=props.get("question"),
+        response=props.get("response"),
+        timestamp=datetime.fromisoformat(props.get("timestamp")),
+        cards_drawn=[]
+    )
+
+def get_discussion_history_page(discussion_id: str, client, after: Optional[str] = None,
+                                limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[FollowupQuestion], Optional[str]]:
+    """
+    One page of a discussion's followups in chronological order, filtered and
+    sorted by Weaviate. Returns the followups and the cursor of the next page.
+    Raises ValueError for a malformed `after` cursor.
+    """
+    if not collection_available(client, "FollowupQuestion"):
+        return [], None
+
+    page = fetch_page(
+        client.collections.get("FollowupQuestion"),
+        "timestamp",
+        filters=Filter.by_property("discussion_id").equal(discussion_id),
+        limit=limit,
+        after=after
+    )
+    return [_followup_from_properties(obj.properties) for obj in page.objects], page.next_cursor
+
 def get_discussion_history(discussion_id: str, client) -> List[FollowupQuestion]:
     """
     Get the discussion history for a given discussion ID.
+    Served from the discussion cache when the complete history is cached.
     """
+    state = get_discussion_cache().get(discussion_id)
+    if state is not None and state.followups is not None:
+        return state.followups
     try:
-        if not client.collections.exists("FollowupQuestion"):
+        if not collection_available(client, "FollowupQuestion"):
             return []
-            
-        followup_col = client.collections.get("FollowupQuestion")
-        result = followup_col.query.fetch_objects(
-            limit=100  # Reasonable limit to avoid fetching too many objects
+
+        objects = iterate_all(
+            client.collections.get("FollowupQuestion"),
+            "timestamp",
+            filters=Filter.by_property("discussion_id").equal(discussion_id)
         )
-        
-        # Filter manually and sort by timestamp
-        filtered_followups = []
-        for obj in result.objects:
-            if obj.properties.get("discussion_id") == discussion_id:
-                filtered_followups.append(obj)
-        
-        # Sort by timestamp
-        filtered_followups.sort(key=lambda x: x.properties.get("timestamp", ""))
-        
-        followups = []
-        for obj in filtered_followups:
-            props = obj.properties
-            followup_data = {
-                "question_id": props.get("question_id"),
-                "discussion_id": props.get("discussion_id"),
-                "question": props.get("question"),
-                "response": props.get("response"),
-                "timestamp": datetime.fromisoformat(props.get("timestamp")),
-                "cards_drawn": []  
-            }
-            followups.append(FollowupQuestion(**followup_data))
-        
+        followups = [_followup_from_properties(obj.properties) for obj in objects]
+        get_discussion_cache().remember_history(discussion_id, followups)
         return followups
     except Exception as e:
         print(f"Error getting discussion history: {e}")
         return []
 
-def build_followup_prompt(question: str, original_cards: List[CardLayout], history: List[FollowupQuestion]) -> str:
+def build_followup_prompt(question: str, original_cards: List[CardLayout], history: List[FollowupQuestion],
+                          summary: Optional[DiscussionSummary] = None,
+                          relevant: Optional[List[FollowupQuestion]] = None) -> str:
     """
     Build followup prompt using the original cards from the discussion.
+    The conversation context is the rolling summary plus the `relevant`
+    earlier turns and the latest one (the most recent turns when nothing was
+    retrieved), within FOLLOWUP_HISTORY_TOKEN_BUDGET.
     TODO: Implement context-aware reading enhancement
     """
-    context = ""
-    if history:
-        context = "Previous conversation context:\n"
-        for i, h in enumerate(history, 1):
-            context += f"Q{i}: {h.question}\nA{i}: {h.response}\n\n"
+    context = render_followup_context(history or [], summary, relevant=relevant)
 
     picks = original_cards[:3]
 
     base_prompt = build_tarot_prompt(question, picks)
 
     if context:
-        return f"{context}\nCurrent question based on the same cards:\n{base_prompt}"
+        return prefix_prompt(f"{context}\nCurrent question based on the same cards:\n", base_prompt)
     else:
         return base_prompt
 
-def call_gemini_api_followup(question: str, original_cards: List[CardLayout], history: List[FollowupQuestion] = None) -> str:
+def call_gemini_api_followup(question: str, original_cards: List[CardLayout], history: List[FollowupQuestion] = None,
+                             summary: Optional[DiscussionSummary] = None,
+                             relevant: Optional[List[FollowupQuestion]] = None) -> str:
     """
     Call the Gemini API for followup questions using original cards from the discussion.
     """
-    prompt = build_followup_prompt(question, original_cards, history)
+    prompt = build_followup_prompt(question, original_cards, history, summary, relevant)
     return call_gemini_api(prompt)
 
+async def call_gemini_api_followup_async(question: str, original_cards: List[CardLayout], history: List[FollowupQuestion] = None,
+                                         summary: Optional[DiscussionSummary] = None,
+                                         relevant: Optional[List[FollowupQuestion]] = None) -> str:
+    """
+    Async variant of `call_gemini_api_followup`.
+    """
+    prompt = build_followup_prompt(question, original_cards, history, summary, relevant)
+    return await call_gemini_api_async(prompt)
+
+def refresh_discussion_summary(discussion_id: str, client) -> Optional[DiscussionSummary]:
+    """
+    Fold followups that left the verbatim window into the discussion's rolling
+    summary. Called after a followup was stored; failures are only logged.
+    """
+    try:
+        history = get_discussion_history(discussion_id, client)
+        return update_discussion_summary(discussion_id, history, client, summarize=call_gemini_api)
+    except Exception as e:
+        logger.error(f"Failed to refresh summary for discussion {discussion_id}: {e}")
+        return None
+
+DISCUSSION_LIST_PROPERTIES = ["discussion_id", "initial_question", "created_at", "card_names", "response_preview"]
+
+def get_user_discussions_page(user_id: str, client, after: Optional[str] = None,
+                              limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[DiscussionListItem], Optional[str]]:
+    """
+    One page of a user's discussions, newest first, as lightweight list items.
+    Only the summary properties are read from Weaviate; the full reading and
+    the cards JSON are loaded by `get_discussion` on detail fetch.
+    Raises ValueError for a malformed `after` cursor.
+    """
+    if not collection_available(client, "Discussion"):
+        return [], None
+
+    page = fetch_page(
+        client.collections.get("Discussion"),
+        "created_at",
+        filters=Filter.by_property("user_id").equal(user_id),
+        limit=limit,
+        after=after,
+        ascending=False,
+        return_properties=DISCUSSION_LIST_PROPERTIES
+    )
+    items = []
+    for obj in page.objects:
+        props = obj.properties
+        items.append(DiscussionListItem(
+            discussion_id=props.get("discussion_id"),
+            initial_question=props.get("initial_question") or "",
+            created_at=datetime.fromisoformat(props.get("created_at")),
+            card_names=props.get("card_names") or [],
+            response_preview=props.get("response_preview") or ""
+        ))
+    return items, page.next_cursor
+
 def get_user_discussions_list(user_id: str, client) -> List[Discussion]:
     try:
-        if not client.collections.exists("Discussion"):
+        if not collection_available(client, "Discussion"):
             return []
-            
-        discussion_col = client.collections.get("Discussion")
-        result = discussion_col.query.fetch_objects(
-            limit=1000  # Higher limit for user discussions
-        )
-        
-        # Filter manually and sort by created_at
-        filtered_discussions = []
-        for obj in result.objects:
-            if obj.properties.get("user_id") == user_id:
-                filtered_discussions.append(obj)
         
-        # Sort by created_at (descending - most recent first)
-        filtered_discussions.sort(key=lambda x: x.properties.get("created_at", ""), reverse=True)
+        # Filtered by user and sorted by created_at (most recent first) in Weaviate
+        objects = iterate_all(
+            client.collections.get("Discussion"),
+            "created_at",
+            filters=Filter.by_property("user_id").equal(user_id),
+            ascending=False
+        )
         
         discussions = []
-        for obj in filtered_discussions:
+        for obj in objects:
             props = obj.properties
             
-            cards_drawn = []
-            if props.get("cards_drawn"):
-                cards_drawn = parse_cards_drawn(props.get("cards_drawn"))
+            cards_drawn = cards_from_properties(props, legacy_parser=parse_cards_drawn)
             
             discussion_data = {
                 "discussion_id": props.get("discussion_id"),
@@ -392,12 +584,10 @@ def get_user_discussions_list(user_id: str, client) -> List[Discussion]:
         print(f"Error getting user discussions: {e}")
         return []
 
-def start_discussion(user_id: str, discussion_id: str, initial_question: str, client) -> Discussion:
-    """
-    Start a new discussion with initial question and draw tarot cards.
-    This function creates a new discussion, draws cards, generates the initial response,
-    and enhances it with feedback context from similar past readings.
-    """
+FALLBACK_READING = "I apologize, but I was unable to generate a reading at this time. Please try again."
+
+def _draw_discussion_cards(user_id: str, discussion_id: str, initial_question: str) -> List[CardLayout]:
+    """Fetch the deck and draw the spread for a new discussion."""
     logger.info(f"Starting new discussion for user {user_id}: {initial_question}")
     logger.debug(f"New discussion ID: {discussion_id}")
     
@@ -412,15 +602,15 @@ def start_discussion(user_id: str, discussion_id: str, initial_question: str, cl
     logger.info(f"Drew {len(picks)} cards for reading")
     
     logger.debug(f"Cards drawn: {[card.name for card in picks]}")
+    return picks
 
-    prompt = build_tarot_prompt(initial_question, picks)
-    logger.debug(f"Generated prompt length: {len(prompt)} characters")
-    
-    base_response = call_gemini_api(prompt)
+def _finalize_discussion(user_id: str, discussion_id: str, initial_question: str,
+                         picks: List[CardLayout], base_response: str, client) -> Discussion:
+    """Enhance the generated reading with feedback context, then build and store the discussion."""
     logger.info(f"Generated base response length: {len(base_response) if base_response else 0} characters")
     
     if not base_response:
-        base_response = "I apologize, but I was unable to generate a reading at this time. Please try again."
+        base_response = FALLBACK_READING
         logger.warning("Using fallback response due to empty base_response")
     
     try:
@@ -449,7 +639,7 @@ def start_discussion(user_id: str, discussion_id: str, initial_question: str, cl
         initial_response = base_response
     
     if not initial_response:
-        initial_response = "I apologize, but I was unable to generate a reading at this time. Please try again."
+        initial_response = FALLBACK_READING
     
     discussion = Discussion(
         discussion_id=discussion_id,
@@ -464,38 +654,136 @@ def start_discussion(user_id: str, discussion_id: str, initial_question: str, cl
     
     return discussion
 
-def parse_cards_drawn(cards_drawn_str: str) -> List[CardLayout]:
+def start_discussion(user_id: str, discussion_id: str, initial_question: str, client) -> Discussion:
     """
-    Safely parse cards_drawn from Weaviate storage format.
-    Handles JSON parsing errors, null values, and various data formats.
+    Start a new discussion with initial question and draw tarot cards.
+    This function creates a new discussion, draws cards, generates the initial response,
+    and enhances it with feedback context from similar past readings.
     """
-    if not cards_drawn_str:
-        return []
+    picks = _draw_discussion_cards(user_id, discussion_id, initial_question)
+
+    base_response = generate_reading(initial_question, picks)
     
-    cards_drawn = []
-    try:
-        cleaned_str = cards_drawn_str.replace("null", "null")  
-        cards_data = json.loads(cleaned_str.replace("'", '"'))
-        
-        if isinstance(cards_data, list):
-            cards_drawn = [CardLayout(**card_data) for card_data in cards_data if card_data is not None]
-        else:
-            print(f"Warning: cards_drawn is not a list: {type(cards_data)}")
-            
-    except (json.JSONDecodeError, TypeError) as e:
-        print(f"Error parsing cards_drawn as JSON: {e}")
-        try:
-            eval_str = cards_drawn_str.replace("null", "None")
-            cards_data = ast.literal_eval(eval_str)  
-            if isinstance(cards_data, list):
-                cards_drawn = [CardLayout(**card_data) for card_data in cards_data if card_data is not None]
-            else:
-                print(f"Warning: eval result is not a list: {type(cards_data)}")
-        except Exception as e2:
-            print(f"Error with literal_eval fallback: {e2}")
-            cards_drawn = []
-    except Exception as e:
-        print(f"Unexpected error parsing cards_drawn: {e}")
-        cards_drawn = []
+    return _finalize_discussion(user_id, discussion_id, initial_question, picks, base_response, client)
+
+async def start_discussion_async(user_id: str, discussion_id: str, initial_question: str, client) -> Discussion:
+    """
+    Async variant of `start_discussion` for FastAPI handlers.
+    Gemini is awaited on the event loop; blocking Weaviate work runs in a worker thread.
+    """
+    picks = await asyncio.to_thread(_draw_discussion_cards, user_id, discussion_id, initial_question)
+
+    base_response = await generate_reading_async(initial_question, picks)
     
-    return cards_drawn
\ No newline at end of file
+    return await asyncio.to_thread(
+        _finalize_discussion, user_id, discussion_id, initial_question, picks, base_response, client
+    )
+
+async def stream_start_discussion(user_id: str, discussion_id: str, initial_question: str,
+                                  client) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Streaming variant of `start_discussion`.
+    Yields ("cards", ...) as soon as the spread is drawn, then ("token", ...) for each
+    Gemini chunk and finally ("done", ...) once the discussion is enhanced and stored.
+    """
+    picks = await asyncio.to_thread(_draw_discussion_cards, user_id, discussion_id, initial_question)
+    yield "cards", {
+        "discussion_id": discussion_id,
+        "user_id": user_id,
+        "initial_question": initial_question,
+        "cards_drawn": [card.model_dump() for card in picks]
+    }
+
+    cache = get_reading_cache()
+    timing = {}
+    cached = await asyncio.to_thread(cache.get, initial_question, picks)
+    if cached is not None:
+        chunks = [cached]
+        timing.update({"ttft_ms": 0.0, "total_ms": 0.0, "cached": True})
+        yield "token", {"text": cached}
+    else:
+        prompt = build_tarot_prompt(initial_question, picks)
+        chunks = []
+        error = None
+        if _gemini_breaker.allow():
+            started = time.monotonic()
+            try:
+                async for text in _stream_with_timing(prompt, "discussion_start_stream", timing):
+                    chunks.append(text)
+                    yield "token", {"text": text}
+                _gemini_breaker.record_success(time.monotonic() - started)
+            except Exception as e:
+                _gemini_breaker.record_error(e)
+                if chunks or not gemini_unavailable(e):
+                    raise
+                error = e
+            except BaseException:
+                # Client went away; the call says nothing about Gemini's health
+                _gemini_breaker.release()
+                raise
+        else:
+            error = CircuitOpenError("gemini circuit is open")
+
+        if error is None:
+            await asyncio.to_thread(cache.set, initial_question, picks, "".join(chunks))
+        else:
+            # Nothing was streamed yet, so the whole reading can come from the offline composer
+            offline = _offline_reading(initial_question, picks, error)
+            chunks = [offline]
+            timing.update({"ttft_ms": 0.0, "total_ms": 0.0, "offline": True})
+            yield "token", {"text": offline}
+
+    discussion = await asyncio.to_thread(
+        _finalize_discussion, user_id, discussion_id, initial_question, picks, "".join(chunks), client
+    )
+    yield "done", {
+        "discussion_id": discussion.discussion_id,
+        "initial_response": discussion.initial_response,
+        "created_at": discussion.created_at.isoformat(),
+        **timing
+    }
+
+async def stream_followup(discussion: Discussion, question: str, history: List[FollowupQuestion],
+                          client, summary: Optional[DiscussionSummary] = None,
+                          relevant: Optional[List[FollowupQuestion]] = None) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Streaming variant of the followup flow for an existing discussion.
+    The followup is stored once the stream completes and the rolling
+    summary is refreshed after the `done` event.
+    """
+    yield "cards", {
+        "discussion_id": discussion.discussion_id,
+        "cards_drawn": [card.model_dump() for card in discussion.cards_drawn]
+    }
+
+    prompt = build_followup_prompt(question, discussion.cards_drawn, history, summary, relevant)
+    timing = {}
+    chunks = []
+    async for text in _stream_with_timing(prompt, "followup_stream", timing):
+        chunks.append(text)
+        yield "token", {"text": text}
+
+    followup = FollowupQuestion(
+        question_id=str(uuid.uuid4()),
+        discussion_id=discussion.discussion_id,
+        question=question,
+        response="".join(chunks),
+        timestamp=datetime.now(),
+    )
+    await asyncio.to_thread(store_followup_question, followup, client)
+    yield "done", {
+        "question_id": followup.question_id,
+        "discussion_id": followup.discussion_id,
+        "question": followup.question,
+        "response": followup.response,
+        "timestamp": followup.timestamp.isoformat(),
+        **timing
+    }
+    await asyncio.to_thread(refresh_discussion_summary, discussion.discussion_id, client)
+
+def parse_cards_drawn(cards_drawn_str: str) -> List[CardLayout]:
+    """
+    Parse the legacy JSON-text `cards_drawn` property of rows written before
+    cards were stored as the typed `cards` property.
+    """
+    return parse_legacy_cards(cards_drawn_str)
@@ -0,0 +1,212 @@
+"""
+Response cache for tarot readings.
+
+Readings are keyed by a normalized form of the question (case, whitespace and
+punctuation folded) combined with the exact spread: every card's position,
+name and orientation. Entries live in an in-process LRU with per-entry TTL
+and can optionally be mirrored to Redis through `server.cache.CacheManager`
+(attached at startup with `attach_remote`).
+
+Setting `READING_CACHE_SIMILARITY_THRESHOLD` enables an opt-in second lookup
+that embeds the question and reuses a cached reading for the same spread when
+the cosine similarity with a previously answered question is above the
+threshold.
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from app.models import CardLayout
+from app.logger_config import get_tarot_logger
+from app.metrics import metrics
+from app.gemini_runtime import get_gemini_runtime
+
+logger = get_tarot_logger(__name__)
+
+READING_CACHE_SIZE = int(os.getenv("READING_CACHE_SIZE", "1024"))
+READING_CACHE_TTL = int(os.getenv("READING_CACHE_TTL", "86400"))
+READING_CACHE_SIMILARITY_THRESHOLD = (
+    float(os.getenv("READING_CACHE_SIMILARITY_THRESHOLD"))
+    if os.getenv("READING_CACHE_SIMILARITY_THRESHOLD") else None
+)
+# Questions remembered per spread for similarity matching
+SIMILARITY_CANDIDATES_PER_SPREAD = 32
+EMBEDDING_MODEL = "text-embedding-004"
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Fold case, punctuation and whitespace so trivially different questions match."""
+    folded = _PUNCTUATION.sub(" ", question.casefold())
+    return _WHITESPACE.sub(" ", folded).strip()
+
+
+def spread_signature(picks: List[CardLayout]) -> str:
+    """Exact identity of a spread: position, card name and orientation of every card."""
+    return "|".join(
+        f"{card.position}:{card.name}:{'U' if card.upright else 'R'}" for card in picks
+    )
+
+
+def reading_cache_key(question: str, picks: List[CardLayout]) -> str:
+    raw = f"{normalize_question(question)}\n{spread_signature(picks)}"
+    return "reading:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def embed_question(text: str) -> List[float]:
+    """Embed a question with the shared Gemini client."""
+    result = get_gemini_runtime().client.models.embed_content(model=EMBEDDING_MODEL, contents=text)
+    return list(result.embeddings[0].values)
+
+
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ReadingCache:
+    """
+    LRU + TTL cache of generated readings with an optional remote tier.
+    """
+
+    def __init__(self, max_entries: int = READING_CACHE_SIZE, ttl: int = READING_CACHE_TTL,
+                 remote=None, similarity_threshold: Optional[float] = READING_CACHE_SIMILARITY_THRESHOLD,
+                 embedder: Callable[[str], List[float]] = embed_question):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.remote = remote
+        self.similarity_threshold = similarity_threshold
+        self._embedder = embedder
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._embeddings: Dict[str, Deque[Tuple[List[float], str]]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._remote_hits = 0
+        self._similar_hits = 0
+
+    def attach_remote(self, remote) -> None:
+        """Use a `CacheManager`-like object (get/set/delete) as second tier."""
+        self.remote = remote
+
+    def get(self, question: str, picks: List[CardLayout]) -> Optional[str]:
+        """Return a cached reading for this question and spread, if any."""
+        key = reading_cache_key(question, picks)
+
+        answer = self._get_local(key)
+        if answer is None and self.remote is not None:
+            answer = self.remote.get(key)
+            if answer is not None:
+                self._set_local(key, answer, self.ttl)
+                self._record("remote_hits")
+        if answer is None and self.similarity_threshold is not None:
+            answer = self._get_similar(question, picks)
+            if answer is not None:
+                self._record("similar_hits")
+
+        self._record("hits" if answer is not None else "misses")
+        return answer
+
+    def set(self, question: str, picks: List[CardLayout], answer: str, ttl: Optional[int] = None) -> None:
+        """Cache a generated reading. Empty answers are never cached."""
+        if not answer:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        key = reading_cache_key(question, picks)
+        self._set_local(key, answer, ttl)
+        if self.remote is not None:
+            self.remote.set(key, answer, expire=ttl)
+        if self.similarity_threshold is not None:
+            self._remember_embedding(question, picks, key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._embeddings.clear()
+            self._hits = self._misses = self._remote_hits = self._similar_hits = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "remote_hits": self._remote_hits,
+                "similar_hits": self._similar_hits,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "miss_ratio": round(self._misses / lookups, 4) if lookups else 0.0,
+            }
+
+    def _record(self, name: str) -> None:
+        with self._lock:
+            setattr(self, f"_{name}", getattr(self, f"_{name}") + 1)
+        metrics.increment(f"reading_cache.{name}")
+
+    def _get_local(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            answer, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return answer
+
+    def _set_local(self, key: str, answer: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (answer, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _remember_embedding(self, question: str, picks: List[CardLayout], key: str) -> None:
+        try:
+            embedding = self._embedder(normalize_question(question))
+        except Exception as e:
+            logger.warning(f"Could not embed question for reading cache: {e}")
+            return
+        with self._lock:
+            candidates = self._embeddings.setdefault(
+                spread_signature(picks), deque(maxlen=SIMILARITY_CANDIDATES_PER_SPREAD)
+            )
+            candidates.append((embedding, key))
+
+    def _get_similar(self, question: str, picks: List[CardLayout]) -> Optional[str]:
+        with self._lock:
+            candidates = list(self._embeddings.get(spread_signature(picks), ()))
+        if not candidates:
+            return None
+        try:
+            embedding = self._embedder(normalize_question(question))
+        except Exception as e:
+            logger.warning(f"Could not embed question for reading cache: {e}")
+            return None
+
+        best_key, best_score = None, self.similarity_threshold
+        for candidate, key in candidates:
+            score = cosine_similarity(embedding, candidate)
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        return self._get_local(best_key)
+
+
+_reading_cache = ReadingCache()
+
+
+def get_reading_cache() -> ReadingCache:
+    """Return the process-wide reading cache."""
+    return _reading_cache
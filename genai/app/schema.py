@@ -0,0 +1,278 @@
+"""
+Declarative schema of every Weaviate collection used by TarotAI.
+
+`SCHEMAS` is the single definition of the collections that were previously
+created ad hoc by `server.initialize_feedback_collections`, `rag_engine`,
+`discussion_memory` and `vector-db/vectordb_init.py`. `bootstrap()` runs once
+at startup: it creates missing collections, adds properties missing from
+existing ones and logs type or tokenization mismatches it cannot fix. The
+result is cached, so storage code asks `collection_available()` /
+`ensure_collection()` instead of calling `client.collections.exists` on every
+request.
+
+Timestamps used as pagination sort keys are FIELD-tokenized TEXT: they are
+naive ISO strings (no timezone, so not valid DATE values) and only compare
+correctly in range filters when indexed as one token. Weaviate cannot change
+the tokenization of an existing property; collections created before that are
+rebuilt with `tools/migrate_sort_keys.py`.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from weaviate.classes.config import Configure, DataType, Property, ReferenceProperty, Tokenization
+
+from app.card_codec import cards_property
+from app.logger_config import get_tarot_logger
+
+logger = get_tarot_logger(__name__)
+
+
+class CollectionSpec(NamedTuple):
+    name: str
+    properties: List[Property]
+    references: List[ReferenceProperty] = []
+    # Factory of the vectorizer config; None keeps the server default
+    vectorizer: Optional[Callable] = None
+
+
+def _text(name: str, field: bool = False) -> Property:
+    if field:
+        return Property(name=name, data_type=DataType.TEXT, tokenization=Tokenization.FIELD)
+    return Property(name=name, data_type=DataType.TEXT)
+
+
+# Referenced collections come before the collections referencing them
+SCHEMAS: List[CollectionSpec] = [
+    CollectionSpec(
+        name="KeywordMeaning",
+        properties=[
+            _text("keyword"),
+            _text("meaning"),
+            Property(name="feedback", data_type=DataType.TEXT_ARRAY),
+            _text("source"),
+            _text("orientation"),
+            Property(name="position", data_type=DataType.INT),
+            _text("card_name", field=True),
+            _text("created_at", field=True),
+            _text("updated_at"),
+        ],
+        vectorizer=Configure.Vectorizer.text2vec_weaviate
+    ),
+    CollectionSpec(
+        name="TarotCard",
+        properties=[
+            _text("name"),
+            _text("number"),
+            _text("arcana"),
+            _text("suit"),
+            _text("img"),
+            Property(name="fortune_telling", data_type=DataType.TEXT_ARRAY),
+            Property(name="keywords", data_type=DataType.TEXT_ARRAY),
+            Property(name="meanings_light", data_type=DataType.TEXT_ARRAY),
+            Property(name="meanings_shadow", data_type=DataType.TEXT_ARRAY),
+            _text("archetype"),
+            _text("hebrew_alphabet"),
+            _text("numerology"),
+            _text("elemental"),
+            _text("mythical_spiritual"),
+            Property(name="questions_to_ask", data_type=DataType.TEXT_ARRAY),
+        ],
+        references=[ReferenceProperty(name="keywordsMeaning", target_collection="KeywordMeaning")],
+        vectorizer=Configure.Vectorizer.text2vec_weaviate
+    ),
+    CollectionSpec(
+        name="DeckMeta",
+        properties=[
+            _text("version"),
+            Property(name="card_count", data_type=DataType.INT),
+            _text("updated_at"),
+        ],
+        vectorizer=Configure.Vectorizer.none
+    ),
+    CollectionSpec(
+        name="Discussion",
+        properties=[
+            _text("discussion_id", field=True),
+            _text("user_id", field=True),
+            _text("created_at", field=True),
+            _text("initial_question"),
+            _text("initial_response"),
+            cards_property(),
+            Property(name="card_names", data_type=DataType.TEXT_ARRAY),
+            _text("response_preview"),
+        ]
+    ),
+    CollectionSpec(
+        name="FollowupQuestion",
+        properties=[
+            _text("question_id", field=True),
+            _text("discussion_id", field=True),
+            _text("question"),
+            _text("response"),
+            _text("timestamp", field=True),
+        ],
+        # Vectors are supplied by app.history_index when followups are stored
+        vectorizer=Configure.Vectorizer.none
+    ),
+    CollectionSpec(
+        name="DiscussionSummary",
+        properties=[
+            _text("discussion_id", field=True),
+            _text("summary"),
+            Property(name="turns_summarized", data_type=DataType.INT),
+            _text("updated_at"),
+        ]
+    ),
+    CollectionSpec(
+        name="Feedback",
+        properties=[
+            _text("user_id", field=True),
+            _text("question"),
+            _text("model_response"),
+            _text("feedback_text"),
+            Property(name="rating", data_type=DataType.INT),
+            _text("discussion_id", field=True),
+            _text("timestamp", field=True),
+            cards_property(),
+        ]
+    ),
+    CollectionSpec(
+        name="ReadingContext",
+        properties=[
+            _text("question"),
+            _text("model_response"),
+            _text("user_feedback"),
+            Property(name="rating", data_type=DataType.INT),
+            _text("user_id", field=True),
+            _text("discussion_id", field=True),
+            _text("timestamp", field=True),
+            _text("spread_info"),
+            Property(name="total_cards", data_type=DataType.INT),
+            _text("question_type"),
+            _text("source"),
+        ]
+    ),
+]
+
+
+class SchemaRegistry:
+    """
+    Creates or validates the collections in `specs` and remembers which ones
+    are known to exist, so the check happens once per process.
+    """
+
+    def __init__(self, specs: Iterable[CollectionSpec] = SCHEMAS):
+        self.specs: Dict[str, CollectionSpec] = {spec.name: spec for spec in specs}
+        self._available = set()
+        self._lock = threading.Lock()
+
+    def bootstrap(self, client, names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Create or validate every collection (or only `names`). Returns the
+        outcome per collection: "created", "updated" (properties added) or "ok".
+        """
+        report = {}
+        for name in names or self.specs:
+            with self._lock:
+                report[name] = self._bootstrap_locked(client, self.specs[name])
+        logger.info(f"Weaviate schema ready: {report}")
+        return report
+
+    def ensure_collection(self, client, name: str) -> None:
+        """Create or validate one collection unless that already happened."""
+        if name in self._available:
+            return
+        with self._lock:
+            if name not in self._available:
+                self._bootstrap_locked(client, self.specs[name])
+
+    def collection_available(self, client, name: str) -> bool:
+        """
+        Whether the collection exists. Answered from the cache after
+        `bootstrap()`; otherwise checked once and cached when it exists.
+        """
+        if name in self._available:
+            return True
+        if client.collections.exists(name):
+            self._available.add(name)
+            return True
+        return False
+
+    def reset(self) -> None:
+        """Forget what is known to exist (mainly for tests)."""
+        with self._lock:
+            self._available.clear()
+
+    def _bootstrap_locked(self, client, spec: CollectionSpec) -> str:
+        if not client.collections.exists(spec.name):
+            create_collection(client, spec)
+            self._available.add(spec.name)
+            logger.info(f"Created {spec.name} collection")
+            return "created"
+
+        outcome = self._validate(client.collections.get(spec.name), spec)
+        self._available.add(spec.name)
+        return outcome
+
+    @staticmethod
+    def _validate(collection, spec: CollectionSpec) -> str:
+        existing = {prop.name: prop for prop in collection.config.get().properties}
+        added = []
+        for prop in spec.properties:
+            if prop.name not in existing:
+                collection.config.add_property(prop)
+                added.append(prop.name)
+            elif existing[prop.name].data_type.value != prop.dataType.value:
+                logger.warning(f"{spec.name}.{prop.name} is {existing[prop.name].data_type.value}, "
+                               f"schema expects {prop.dataType.value}")
+            else:
+                current = tokenization_of(existing[prop.name].data_type, existing[prop.name].tokenization)
+                expected = tokenization_of(prop.dataType, prop.tokenization)
+                if current != expected:
+                    logger.warning(f"{spec.name}.{prop.name} is {current}-tokenized, schema expects {expected}; "
+                                   f"rebuild it with tools/migrate_sort_keys.py")
+        if added:
+            logger.info(f"Added properties {added} to {spec.name}")
+            return "updated"
+        return "ok"
+
+
+def tokenization_of(data_type, tokenization) -> Optional[str]:
+    """
+    Effective tokenization of a property as a string: TEXT properties declared
+    without one use Weaviate's default ("word"), other data types have none.
+    """
+    if data_type.value not in (DataType.TEXT.value, DataType.TEXT_ARRAY.value):
+        return None
+    return tokenization.value if tokenization is not None else Tokenization.WORD.value
+
+
+def create_collection(client, spec: CollectionSpec, name: Optional[str] = None) -> None:
+    """Create the collection described by `spec`, optionally under another name."""
+    kwargs = {}
+    if spec.references:
+        kwargs["references"] = list(spec.references)
+    if spec.vectorizer is not None:
+        kwargs["vectorizer_config"] = spec.vectorizer()
+    client.collections.create(name=name or spec.name, properties=list(spec.properties), **kwargs)
+
+
+_registry = SchemaRegistry()
+
+
+def get_schema_registry() -> SchemaRegistry:
+    """Return the process-wide schema registry."""
+    return _registry
+
+
+def bootstrap_schema(client) -> Dict[str, str]:
+    return _registry.bootstrap(client)
+
+
+def ensure_collection(client, name: str) -> None:
+    _registry.ensure_collection(client, name)
+
+
+def collection_available(client, name: str) -> bool:
+    return _registry.collection_available(client, name)
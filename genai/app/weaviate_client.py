@@ -1,19 +1,132 @@
 """
 Weaviate client utilities for TarotAI.
+
+`get_weaviate_client()` opens a brand new connection and is kept for scripts
+and tests. Request handlers and engine code should use
+`get_shared_weaviate_client()`, which hands out the single long-lived client
+owned by the process (created in the FastAPI lifespan handler).
 """
 
 import os
+import threading
+import time
+from typing import Callable, Optional
+
 import weaviate
 from weaviate.classes.init import Auth
 
+from app.logger_config import get_tarot_logger
+
+logger = get_tarot_logger(__name__)
+
+# Seconds between health checks of the shared client
+HEALTH_CHECK_INTERVAL = float(os.getenv("WEAVIATE_HEALTH_CHECK_INTERVAL", "30"))
+
 
 def get_weaviate_client():
     """Initialize and return Weaviate client"""
     WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
     WEAVIATE_API_KEY = os.getenv("WEAVIATE_API_KEY", "")
-    
+
     return weaviate.connect_to_weaviate_cloud(
         cluster_url=WEAVIATE_URL,
         auth_credentials=Auth.api_key(WEAVIATE_API_KEY),
         skip_init_checks=True,
     )
+
+
+class WeaviateClientManager:
+    """
+    Owns one long-lived Weaviate client for the whole process.
+
+    The client is created lazily (or eagerly via `connect()` at startup),
+    health-checked at most once every `health_check_interval` seconds and
+    transparently replaced when the check fails.
+    """
+
+    def __init__(self, factory: Callable = get_weaviate_client,
+                 health_check_interval: float = HEALTH_CHECK_INTERVAL):
+        self._factory = factory
+        self.health_check_interval = health_check_interval
+        self._client = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """Create the shared client if it does not exist yet and return it."""
+        with self._lock:
+            if self._client is None:
+                logger.info("Opening shared Weaviate connection")
+                self._client = self._factory()
+                self._last_check = time.monotonic()
+            return self._client
+
+    def get_client(self):
+        """
+        Return the shared client, reconnecting if the periodic health check fails.
+        """
+        client = self._client
+        if client is not None and time.monotonic() - self._last_check < self.health_check_interval:
+            return client
+
+        with self._lock:
+            if self._client is not None and time.monotonic() - self._last_check >= self.health_check_interval:
+                if not self._is_healthy(self._client):
+                    logger.warning("Shared Weaviate client failed health check, reconnecting")
+                    self._close_quietly(self._client)
+                    self._client = None
+                else:
+                    self._last_check = time.monotonic()
+
+            if self._client is None:
+                logger.info("Opening shared Weaviate connection")
+                self._client = self._factory()
+                self._last_check = time.monotonic()
+
+            return self._client
+
+    def close(self) -> None:
+        """Close the shared client. A later `get_client()` reconnects."""
+        with self._lock:
+            if self._client is not None:
+                logger.info("Closing shared Weaviate connection")
+                self._close_quietly(self._client)
+                self._client = None
+
+    @staticmethod
+    def _is_healthy(client) -> bool:
+        try:
+            return bool(client.is_connected() and client.is_ready())
+        except Exception as e:
+            logger.warning(f"Weaviate health check error: {e}")
+            return False
+
+    @staticmethod
+    def _close_quietly(client) -> None:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning(f"Error closing Weaviate client: {e}")
+
+
+_client_manager = WeaviateClientManager()
+
+
+def get_client_manager() -> WeaviateClientManager:
+    """Return the process-wide client manager."""
+    return _client_manager
+
+
+def init_weaviate_client():
+    """Open the shared Weaviate client (called once from the lifespan handler)."""
+    return _client_manager.connect()
+
+
+def get_shared_weaviate_client():
+    """Return the shared, health-checked Weaviate client. Callers must not close it."""
+    return _client_manager.get_client()
+
+
+def close_weaviate_client() -> None:
+    """Close the shared Weaviate client on shutdown."""
+    _client_manager.close()
@@ -1,11 +1,14 @@
 import redis
 import json
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Attempts of an optimistic read-modify-write before giving up
+UPDATE_RETRIES = 5
+
 class CacheManager:
     def __init__(self):
         self.redis_client = redis.Redis(
@@ -37,6 +40,36 @@ class CacheManager:
         except Exception:
             return False
     
+    def update(self, key: str, fn: Callable[[Optional[Any]], Optional[Any]], expire: int = 3600) -> Optional[Any]:
+        """
+        Atomically replace the value of `key` with `fn(current value)`. `fn`
+        returning None leaves the key unchanged. Retried when another client
+        changed the key in between; the key is dropped if that keeps happening.
+        """
+        if not self.redis_client:
+            return None
+        
+        try:
+            with self.redis_client.pipeline() as pipe:
+                for _ in range(UPDATE_RETRIES):
+                    try:
+                        pipe.watch(key)
+                        raw = pipe.get(key)
+                        value = fn(json.loads(raw) if raw else None)
+                        if value is None:
+                            pipe.unwatch()
+                            return None
+                        pipe.multi()
+                        pipe.setex(key, expire, json.dumps(value, default=str))
+                        pipe.execute()
+                        return value
+                    except redis.WatchError:
+                        continue
+            self.redis_client.delete(key)
+            return None
+        except Exception:
+            return None
+    
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
         if not self.redis_client:
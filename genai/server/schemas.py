@@ -67,6 +67,24 @@ class ReadingRequest(BaseModel):
             raise ValueError('Question cannot be empty')
         return v.strip() if v else v
 
+class BatchReadingItem(BaseModel):
+    """One reading in a batch request"""
+    id: Optional[str] = Field(None, description="Caller-supplied ID echoed back in the result")
+    question: str = Field(..., min_length=1, max_length=500, description="Question to ask")
+    user_id: Optional[str] = Field(None, description="User ID")
+    
+    @field_validator('question')
+    @classmethod
+    def validate_question(cls, v):
+        if len(v.strip()) == 0:
+            raise ValueError('Question cannot be empty')
+        return v.strip()
+
+class BatchReadingRequest(BaseModel):
+    """Many readings generated in one call and streamed back as NDJSON"""
+    readings: List[BatchReadingItem] = Field(..., min_length=1, max_length=100, description="Readings to generate")
+    concurrency: Optional[int] = Field(None, ge=1, le=32, description="Concurrent Gemini calls (server default if omitted)")
+
 class DailyReadingRequest(BaseModel):
     """Daily reading only requires user_id, no question_id or discussion_id"""
     user_id: Optional[str] = Field(None, description="User ID for daily reading")
@@ -119,6 +137,20 @@ class StartDiscussionResponse(BaseModel):
     cards_drawn: List[Dict[str, Any]] = Field(..., description="Cards drawn for this discussion")
     created_at: datetime = Field(..., description="Discussion creation timestamp")
 
+class DiscussionListItemResponse(BaseModel):
+    """Summary of one discussion in a user's history"""
+    discussion_id: str = Field(..., description="Discussion ID")
+    initial_question: str = Field(..., description="Initial question")
+    created_at: datetime = Field(..., description="Discussion creation timestamp")
+    card_names: List[str] = Field(default_factory=list, description="Names of the cards drawn")
+    response_preview: str = Field("", description="Beginning of the initial reading")
+
+class DiscussionListResponse(BaseModel):
+    """One page of a user's discussions, newest first"""
+    user_id: str = Field(..., description="User ID")
+    discussions: List[DiscussionListItemResponse] = Field(default_factory=list, description="Discussions on this page")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, null on the last page")
+
 class DiscussionMessage(BaseModel):
     message_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique message ID")
     discussion_id: str = Field(..., description="Discussion thread ID")
@@ -12,26 +12,47 @@ import asyncio
 # Third-party imports
 import uvicorn
 import weaviate
-from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Query, HTTPException, BackgroundTasks
+from fastapi.responses import JSONResponse, StreamingResponse
 from weaviate.classes.init import Auth
 from weaviate.classes.config import Configure, Property, DataType, ReferenceProperty
+from weaviate.classes.query import Filter
 
 # Local imports
-from app.main import generate_daily_reading
-from app.weaviate_client import get_weaviate_client
+from app.main import generate_daily_reading_async, generate_batch_readings, READINGS_BATCH_CONCURRENCY
+from app.weaviate_client import (
+    init_weaviate_client, get_shared_weaviate_client, close_weaviate_client
+)
 from app.logger_config import get_tarot_logger
+from app.metrics import metrics
+from app.gemini_runtime import get_gemini_runtime
+from app.prompt_loader import get_prompt_templates
+from app.context_cache import get_context_cache, run_context_cache_refresher
+from app.reading_cache import get_reading_cache
+from app.discussion_cache import get_discussion_cache
+from app.schema import bootstrap_schema, collection_available
+from app.feedback_journal import get_feedback_journal, run_compaction_scheduler
+from app.outbox import OUTBOX_DRAIN_TIMEOUT, get_write_outbox, run_outbox_flusher
+from app.daily_reading import DAILY_WARMUP_HOUR, get_daily_store, run_daily_warmup_scheduler
+from server.cache import CacheManager
 from server.schemas import (
-    ReadingRequest, ReadingResponse, DailyReadingRequest, 
+    ReadingRequest, ReadingResponse, DailyReadingRequest, BatchReadingRequest, 
     PredictionRequest, FeedbackRequest, ErrorResponse,
     StartDiscussionRequest, StartDiscussionResponse,
     FollowupQuestionRequest, FollowupQuestionResponse,
+    DiscussionListResponse,
 )
 from app.rag_engine import (
-    start_discussion,
-    get_discussion, get_discussion_history, 
-    call_gemini_api_followup, store_followup_question
+    start_discussion_async, fetch_full_deck,
+    get_discussion, get_discussion_history, get_discussion_history_page,
+    get_user_discussions_page,
+    call_gemini_api_followup_async, store_followup_question,
+    stream_start_discussion, stream_followup, refresh_discussion_summary,
+    get_gemini_flight_stats, get_gemini_breaker
 )
+from app.discussion_memory import get_discussion_summary
+from app.history_index import get_history_index
+from app.pagination import fetch_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.context_aware_reading import ContextAwareReader, enhance_reading_with_feedback_context
 from app.models import Feedback, TarotCard, FollowupQuestion
 from app.feedback import process_user_feedback, get_feedback_stats, FeedbackProcessor
@@ -42,6 +63,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Setup logger
 logger = get_tarot_logger(__name__)
 
+# Headers of streamed responses (SSE and NDJSON): no caching, no proxy buffering
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler for FastAPI."""
@@ -49,23 +73,58 @@ async def lifespan(app: FastAPI):
     try:
         logger.info("Initializing TarotAI server...")
         
-        # Initialize Weaviate client and collections
-        client = get_weaviate_client()
-        initialize_feedback_collections(client)
+        # Open the process-wide Weaviate client and create or validate every collection once
+        client = init_weaviate_client()
+        bootstrap_schema(client)
+        
+        # Precompile the Gemini generation config
+        get_gemini_runtime().generation_config()
+        
+        # Precompile the prompt templates (basic, with-history and per-spread)
+        get_prompt_templates().preload()
+        
+        # Mirror cached readings to Redis when REDIS_HOST is configured
+        if os.getenv("REDIS_HOST"):
+            get_reading_cache().attach_remote(CacheManager())
+            get_daily_store().attach_remote(CacheManager())
+            get_discussion_cache().attach_remote(CacheManager())
+        
+        # Pre-generate daily readings off-peak when DAILY_WARMUP_HOUR is configured
+        warmup_task = None
+        if DAILY_WARMUP_HOUR:
+            warmup_task = asyncio.create_task(run_daily_warmup_scheduler(get_shared_weaviate_client))
+        
+        # Compact past days of the feedback journal in the background
+        compaction_task = asyncio.create_task(run_compaction_scheduler())
+        
+        # Deliver spooled writes (including any left over from the last run) to Weaviate
+        outbox_task = asyncio.create_task(run_outbox_flusher(get_shared_weaviate_client))
+        
+        # Keep the persona and deck glossary in a Gemini context cache
+        context_cache_task = asyncio.create_task(run_context_cache_refresher(get_shared_weaviate_client))
         
         logger.info("TarotAI server initialized successfully")
         
     except Exception as e:
         logger.error(f"Failed to initialize server: {e}")
+        close_weaviate_client()
         raise
-    finally:
-        if 'client' in locals():
-            client.close()
     
     yield
     
     # Shutdown
     logger.info("Shutting down TarotAI server...")
+    if warmup_task is not None:
+        warmup_task.cancel()
+    compaction_task.cancel()
+    outbox_task.cancel()
+    context_cache_task.cancel()
+    await asyncio.to_thread(get_context_cache().close)
+    await asyncio.to_thread(get_write_outbox().drain, get_shared_weaviate_client(), OUTBOX_DRAIN_TIMEOUT)
+    get_write_outbox().close()
+    get_feedback_journal().close()
+    await get_gemini_runtime().aclose()
+    close_weaviate_client()
 
 app = FastAPI(
     title="TarotAI GenAI Service", 
@@ -80,7 +139,7 @@ async def health_check():
     """Health check endpoint with feedback system status."""
     try:
         # Check Weaviate connection
-        client = get_weaviate_client()
+        client = get_shared_weaviate_client()
         weaviate_status = "healthy"
         
         # Check if feedback collections exist
@@ -90,8 +149,6 @@ async def health_check():
             "ReadingContext": client.collections.exists("ReadingContext")
         }
         
-        client.close()
-        
         return {
             "status": "healthy", 
             "timestamp": datetime.utcnow(), 
@@ -111,6 +168,17 @@ async def health_check():
             "error": str(e)
         }
 
+@app.get("/metrics")
+async def get_metrics():
+    """In-process counters and latency statistics for this worker."""
+    snapshot = metrics.snapshot()
+    snapshot["reading_cache"] = get_reading_cache().stats()
+    snapshot["gemini_single_flight"] = get_gemini_flight_stats()
+    snapshot["gemini_breaker"] = get_gemini_breaker().stats()
+    snapshot["gemini_context_cache"] = get_context_cache().stats()
+    snapshot["outbox"] = get_write_outbox().stats()
+    return snapshot
+
 @app.get("/daily-reading")
 async def daily_reading(
     user_id: Optional[str] = Query(None, description="User ID for tracking daily reading")
@@ -123,7 +191,7 @@ async def daily_reading(
         daily_request = DailyReadingRequest(user_id=user_id)
         
         # Generate daily reading using existing function
-        result = generate_daily_reading(user_id)
+        result = await generate_daily_reading_async(user_id)
         
         # Ensure the result includes the reading type
         result["reading_type"] = daily_request.reading_type
@@ -139,37 +207,47 @@ async def daily_reading(
         raise HTTPException(status_code=500, detail="Failed to generate daily reading")
 
 
+@app.post("/readings/batch")
+async def batch_readings(req: BatchReadingRequest):
+    """
+    Generate many readings in one call. Results are streamed back as NDJSON,
+    one line per reading in completion order; failed items carry an `error` field.
+    """
+    logger.info(f"Batch reading request with {len(req.readings)} items")
+    deck = await asyncio.to_thread(fetch_full_deck)
+    if not deck:
+        raise HTTPException(status_code=500, detail="Failed to fetch tarot deck")
+    
+    results = generate_batch_readings(
+        [item.model_dump() for item in req.readings],
+        deck=deck,
+        concurrency=req.concurrency or READINGS_BATCH_CONCURRENCY
+    )
+    
+    async def ndjson():
+        async for result in results:
+            yield json.dumps(result, default=str) + "\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson", headers=STREAM_HEADERS)
+
 @app.post("/discussion/start")
 async def start_new_discussion(req: StartDiscussionRequest):
     try:
         logger.info(f"Starting new discussion for user {req.user_id}: {req.initial_question}")
-        client = get_weaviate_client()
+        client = get_shared_weaviate_client()
         
         # Start discussion
-        discussion = start_discussion(
+        discussion = await start_discussion_async(
             user_id=req.user_id,
             discussion_id=req.discussion_id,
             initial_question=req.initial_question,
             client=client
         )
         
-        # IMPORTANT: Verify the discussion was actually stored and is retrievable
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Try to retrieve the discussion we just created
-                stored_discussion = get_discussion(discussion.discussion_id, client)
-                if stored_discussion:
-                    logger.info(f"Discussion {discussion.discussion_id} successfully verified in storage")
-                    break
-                else:
-                    logger.warning(f"Discussion {discussion.discussion_id} not yet available, attempt {attempt + 1}")
-                    await asyncio.sleep(1)  # Wait 1 second before retry
-            except Exception as e:
-                logger.warning(f"Verification attempt {attempt + 1} failed: {e}")
-                if attempt == max_retries - 1:
-                    raise HTTPException(status_code=500, detail="Discussion created but not immediately available")
-                await asyncio.sleep(1)
+        # store_discussion writes through to the discussion cache on success,
+        # so a missing entry means the discussion was not stored
+        if get_discussion_cache().get(discussion.discussion_id) is None:
+            raise HTTPException(status_code=500, detail="Discussion could not be stored")
         
         # Format response and return
         return StartDiscussionResponse(
@@ -183,9 +261,6 @@ async def start_new_discussion(req: StartDiscussionRequest):
     except Exception as e:
         logger.error(f"Failed to start discussion: {e}")
         raise HTTPException(status_code=500, detail="Failed to start discussion")
-    finally:
-        if 'client' in locals():
-            client.close()
 
 @app.post("/discussion/{discussion_id}")
 async def get_discussion_details(discussion_id: str):
@@ -193,7 +268,7 @@ async def get_discussion_details(discussion_id: str):
     try:
         logger.info(f"Retrieving discussion details for ID: {discussion_id}")
         
-        client = get_weaviate_client()
+        client = get_shared_weaviate_client()
         
         # Get discussion from Weaviate
         discussion = get_discussion(discussion_id, client)
@@ -215,31 +290,32 @@ async def get_discussion_details(discussion_id: str):
     except Exception as e:
         logger.error(f"Failed to retrieve discussion: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve discussion")
-    finally:
-        if 'client' in locals():
-            client.close()
 
 @app.post("/discussion/{discussion_id}/followup")
-async def ask_followup_question(discussion_id: str, req: FollowupQuestionRequest):
+async def ask_followup_question(discussion_id: str, req: FollowupQuestionRequest, background_tasks: BackgroundTasks):
     """Ask a followup question in an existing discussion."""
     try:
         logger.info(f"Followup question for discussion {discussion_id}: {req.question[:50]}...")
         
-        client = get_weaviate_client()
+        client = get_shared_weaviate_client()
         
         # Get discussion to retrieve original cards
-        discussion = get_discussion(discussion_id, client)
+        discussion = await asyncio.to_thread(get_discussion, discussion_id, client)
         if not discussion:
             raise HTTPException(status_code=404, detail="Discussion not found")
         
-        # Get conversation history
-        history = get_discussion_history(discussion_id, client)
+        # Get conversation history, its rolling summary and the turns relevant to the question
+        history = await asyncio.to_thread(get_discussion_history, discussion_id, client)
+        summary = await asyncio.to_thread(get_discussion_summary, discussion_id, client)
+        relevant = await asyncio.to_thread(get_history_index().relevant_turns, req.question, history, client)
         
         # Generate response using original cards
-        response = call_gemini_api_followup(
+        response = await call_gemini_api_followup_async(
             question=req.question,
             original_cards=discussion.cards_drawn,
-            history=history
+            history=history,
+            summary=summary,
+            relevant=relevant
         )
         
         # Create and store followup question
@@ -251,7 +327,10 @@ async def ask_followup_question(discussion_id: str, req: FollowupQuestionRequest
             timestamp=datetime.now(),
         )
         
-        store_followup_question(followup, client)
+        await asyncio.to_thread(store_followup_question, followup, client)
+        
+        # Fold older turns into the rolling summary after the response is sent
+        background_tasks.add_task(refresh_discussion_summary, discussion_id, client)
         
         # Create response
         followup_response = FollowupQuestionResponse(
@@ -270,9 +349,68 @@ async def ask_followup_question(discussion_id: str, req: FollowupQuestionRequest
     except Exception as e:
         logger.error(f"Failed to answer followup question: {e}")
         raise HTTPException(status_code=500, detail="Failed to answer followup question")
-    finally:
-        if 'client' in locals():
-            client.close()
+
+def _format_sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _sse_stream(events, description: str):
+    """Relay (event, data) tuples as SSE, reporting failures as an error event."""
+    try:
+        async for event, data in events:
+            yield _format_sse(event, data)
+    except Exception as e:
+        logger.error(f"{description} stream failed: {e}")
+        yield _format_sse("error", {"message": f"Failed to {description}"})
+
+@app.post("/discussion/start/stream")
+async def start_new_discussion_stream(req: StartDiscussionRequest):
+    """
+    Start a discussion and stream the reading as server-sent events:
+    `cards` (drawn immediately), `token` (Gemini chunks) and `done` (stored discussion).
+    """
+    logger.info(f"Starting new streamed discussion for user {req.user_id}: {req.initial_question}")
+    client = get_shared_weaviate_client()
+    events = stream_start_discussion(
+        user_id=req.user_id,
+        discussion_id=req.discussion_id,
+        initial_question=req.initial_question,
+        client=client
+    )
+    return StreamingResponse(
+        _sse_stream(events, "start discussion"),
+        media_type="text/event-stream",
+        headers=STREAM_HEADERS
+    )
+
+@app.post("/discussion/{discussion_id}/followup/stream")
+async def ask_followup_question_stream(discussion_id: str, req: FollowupQuestionRequest):
+    """Ask a followup question and stream the answer as server-sent events."""
+    try:
+        logger.info(f"Streamed followup question for discussion {discussion_id}: {req.question[:50]}...")
+        
+        client = get_shared_weaviate_client()
+        
+        discussion = await asyncio.to_thread(get_discussion, discussion_id, client)
+        if not discussion:
+            raise HTTPException(status_code=404, detail="Discussion not found")
+        
+        history = await asyncio.to_thread(get_discussion_history, discussion_id, client)
+        summary = await asyncio.to_thread(get_discussion_summary, discussion_id, client)
+        relevant = await asyncio.to_thread(get_history_index().relevant_turns, req.question, history, client)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to prepare followup stream: {e}")
+        raise HTTPException(status_code=500, detail="Failed to answer followup question")
+
+    events = stream_followup(discussion, req.question, history, client, summary=summary, relevant=relevant)
+    return StreamingResponse(
+        _sse_stream(events, "answer followup question"),
+        media_type="text/event-stream",
+        headers=STREAM_HEADERS
+    )
 
 @app.post("/discussion/{discussion_id}/feedback")
 async def submit_discussion_feedback(discussion_id: str, feedback_data: dict):
@@ -280,7 +418,7 @@ async def submit_discussion_feedback(discussion_id: str, feedback_data: dict):
     try:
         logger.info(f"Discussion feedback submission for: {discussion_id}")
         
-        client = get_weaviate_client()
+        client = get_shared_weaviate_client()
         
         # Get the discussion to retrieve cards and details
         discussion = get_discussion(discussion_id, client)
@@ -309,9 +447,6 @@ async def submit_discussion_feedback(discussion_id: str, feedback_data: dict):
     except Exception as e:
         logger.error(f"Discussion feedback submission failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to submit discussion feedback: {str(e)}")
-    finally:
-        if 'client' in locals():
-            client.close()
 
 @app.get("/feedback/stats")
 async def get_feedback_statistics(user_id: Optional[str] = Query(None, description="Optional user ID to filter statistics")):
@@ -329,22 +464,33 @@ async def get_feedback_statistics(user_id: Optional[str] = Query(None, descripti
         raise HTTPException(status_code=500, detail=f"Failed to get feedback statistics: {str(e)}")
 
 @app.get("/feedback/discussion/{discussion_id}")
-async def get_discussion_feedback(discussion_id: str):
-    """Get feedback for a specific discussion."""
+async def get_discussion_feedback(
+    discussion_id: str,
+    after: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size")
+):
+    """Get feedback for a specific discussion, oldest first, one page at a time."""
     try:
         logger.info(f"Getting feedback for discussion: {discussion_id}")
         
-        client = get_weaviate_client()
+        client = get_shared_weaviate_client()
+        
+        if not collection_available(client, "Feedback"):
+            return {"discussion_id": discussion_id, "feedback": [], "next_cursor": None}
         
-        # Get feedback from Weaviate
-        collection = client.collections.get("Feedback")
-        result = collection.query.fetch_objects(
-            where=collection.query.Filter.by_property("discussion_id").equal(discussion_id),
-            limit=100
+        # Filter and sort in Weaviate
+        page = await asyncio.to_thread(
+            fetch_page,
+            client.collections.get("Feedback"),
+            "timestamp",
+            filters=Filter.by_property("discussion_id").equal(discussion_id),
+            limit=limit,
+            after=after,
+            return_properties=["user_id", "rating", "feedback_text", "timestamp"]
         )
         
         feedback_list = []
-        for obj in result.objects:
+        for obj in page.objects:
             feedback_list.append({
                 "user_id": obj.properties.get("user_id"),
                 "rating": obj.properties.get("rating"),
@@ -353,74 +499,56 @@ async def get_discussion_feedback(discussion_id: str):
             })
         
         logger.info(f"Found {len(feedback_list)} feedback entries for discussion {discussion_id}")
-        return {"discussion_id": discussion_id, "feedback": feedback_list}
+        return {"discussion_id": discussion_id, "feedback": feedback_list, "next_cursor": page.next_cursor}
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get discussion feedback: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get discussion feedback: {str(e)}")
-    finally:
-        if 'client' in locals():
-            client.close()
-        
-def initialize_feedback_collections(client):
-    """Initialize Weaviate collections for feedback system."""
+
+@app.get("/users/{user_id}/discussions", response_model=DiscussionListResponse)
+async def list_user_discussions(
+    user_id: str,
+    after: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="Page size")
+):
+    """A user's discussions, newest first, with summary fields only."""
     try:
-        if not client.collections.exists("Feedback"):
-            client.collections.create(
-                name="Feedback",
-                properties=[
-                    Property(name="user_id", data_type=DataType.TEXT),
-                    Property(name="question", data_type=DataType.TEXT),
-                    Property(name="model_response", data_type=DataType.TEXT),
-                    Property(name="feedback_text", data_type=DataType.TEXT),
-                    Property(name="rating", data_type=DataType.INT),
-                    Property(name="discussion_id", data_type=DataType.TEXT),
-                    Property(name="timestamp", data_type=DataType.TEXT),
-                    Property(name="cards_drawn", data_type=DataType.TEXT)
-                ]
-            )
-            logger.info("Created Feedback collection")
-        
-        if not client.collections.exists("KeywordMeaning"):
-            client.collections.create(
-                name="KeywordMeaning",
-                properties=[
-                    Property(name="keyword", data_type=DataType.TEXT),
-                    Property(name="meaning", data_type=DataType.TEXT),
-                    Property(name="feedback", data_type=DataType.TEXT),
-                    Property(name="source", data_type=DataType.TEXT),
-                    Property(name="orientation", data_type=DataType.TEXT),
-                    Property(name="position", data_type=DataType.INT),
-                    Property(name="card_name", data_type=DataType.TEXT),
-                    Property(name="created_at", data_type=DataType.TEXT),
-                    Property(name="updated_at", data_type=DataType.TEXT)
-                ]
-            )
-            logger.info("Created KeywordMeaning collection")
-        
-        if not client.collections.exists("ReadingContext"):
-            client.collections.create(
-                name="ReadingContext",
-                properties=[
-                    Property(name="question", data_type=DataType.TEXT),
-                    Property(name="model_response", data_type=DataType.TEXT),
-                    Property(name="user_feedback", data_type=DataType.TEXT),
-                    Property(name="rating", data_type=DataType.INT),
-                    Property(name="user_id", data_type=DataType.TEXT),
-                    Property(name="discussion_id", data_type=DataType.TEXT),
-                    Property(name="timestamp", data_type=DataType.TEXT),
-                    Property(name="spread_info", data_type=DataType.TEXT),
-                    Property(name="total_cards", data_type=DataType.INT),
-                    Property(name="question_type", data_type=DataType.TEXT),
-                    Property(name="source", data_type=DataType.TEXT)
-                ]
-            )
-            logger.info("Created ReadingContext collection")
-            
+        client = get_shared_weaviate_client()
+        items, next_cursor = await asyncio.to_thread(
+            get_user_discussions_page, user_id, client, after, limit
+        )
+        return DiscussionListResponse(
+            user_id=user_id,
+            discussions=[item.model_dump() for item in items],
+            next_cursor=next_cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Failed to initialize feedback collections: {e}")
-        raise
+        logger.error(f"Failed to list discussions for user {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to list discussions")
 
+@app.get("/discussion/{discussion_id}/followups")
+async def get_discussion_followups(
+    discussion_id: str,
+    after: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size")
+):
+    """Followup questions of a discussion in chronological order, one page at a time."""
+    try:
+        client = get_shared_weaviate_client()
+        followups, next_cursor = await asyncio.to_thread(
+            get_discussion_history_page, discussion_id, client, after, limit
+        )
+        return {"discussion_id": discussion_id, "followups": followups, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to get followups for discussion {discussion_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get discussion followups")
+        
 # Error handler for validation errors
 @app.exception_handler(422)
 async def validation_exception_handler(request, exc):
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+from app.models import TarotCard
+
+with patch.dict(os.environ, {"GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "test-key")}):
+    from app.main import generate_batch_readings
+
+
+def make_deck(count=10):
+    return [
+        TarotCard(
+            name=f"Card{i}",
+            arcana="major",
+            keywords=["k"],
+            meanings_light=[f"light{i}"],
+            meanings_shadow=[f"shadow{i}"],
+            fortune_telling=[]
+        )
+        for i in range(count)
+    ]
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+class TestBatchReadings(unittest.TestCase):
+
+    def test_results_in_completion_order_with_item_errors(self):
+        async def fake_generate(question, picks):
+            if question == "broken":
+                raise RuntimeError("boom")
+            await asyncio.sleep(0.05 if question == "slow" else 0)
+            return f"answer to {question}"
+
+        items = [{"id": "a", "question": "slow"}, {"id": "b", "question": "fast"}, {"id": "c", "question": "broken"}]
+        with patch("app.main.generate_reading_async", side_effect=fake_generate):
+            results = asyncio.run(collect(generate_batch_readings(items, deck=make_deck(), concurrency=3)))
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[-1]["id"], "a")
+        by_id = {r["id"]: r for r in results}
+        self.assertEqual(by_id["b"]["answer"], "answer to fast")
+        self.assertEqual(len(by_id["b"]["cards"]), 3)
+        self.assertEqual(by_id["c"]["error"], "boom")
+
+    def test_concurrency_is_bounded(self):
+        active = 0
+        peak = 0
+
+        async def fake_generate(question, picks):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return "ok"
+
+        items = [{"question": f"q{i}"} for i in range(10)]
+        with patch("app.main.generate_reading_async", side_effect=fake_generate):
+            results = asyncio.run(collect(generate_batch_readings(items, deck=make_deck(), concurrency=2)))
+
+        self.assertEqual(len(results), 10)
+        self.assertEqual(peak, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import unittest
+
+from app.card_codec import cards_from_properties, decode_cards, encode_cards, parse_legacy_cards
+from app.models import CardLayout
+from tools.migrate_cards_drawn import migrated_properties
+
+
+def make_cards():
+    return [
+        CardLayout(name="The Fool", position="past", upright=True, meaning="new start", position_keywords=["origin"]),
+        CardLayout(name="The Moon", position="future", upright=False, meaning="doubt", position_keywords=[]),
+    ]
+
+
+class TestCardCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        cards = make_cards()
+        self.assertEqual(decode_cards(encode_cards(cards)), cards)
+
+    def test_typed_property_wins_over_legacy_text(self):
+        props = {"cards": encode_cards(make_cards()[:1]), "cards_drawn": "not json"}
+        self.assertEqual([c.name for c in cards_from_properties(props)], ["The Fool"])
+
+    def test_legacy_json_and_python_repr(self):
+        dumped = [card.model_dump() for card in make_cards()]
+        self.assertEqual(parse_legacy_cards(json.dumps(dumped)), make_cards())
+        self.assertEqual(parse_legacy_cards(str(dumped)), make_cards())
+        self.assertEqual(cards_from_properties({"cards_drawn": json.dumps(dumped)}), make_cards())
+
+    def test_legacy_garbage(self):
+        self.assertEqual(parse_legacy_cards(""), [])
+        self.assertEqual(parse_legacy_cards("{broken"), [])
+        self.assertEqual(parse_legacy_cards('{"name": "x"}'), [])
+
+    def test_migrated_properties(self):
+        legacy = {
+            "discussion_id": "d1",
+            "initial_response": "The cards suggest a new beginning.",
+            "cards_drawn": json.dumps([card.model_dump() for card in make_cards()])
+        }
+        updated = migrated_properties("Discussion", legacy)
+        self.assertEqual(updated["cards"], encode_cards(make_cards()))
+        self.assertEqual(updated["card_names"], ["The Fool", "The Moon"])
+        self.assertEqual(updated["response_preview"], "The cards suggest a new beginning.")
+        self.assertEqual(updated["cards_drawn"], legacy["cards_drawn"])
+
+        self.assertEqual(migrated_properties("Discussion", updated), {})
+
+    def test_migrated_properties_fill_null_list_fields(self):
+        # Weaviate returns properties added after the object was written as None
+        legacy = {
+            "discussion_id": "d1",
+            "initial_response": "The cards suggest a new beginning.",
+            "cards_drawn": json.dumps([card.model_dump() for card in make_cards()]),
+            "cards": None,
+            "card_names": None,
+            "response_preview": None,
+        }
+        updated = migrated_properties("Discussion", legacy)
+        self.assertEqual(updated["card_names"], ["The Fool", "The Moon"])
+        self.assertEqual(updated["response_preview"], "The cards suggest a new beginning.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import asyncio
+import time
+import unittest
+
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def fail():
+    raise ConnectionError("upstream down")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def make_breaker(self, **kwargs):
+        kwargs.setdefault("window", 10)
+        kwargs.setdefault("min_calls", 4)
+        kwargs.setdefault("failure_rate", 0.5)
+        kwargs.setdefault("open_seconds", 0.05)
+        return CircuitBreaker("test", **kwargs)
+
+    def trip(self, breaker):
+        for _ in range(breaker.min_calls):
+            breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_opens_after_failure_rate(self):
+        breaker = self.make_breaker()
+        breaker.call(lambda: "ok")
+        breaker.call(lambda: "ok")
+        self.assertEqual(breaker.state, CLOSED)
+        with self.assertRaises(ConnectionError):
+            breaker.call(fail)
+        self.assertEqual(breaker.state, CLOSED)
+        with self.assertRaises(ConnectionError):
+            breaker.call(fail)
+        self.assertEqual(breaker.state, OPEN)
+
+        with self.assertRaises(CircuitOpenError):
+            breaker.call(lambda: "never called")
+        self.assertEqual(breaker.stats()["short_circuited"], 1)
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = self.make_breaker(slow_call_seconds=0.0)
+        for _ in range(4):
+            breaker.call(lambda: "slow")
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_ignored_errors_do_not_trip(self):
+        breaker = self.make_breaker(is_failure=lambda error: not isinstance(error, ValueError))
+
+        def bad_input():
+            raise ValueError("bad prompt")
+
+        for _ in range(10):
+            with self.assertRaises(ValueError):
+                breaker.call(bad_input)
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_half_open_probe_closes(self):
+        breaker = self.make_breaker()
+        self.trip(breaker)
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success(0.01)
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_half_open_probe_failure_reopens(self):
+        breaker = self.make_breaker()
+        self.trip(breaker)
+        time.sleep(0.06)
+        with self.assertRaises(ConnectionError):
+            breaker.call(fail)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.stats()["times_opened"], 2)
+
+    def test_call_async(self):
+        breaker = self.make_breaker()
+
+        async def ok():
+            return "ok"
+
+        self.assertEqual(asyncio.run(breaker.call_async(ok)), "ok")
+        self.trip(breaker)
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(breaker.call_async(ok))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import asyncio
+import unittest
+from unittest.mock import Mock, patch
+
+from google.genai import errors
+
+from app.context_cache import (
+    CachedContextPrompt, ContextCache, build_glossary, is_cache_miss, prefix_prompt, with_context_cache
+)
+from app.deck_cache import _build_snapshot
+from app.models import CardLayout, TarotCard
+
+
+def make_deck(suffix=""):
+    return [
+        TarotCard(name="The Star", arcana="Major", keywords=["hope"],
+                  meanings_light=["Renewal", "Faith"], meanings_shadow=["Despair" + suffix]),
+        TarotCard(name="The Fool", arcana="Major", meanings_light=["Beginnings"], meanings_shadow=["Recklessness"]),
+    ]
+
+
+def make_picks():
+    return [
+        CardLayout(name="The Fool", upright=True, meaning="Beginnings", position="past", position_keywords=[]),
+        CardLayout(name="The Star", upright=False, meaning="Despair", position="present", position_keywords=[]),
+        CardLayout(name="The Fool", upright=True, meaning="Beginnings", position="future", position_keywords=[]),
+    ]
+
+
+def cache_miss():
+    return errors.ClientError(404, {"error": {"code": 404, "status": "NOT_FOUND",
+                                              "message": "CachedContent not found (or permission denied)"}})
+
+
+class TestContextCache(unittest.TestCase):
+
+    def setUp(self):
+        self.runtime = Mock()
+        self.caches = self.runtime.client.caches
+        created = [Mock() for _ in range(3)]
+        for i, cached in enumerate(created):
+            cached.name = f"cachedContents/c{i}"
+        self.caches.create.side_effect = created
+        self.deck = make_deck()
+        patches = [
+            patch('app.context_cache.get_gemini_runtime', return_value=self.runtime),
+            patch('app.context_cache.get_deck', side_effect=lambda client=None: _build_snapshot(self.deck, None)),
+            patch('app.context_cache.load_system_instruction', return_value="You are a tarot reader."),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_glossary_is_sorted_and_complete(self):
+        glossary = build_glossary(make_deck())
+        self.assertLess(glossary.index("### The Fool"), glossary.index("### The Star"))
+        self.assertIn("Upright: Renewal | Faith", glossary)
+        self.assertIn("Reversed: Despair", glossary)
+        self.assertIn("## Position keywords", glossary)
+        self.assertIn("- celtic_cross: ", glossary)
+        self.assertEqual(glossary, build_glossary(reversed(make_deck())))
+
+    def test_refresh_creates_then_extends(self):
+        cache = ContextCache(enabled=True, ttl=3600, refresh_margin=300, model="gemini-test")
+        self.assertIsNone(cache.active_name())
+
+        self.assertEqual(cache.refresh(), "cachedContents/c0")
+        config = self.caches.create.call_args.kwargs["config"]
+        self.assertEqual(config.ttl, "3600s")
+        self.assertEqual(self.caches.create.call_args.kwargs["model"], "gemini-test")
+        self.assertEqual(cache.active_name(), "cachedContents/c0")
+        self.assertAlmostEqual(cache.next_refresh_in(), 3300, delta=5)
+
+        self.assertEqual(cache.refresh(), "cachedContents/c0")
+        self.caches.update.assert_called_once()
+        self.assertEqual(self.caches.create.call_count, 1)
+        self.assertEqual(cache.stats()["refreshed"], 1)
+
+    def test_changed_deck_replaces_cache(self):
+        cache = ContextCache(enabled=True)
+        cache.refresh()
+        self.deck = make_deck(suffix=" and doubt")
+
+        self.assertEqual(cache.refresh(), "cachedContents/c1")
+        self.caches.update.assert_not_called()
+        self.caches.delete.assert_called_once_with(name="cachedContents/c0")
+
+    def test_invalidate_and_close(self):
+        cache = ContextCache(enabled=True)
+        cache.refresh()
+        cache.invalidate("cachedContents/c0")
+        self.assertIsNone(cache.active_name())
+        self.assertEqual(cache.refresh(), "cachedContents/c1")
+
+        cache.close()
+        self.caches.delete.assert_called_once_with(name="cachedContents/c1")
+        self.assertIsNone(cache.active_name())
+
+    def test_invalidate_wakes_refresher(self):
+        cache = ContextCache(enabled=True, ttl=3600, refresh_margin=300)
+        cache.refresh()
+
+        async def scenario():
+            waiter = asyncio.create_task(cache.wait_for_refresh())
+            await asyncio.sleep(0)
+            cache.invalidate("cachedContents/c0")
+            await asyncio.wait_for(waiter, timeout=1)
+
+        asyncio.run(scenario())
+
+    def test_invalidating_a_replaced_cache_keeps_the_current_one(self):
+        cache = ContextCache(enabled=True)
+        cache.refresh()
+        cache.invalidate("cachedContents/old")
+        self.assertEqual(cache.active_name(), "cachedContents/c0")
+
+    def test_disabled_cache_does_nothing(self):
+        cache = ContextCache(enabled=False)
+        self.assertIsNone(cache.refresh())
+        self.caches.create.assert_not_called()
+
+
+class TestCachedContextPrompt(unittest.TestCase):
+
+    def test_full_prompt_without_active_cache(self):
+        with patch('app.context_cache._context_cache', ContextCache(enabled=False)):
+            prompt = with_context_cache("Will I travel?", make_picks(), "FULL PROMPT")
+        self.assertEqual(prompt, "FULL PROMPT")
+        self.assertNotIsInstance(prompt, CachedContextPrompt)
+
+    def test_short_prompt_with_active_cache(self):
+        cache = Mock()
+        cache.active_name.return_value = "cachedContents/c0"
+        with patch('app.context_cache._context_cache', cache):
+            prompt = with_context_cache("Will I travel?", make_picks(), "FULL PROMPT")
+        self.assertIsInstance(prompt, CachedContextPrompt)
+        self.assertEqual(prompt.cache_name, "cachedContents/c0")
+        self.assertEqual(prompt.full_prompt, "FULL PROMPT")
+        self.assertIn("Will I travel?", prompt)
+        self.assertIn("- [Present] The Star (Reversed)", prompt)
+        self.assertNotIn("Despair", prompt)
+
+    def test_prefix_keeps_cache_reference(self):
+        prompt = prefix_prompt("Earlier: ...\n", CachedContextPrompt("short", "cachedContents/c0", "full"))
+        self.assertEqual(prompt, "Earlier: ...\nshort")
+        self.assertEqual(prompt.full_prompt, "Earlier: ...\nfull")
+        self.assertEqual(prompt.cache_name, "cachedContents/c0")
+        self.assertEqual(prefix_prompt("a", "b"), "ab")
+
+    def test_cache_miss_detection(self):
+        self.assertTrue(is_cache_miss(cache_miss()))
+        self.assertTrue(is_cache_miss(errors.ClientError(403, {"error": {
+            "code": 403, "status": "PERMISSION_DENIED", "message": "CachedContent not found (or permission denied)"}})))
+        self.assertFalse(is_cache_miss(errors.ClientError(403, {"error": {
+            "code": 403, "status": "PERMISSION_DENIED", "message": "The caller does not have permission"}})))
+        self.assertFalse(is_cache_miss(errors.ClientError(400, {"error": {
+            "code": 400, "status": "INVALID_ARGUMENT", "message": "Request contains cached_content and tools"}})))
+        self.assertFalse(is_cache_miss(errors.ClientError(400, {"error": {"message": "bad request"}})))
+        self.assertFalse(is_cache_miss(RuntimeError("cached")))
+
+    def test_generation_falls_back_to_full_prompt(self):
+        from app.rag_engine import _generate_content
+        runtime = Mock()
+        runtime.generation_config.return_value.model_copy.side_effect = lambda update: update
+        generate = runtime.client.models.generate_content
+        generate.side_effect = [cache_miss(), Mock(text="The stars align.")]
+        cache = Mock()
+        with patch('app.rag_engine.get_gemini_runtime', return_value=runtime), \
+             patch('app.rag_engine.get_context_cache', return_value=cache):
+            answer = _generate_content(CachedContextPrompt("short", "cachedContents/c0", "full"))
+
+        self.assertEqual(answer, "The stars align.")
+        first, second = generate.call_args_list
+        self.assertEqual(first.kwargs["contents"], "short")
+        self.assertEqual(first.kwargs["config"], {"cached_content": "cachedContents/c0"})
+        self.assertEqual(second.kwargs["contents"], "full")
+        self.assertIs(second.kwargs["config"], runtime.generation_config.return_value)
+        cache.invalidate.assert_called_once_with("cachedContents/c0")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from datetime import date
+from unittest.mock import Mock, patch
+
+import app.daily_reading as daily_reading
+from app.daily_reading import (
+    DailyReadingStore, daily_seed, draw_daily_spread, get_active_user_ids, get_daily_reading, warm_daily_readings
+)
+from app.models import TarotCard
+from app.offline_reading import OfflineReading
+
+
+def make_deck(count=22):
+    return [
+        TarotCard(
+            name=f"Card{i:02d}",
+            arcana="major",
+            keywords=["k"],
+            meanings_light=[f"light{i}"],
+            meanings_shadow=[f"shadow{i}"],
+            fortune_telling=[]
+        )
+        for i in range(count)
+    ]
+
+
+class TestDailyReading(unittest.TestCase):
+
+    def setUp(self):
+        self.store = DailyReadingStore()
+        patcher = patch.object(daily_reading, "_daily_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.day = date(2025, 1, 15)
+
+    def test_seed_is_per_user_and_day(self):
+        self.assertEqual(daily_seed("alice", self.day), daily_seed("alice", self.day))
+        self.assertNotEqual(daily_seed("alice", self.day), daily_seed("bob", self.day))
+        self.assertNotEqual(daily_seed("alice", self.day), daily_seed("alice", date(2025, 1, 16)))
+        self.assertEqual(daily_seed(None, self.day), daily_seed("anonymous", self.day))
+
+    def test_draw_ignores_deck_order(self):
+        deck = make_deck()
+        first = draw_daily_spread(deck, "alice", self.day)
+        second = draw_daily_spread(list(reversed(deck)), "alice", self.day)
+        self.assertEqual(
+            [(c.name, c.upright) for c in first],
+            [(c.name, c.upright) for c in second]
+        )
+
+    @patch("app.daily_reading.generate_reading", return_value="Today's guidance")
+    @patch("app.daily_reading.fetch_full_deck")
+    def test_generated_once_per_day(self, mock_deck, mock_generate):
+        mock_deck.return_value = make_deck()
+
+        first = get_daily_reading("alice", self.day)
+        first["reading_type"] = "mutated by caller"
+        second = get_daily_reading("alice", self.day)
+
+        self.assertEqual(mock_generate.call_count, 1)
+        self.assertEqual(second["answer"], "Today's guidance")
+        self.assertEqual(second["reading_type"], "daily_three_card")
+        self.assertEqual(second["date"], "2025-01-15")
+
+    @patch("app.daily_reading.fetch_full_deck")
+    def test_offline_reading_is_not_stored(self, mock_deck):
+        mock_deck.return_value = make_deck()
+
+        with patch("app.daily_reading.generate_reading", return_value=OfflineReading("Offline guidance")):
+            self.assertEqual(get_daily_reading("alice", self.day)["answer"], "Offline guidance")
+        with patch("app.daily_reading.generate_reading", return_value="Today's guidance") as mock_generate:
+            self.assertEqual(get_daily_reading("alice", self.day)["answer"], "Today's guidance")
+        mock_generate.assert_called_once()
+
+    def test_store_rolls_over_and_uses_remote(self):
+        remote = Mock()
+        remote.get.return_value = {"answer": "from redis"}
+        self.store.attach_remote(remote)
+
+        self.store.set("alice", self.day, {"answer": "local"})
+        self.assertEqual(self.store.get("alice", self.day)["answer"], "local")
+        self.assertEqual(remote.set.call_args[0][0], "daily:alice:2025-01-15")
+
+        self.assertEqual(self.store.get("alice", date(2025, 1, 16))["answer"], "from redis")
+        self.assertEqual(len(self.store), 1)
+
+    @patch("app.daily_reading.get_daily_reading")
+    def test_warm_up_includes_anonymous(self, mock_get):
+        mock_get.side_effect = lambda user_id, day: {} if user_id != "broken" else 1 / 0
+
+        result = warm_daily_readings(["alice", "alice", "broken"], day=self.day, max_workers=2)
+
+        warmed = sorted(str(c.args[0]) for c in mock_get.call_args_list)
+        self.assertEqual(warmed, ["None", "alice", "broken"])
+        self.assertEqual(result["generated"], 2)
+        self.assertEqual(result["failed"], 1)
+
+    @patch("app.daily_reading.collection_available", return_value=True)
+    @patch("app.daily_reading.iterate_all")
+    def test_active_users_are_filtered_and_sorted_server_side(self, mock_iterate, _):
+        rows = [("alice", "2025-01-15T09:00"), ("bob", "2025-01-15T08:00"), ("alice", "2025-01-14T10:00"),
+                (None, "2025-01-14T09:00"), ("carol", "2025-01-13T10:00"), ("dave", "2025-01-12T10:00")]
+        mock_iterate.return_value = iter(Mock(properties={"user_id": u, "created_at": t}) for u, t in rows)
+
+        self.assertEqual(get_active_user_ids(Mock(), days=7, limit=3), ["alice", "bob", "carol"])
+        args, kwargs = mock_iterate.call_args
+        self.assertEqual(args[1], "created_at")
+        self.assertFalse(kwargs["ascending"])
+        self.assertIsNotNone(kwargs["filters"])
+        self.assertIn("created_at", kwargs["return_properties"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from app.deck_cache import DeckCache
+from app.models import TarotCard
+
+
+class TestDeckCache(unittest.TestCase):
+
+    def setUp(self):
+        self.deck = [TarotCard(name=f"Card{i}") for i in range(5)]
+        self.loader = Mock(return_value=self.deck)
+        self.version = "v1"
+        self.version_reader = Mock(side_effect=lambda client: self.version)
+        self.client = Mock()
+
+    def make_cache(self, ttl=3600):
+        return DeckCache(loader=self.loader, version_reader=self.version_reader, ttl=ttl)
+
+    def test_snapshot_is_cached(self):
+        cache = self.make_cache()
+        first = cache.get(self.client)
+        second = cache.get(self.client)
+        self.assertIs(first, second)
+        self.assertIsInstance(first.cards, tuple)
+        self.assertEqual(len(first.cards), 5)
+        self.assertEqual(first.get("Card3").name, "Card3")
+        self.loader.assert_called_once()
+
+    def test_index_is_read_only(self):
+        snapshot = self.make_cache().get(self.client)
+        with self.assertRaises(TypeError):
+            snapshot.by_name["Card0"] = None
+
+    def test_expired_ttl_with_same_version_does_not_reload(self):
+        cache = self.make_cache(ttl=0)
+        first = cache.get(self.client)
+        second = cache.get(self.client)
+        self.assertIs(first, second)
+        self.loader.assert_called_once()
+        self.assertEqual(self.version_reader.call_count, 2)
+
+    def test_version_bump_reloads(self):
+        cache = self.make_cache(ttl=0)
+        first = cache.get(self.client)
+        self.version = "v2"
+        second = cache.get(self.client)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.version, "v2")
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_version_bump_rebuilds_layout_table(self):
+        cache = self.make_cache(ttl=0)
+        with patch("app.deck_cache.build_layout_table") as build:
+            first = cache.get(self.client)
+            cache.get(self.client)
+            self.version = "v2"
+            self.loader.return_value = [TarotCard(name=f"Card{i}") for i in range(5)]
+            second = cache.get(self.client)
+        self.assertEqual([c.args[0] for c in build.call_args_list], [first.cards, second.cards])
+
+    def test_invalidate_reloads(self):
+        cache = self.make_cache()
+        cache.get(self.client)
+        cache.invalidate()
+        cache.get(self.client)
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_load_failure_serves_stale_snapshot(self):
+        cache = self.make_cache(ttl=0)
+        first = cache.get(self.client)
+        self.version = "v2"
+        self.loader.side_effect = Exception("Weaviate down")
+        self.assertIs(cache.get(self.client), first)
+
+    def test_empty_deck_is_not_cached(self):
+        self.loader.return_value = []
+        cache = self.make_cache()
+        self.assertEqual(cache.get(self.client).cards, ())
+        self.assertIsNone(cache.snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
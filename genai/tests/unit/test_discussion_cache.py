@@ -0,0 +1,130 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from app.discussion_cache import DiscussionStateCache
+from app.models import Discussion, FollowupQuestion
+
+
+def make_discussion(discussion_id="d1"):
+    return Discussion(
+        discussion_id=discussion_id,
+        user_id="u1",
+        initial_question="Will I find love?",
+        initial_response="The cards suggest..."
+    )
+
+
+def make_followup(question_id, discussion_id="d1"):
+    return FollowupQuestion(
+        question_id=question_id,
+        discussion_id=discussion_id,
+        question="And then?",
+        response="Then the Sun rises."
+    )
+
+
+class FakeRemote:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, expire=3600):
+        self.data[key] = value
+        return True
+
+    def update(self, key, fn, expire=3600):
+        value = fn(self.data.get(key))
+        if value is not None:
+            self.data[key] = value
+        return value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+        return True
+
+
+class TestDiscussionStateCache(unittest.TestCase):
+
+    def test_read_your_writes(self):
+        cache = DiscussionStateCache(max_entries=10, ttl=60)
+        cache.put_discussion(make_discussion())
+        cache.append_followup(make_followup("q1"))
+
+        state = cache.get("d1")
+        self.assertEqual(state.discussion.initial_question, "Will I find love?")
+        self.assertEqual([f.question_id for f in state.followups], ["q1"])
+
+    def test_followup_ignored_without_complete_history(self):
+        cache = DiscussionStateCache(max_entries=10, ttl=60)
+        cache.remember_discussion(make_discussion())
+        cache.append_followup(make_followup("q2"))
+        self.assertIsNone(cache.get("d1").followups)
+
+        cache.remember_history("d1", [make_followup("q1"), make_followup("q2")])
+        cache.append_followup(make_followup("q2"))
+        self.assertEqual(len(cache.get("d1").followups), 2)
+
+    def test_returned_state_is_a_copy(self):
+        cache = DiscussionStateCache(max_entries=10, ttl=60)
+        cache.put_discussion(make_discussion())
+        cache.get("d1").followups.append(make_followup("q1"))
+        self.assertEqual(cache.get("d1").followups, [])
+
+    def test_lru_and_ttl(self):
+        cache = DiscussionStateCache(max_entries=2, ttl=60)
+        for discussion_id in ("d1", "d2", "d3"):
+            cache.put_discussion(make_discussion(discussion_id))
+        self.assertIsNone(cache.get("d1"))
+        self.assertEqual(len(cache), 2)
+
+        with patch("app.discussion_cache.time.monotonic", return_value=10**9):
+            self.assertIsNone(cache.get("d3"))
+
+    def test_remote_is_shared_between_workers(self):
+        remote = FakeRemote()
+        worker_a = DiscussionStateCache(max_entries=10, ttl=60, remote=remote)
+        worker_b = DiscussionStateCache(max_entries=10, ttl=60, remote=remote)
+
+        worker_a.put_discussion(make_discussion())
+        worker_b.append_followup(make_followup("q1"))
+
+        self.assertEqual(len(worker_a.get("d1").followups), 1)
+        self.assertIn("discussion:d1", remote.data)
+
+    def test_local_copy_expires_quickly(self):
+        cache = DiscussionStateCache(max_entries=10, ttl=3600, local_ttl=30)
+        cache.put_discussion(make_discussion())
+        with patch("app.discussion_cache.time.monotonic", return_value=time.monotonic() + 31):
+            self.assertIsNone(cache.get("d1"))
+
+    def test_concurrent_appends_are_kept(self):
+        remote = FakeRemote()
+        lock = threading.Lock()
+        update = remote.update
+        remote.update = lambda *args, **kwargs: _locked(lock, update, *args, **kwargs)
+        workers = [DiscussionStateCache(max_entries=10, ttl=60, remote=remote) for _ in range(2)]
+        workers[0].put_discussion(make_discussion())
+
+        threads = [
+            threading.Thread(target=workers[i % 2].append_followup, args=(make_followup(f"q{i}"),))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(workers[1].get("d1").followups), 20)
+
+
+def _locked(lock, fn, *args, **kwargs):
+    with lock:
+        return fn(*args, **kwargs)
+
+
+if __name__ == '__main__':
+    unittest.main()
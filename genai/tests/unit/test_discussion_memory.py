@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import Mock
+
+from app.discussion_memory import (
+    estimate_tokens, render_followup_context, update_discussion_summary
+)
+from app.models import DiscussionSummary, FollowupQuestion
+
+
+def make_history(count, response_length=40):
+    return [
+        FollowupQuestion(
+            discussion_id="d1",
+            question=f"Question {i}?",
+            response=f"Answer {i}. " + "x" * response_length
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def make_client(stored=None):
+    client = Mock()
+    client.collections.exists.return_value = stored is not None
+    collection = client.collections.get.return_value
+    if stored is None:
+        collection.query.fetch_object_by_id.return_value = None
+    else:
+        collection.query.fetch_object_by_id.return_value = Mock(properties={
+            "discussion_id": stored.discussion_id,
+            "summary": stored.summary,
+            "turns_summarized": stored.turns_summarized,
+            "updated_at": stored.updated_at.isoformat()
+        })
+    collection.data.exists.return_value = stored is not None
+    return client
+
+
+class TestDiscussionMemory(unittest.TestCase):
+
+    def test_context_keeps_last_turns_only(self):
+        context = render_followup_context(make_history(10), budget=10000, max_turns=3)
+        self.assertNotIn("Q7:", context)
+        self.assertIn("Q8: Question 8?", context)
+        self.assertIn("Q10: Question 10?", context)
+
+    def test_context_respects_token_budget(self):
+        history = make_history(50, response_length=2000)
+        short = render_followup_context(make_history(5, response_length=2000), budget=800, max_turns=3)
+        long = render_followup_context(history, budget=800, max_turns=3)
+        self.assertLessEqual(estimate_tokens(long), 820)
+        # Prompt size does not grow with the discussion length
+        self.assertLess(abs(len(long) - len(short)), 20)
+        self.assertIn("Q50:", long)
+
+    def test_context_uses_summary_for_older_turns(self):
+        summary = DiscussionSummary(discussion_id="d1", summary="User worries about work.", turns_summarized=7)
+        context = render_followup_context(make_history(10), summary, budget=10000, max_turns=5)
+        self.assertIn("User worries about work.", context)
+        self.assertNotIn("Q7:", context)
+        self.assertIn("Q8:", context)
+
+    def test_context_uses_relevant_turns_and_latest(self):
+        history = make_history(10)
+        summary = DiscussionSummary(discussion_id="d1", summary="User worries about work.", turns_summarized=7)
+        context = render_followup_context(history, summary, budget=10000, max_turns=3,
+                                          relevant=[history[1], history[4]])
+        self.assertIn("User worries about work.", context)
+        self.assertIn("Q2: Question 2?", context)
+        self.assertIn("Q5: Question 5?", context)
+        self.assertIn("Q10: Question 10?", context)
+        self.assertNotIn("Q9:", context)
+        self.assertLess(context.index("Q2:"), context.index("Q5:"))
+
+    def test_update_folds_only_new_turns(self):
+        previous = DiscussionSummary(discussion_id="d1", summary="Earlier summary", turns_summarized=2)
+        client = make_client(previous)
+        summarize = Mock(return_value="Updated summary")
+
+        result = update_discussion_summary("d1", make_history(6), client, summarize, keep_turns=3)
+
+        prompt = summarize.call_args[0][0]
+        self.assertIn("Earlier summary", prompt)
+        self.assertIn("Question 3?", prompt)
+        self.assertNotIn("Question 2?", prompt)
+        self.assertNotIn("Question 4?", prompt)
+        self.assertEqual(result.turns_summarized, 3)
+        self.assertEqual(result.summary, "Updated summary")
+        client.collections.get.return_value.data.replace.assert_called_once()
+
+    def test_update_skipped_inside_verbatim_window(self):
+        client = make_client()
+        summarize = Mock()
+        result = update_discussion_summary("d1", make_history(3), client, summarize, keep_turns=3)
+        summarize.assert_not_called()
+        self.assertEqual(result.turns_summarized, 0)
+
+    def test_update_falls_back_to_extractive_summary(self):
+        client = make_client()
+        summarize = Mock(side_effect=RuntimeError("quota"))
+        result = update_discussion_summary("d1", make_history(4), client, summarize, keep_turns=3)
+        self.assertIn("Question 1? -> Answer 1", result.summary)
+        client.collections.get.return_value.data.insert.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
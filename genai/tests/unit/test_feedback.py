@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import Mock
+
+from app.feedback import FeedbackProcessor
+
+
+def matches(props, filters):
+    """Evaluate the equality / AND filters used by FeedbackProcessor against `props`."""
+    if filters is None:
+        return True
+    if hasattr(filters, "filters"):
+        return all(matches(props, f) for f in filters.filters)
+    return props.get(filters.target) == filters.value
+
+
+class FakeCollection:
+    """Answers fetch_objects from in-memory objects, honouring the filter."""
+
+    def __init__(self, rows):
+        self.objects = [Mock(uuid=f"id{i}", properties=props) for i, props in enumerate(rows)]
+        self.query = Mock()
+        self.query.fetch_objects.side_effect = self._fetch
+
+    def _fetch(self, filters=None, limit=10, **kwargs):
+        return Mock(objects=[o for o in self.objects if matches(o.properties, filters)][:limit])
+
+
+def make_client(collections):
+    client = Mock()
+    client.collections.get.side_effect = lambda name: collections[name]
+    return client
+
+
+class TestFeedbackProcessor(unittest.TestCase):
+
+    def test_existing_keyword_meanings_are_found(self):
+        meanings = FakeCollection([
+            {"card_name": "The Star", "keyword": "hope", "meaning": "renewal"},
+            {"card_name": "The Star", "keyword": "faith", "meaning": "trust"},
+            {"card_name": "The Moon", "keyword": "hope", "meaning": "illusion"},
+        ])
+        processor = FeedbackProcessor(client=make_client({"KeywordMeaning": meanings}))
+
+        found = processor._get_existing_keyword_meanings("The Star", "hope")
+        self.assertEqual([m["properties"]["meaning"] for m in found], ["renewal"])
+        self.assertEqual(found[0]["uuid"], "id0")
+
+    def test_statistics_per_user(self):
+        feedback = FakeCollection([
+            {"user_id": "alice", "rating": 5},
+            {"user_id": "alice", "rating": 3},
+            {"user_id": "bob", "rating": 1},
+        ])
+        processor = FeedbackProcessor(client=make_client({"Feedback": feedback}))
+
+        stats = processor.get_feedback_statistics("alice")
+        self.assertEqual(stats["total_feedback"], 2)
+        self.assertEqual(stats["average_rating"], 4.0)
+        self.assertEqual(stats["high_ratings_count"], 1)
+        self.assertEqual(processor.get_feedback_statistics()["total_feedback"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date
+
+from app.feedback_journal import FeedbackJournal
+
+
+class TestFeedbackJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = self.tmp.name
+
+    def make_journal(self, **kwargs):
+        journal = FeedbackJournal(directory=self.directory, fsync_interval=0.05, **kwargs)
+        self.addCleanup(journal.close)
+        return journal
+
+    def test_append_and_read_back(self):
+        journal = self.make_journal()
+        for i in range(3):
+            journal.append({"user_id": f"u{i}", "feedback": "great"})
+        journal.flush()
+
+        self.assertEqual([e["user_id"] for e in journal.read()], ["u0", "u1", "u2"])
+        self.assertEqual(len(journal.segments()), 1)
+
+    def test_size_rotation(self):
+        journal = self.make_journal(max_bytes=200)
+        for i in range(20):
+            journal.append({"user_id": f"u{i}", "feedback": "x" * 40})
+
+        segments = journal.segments()
+        self.assertGreater(len(segments), 1)
+        for path in segments:
+            self.assertLessEqual(os.path.getsize(path), 200)
+        self.assertEqual([e["user_id"] for e in journal.read()], [f"u{i}" for i in range(20)])
+
+    def test_concurrent_writers_share_the_directory(self):
+        journals = [self.make_journal(max_bytes=4096) for _ in range(2)]
+
+        def write(journal, prefix):
+            for i in range(100):
+                journal.append({"user_id": f"{prefix}{i}", "feedback": "y" * 30})
+
+        threads = [threading.Thread(target=write, args=(j, p)) for j, p in zip(journals, "ab")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        entries = list(journals[0].read())
+        self.assertEqual(len(entries), 200)
+        self.assertEqual(len({e["user_id"] for e in entries}), 200)
+
+    def test_compaction_merges_past_days(self):
+        for name, users in [("feedback-20250101.jsonl", ["a", "b"]), ("feedback-20250101.1.jsonl", ["c"]),
+                            ("feedback-20250102.jsonl", ["d"])]:
+            with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+                for user in users:
+                    f.write(json.dumps({"user_id": user}) + "\n")
+        # Truncated line left by a crash is skipped
+        with open(os.path.join(self.directory, "feedback-20250102.jsonl"), "a", encoding="utf-8") as f:
+            f.write('{"user_id": "tru')
+
+        journal = self.make_journal()
+        written = journal.compact(today=date(2025, 1, 2))
+
+        self.assertEqual([os.path.basename(p) for p in written], ["feedback-20250101.jsonl.gz"])
+        names = sorted(os.listdir(self.directory))
+        self.assertIn("feedback-20250102.jsonl", names)
+        self.assertNotIn("feedback-20250101.1.jsonl", names)
+        with gzip.open(written[0], "rt", encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 3)
+        self.assertEqual([e["user_id"] for e in journal.read()], ["a", "b", "c", "d"])
+        self.assertEqual([e["user_id"] for e in journal.read(since=date(2025, 1, 2))], ["d"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.gemini_runtime import GeminiRuntime
+
+
+class TestGeminiRuntime(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmpdir.name, "gemini_config.json")
+        self.write_config(0.7)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_config(self, temperature, mtime=None):
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "generation_config": {"temperature": temperature},
+                "safety_settings": [
+                    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_ONLY_HIGH"}
+                ]
+            }, f)
+        if mtime is not None:
+            os.utime(self.config_path, (mtime, mtime))
+
+    def test_config_is_precompiled_once(self):
+        runtime = GeminiRuntime(config_path=self.config_path, check_interval=60)
+        first = runtime.generation_config()
+        with patch("builtins.open", side_effect=AssertionError("config re-read")):
+            second = runtime.generation_config()
+        self.assertIs(first, second)
+        self.assertEqual(first.temperature, 0.7)
+        self.assertEqual(len(first.safety_settings), 1)
+
+    def test_config_reloads_on_mtime_change(self):
+        runtime = GeminiRuntime(config_path=self.config_path, check_interval=0)
+        self.assertEqual(runtime.generation_config().temperature, 0.7)
+        self.write_config(0.2, mtime=os.stat(self.config_path).st_mtime + 10)
+        self.assertEqual(runtime.generation_config().temperature, 0.2)
+
+    def test_invalid_reload_keeps_previous_config(self):
+        runtime = GeminiRuntime(config_path=self.config_path, check_interval=0)
+        first = runtime.generation_config()
+        mtime = os.stat(self.config_path).st_mtime + 10
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        os.utime(self.config_path, (mtime, mtime))
+        self.assertIs(runtime.generation_config(), first)
+
+    def test_missing_config_raises(self):
+        runtime = GeminiRuntime(config_path=os.path.join(self.tmpdir.name, "missing.json"))
+        with self.assertRaises(FileNotFoundError):
+            runtime.generation_config()
+
+    def test_client_is_shared(self):
+        runtime = GeminiRuntime(config_path=self.config_path)
+        with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+            self.assertIs(runtime.client, runtime.client)
+
+
+if __name__ == '__main__':
+    unittest.main()
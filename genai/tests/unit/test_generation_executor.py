@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from google.genai import errors
+
+from app.generation_executor import ATTEMPT_METRIC, GenerationExecutor, GenerationTimeout, RetryBudget, is_retryable
+from app.metrics import metrics
+
+
+class FlakyAttempt:
+    """Callable failing with the given errors before returning "ok"."""
+
+    def __init__(self, *failures):
+        self.failures = list(failures)
+        self.timeouts = []
+
+    def __call__(self, timeout):
+        self.timeouts.append(timeout)
+        if self.failures:
+            raise self.failures.pop(0)
+        return "ok"
+
+
+class TestGenerationExecutor(unittest.TestCase):
+
+    def setUp(self):
+        metrics.reset()
+
+    def make_executor(self, **kwargs):
+        kwargs.setdefault("base_delay", 0.001)
+        kwargs.setdefault("hedge", False)
+        return GenerationExecutor(**kwargs)
+
+    def test_retryable_errors(self):
+        self.assertTrue(is_retryable(errors.ServerError(503, {})))
+        self.assertTrue(is_retryable(errors.ClientError(429, {})))
+        self.assertFalse(is_retryable(errors.ClientError(400, {})))
+        self.assertFalse(is_retryable(ValueError("bad prompt")))
+
+    def test_retries_then_succeeds(self):
+        attempt = FlakyAttempt(errors.ServerError(503, {}), TimeoutError())
+        self.assertEqual(self.make_executor(max_retries=2).run(attempt), "ok")
+        self.assertEqual(len(attempt.timeouts), 3)
+        self.assertEqual(metrics.snapshot()["counters"]["gemini.retries"], 2)
+
+    def test_non_retryable_error_is_raised(self):
+        attempt = FlakyAttempt(errors.ClientError(400, {}))
+        with self.assertRaises(errors.ClientError):
+            self.make_executor().run(attempt)
+        self.assertEqual(len(attempt.timeouts), 1)
+
+    def test_retry_budget_caps_retries(self):
+        budget = RetryBudget(ratio=0.0, max_tokens=1)
+        executor = self.make_executor(max_retries=5, budget=budget)
+        attempt = FlakyAttempt(*[errors.ServerError(503, {})] * 3)
+
+        with self.assertRaises(errors.ServerError):
+            executor.run(attempt)
+        self.assertEqual(len(attempt.timeouts), 2)
+        self.assertEqual(metrics.snapshot()["counters"]["gemini.retry_budget_exhausted"], 1)
+
+    def test_attempt_timeout_is_bounded_by_deadline(self):
+        attempt = FlakyAttempt()
+        self.make_executor(deadline=2.0, attempt_timeout=10.0).run(attempt)
+        self.assertLessEqual(attempt.timeouts[0], 2.0)
+
+    def test_async_deadline(self):
+        async def slow(timeout):
+            await asyncio.sleep(5)
+
+        executor = self.make_executor(deadline=0.1, attempt_timeout=0.05)
+        started = time.monotonic()
+        with self.assertRaises(GenerationTimeout):
+            asyncio.run(executor.run_async(slow))
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertGreaterEqual(metrics.snapshot()["counters"]["gemini.timeouts"], 1)
+
+    def prime_latency(self, seconds):
+        for _ in range(50):
+            metrics.observe(ATTEMPT_METRIC, seconds)
+
+    def test_async_hedge_wins_over_slow_attempt(self):
+        self.prime_latency(0.01)
+        calls = []
+
+        async def attempt(timeout):
+            calls.append(timeout)
+            await asyncio.sleep(2 if len(calls) == 1 else 0)
+            return f"call {len(calls)}"
+
+        executor = self.make_executor(hedge=True)
+        started = time.monotonic()
+        self.assertEqual(asyncio.run(executor.run_async(attempt)), "call 2")
+        self.assertLess(time.monotonic() - started, 1.0)
+        counters = metrics.snapshot()["counters"]
+        self.assertEqual(counters["gemini.hedges"], 1)
+        self.assertEqual(counters["gemini.hedge_wins"], 1)
+
+    def test_sync_hedge_wins_over_slow_attempt(self):
+        self.prime_latency(0.01)
+        lock = threading.Lock()
+        calls = []
+
+        def attempt(timeout):
+            with lock:
+                calls.append(timeout)
+                first = len(calls) == 1
+            if first:
+                time.sleep(1)
+            return "slow" if first else "fast"
+
+        self.assertEqual(self.make_executor(hedge=True).run(attempt), "fast")
+        self.assertEqual(metrics.snapshot()["counters"]["gemini.hedge_wins"], 1)
+
+    def test_no_hedge_without_latency_history(self):
+        executor = self.make_executor(hedge=True)
+        self.assertIsNone(executor.hedge_delay())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import Mock
+
+from app.history_index import HistoryIndex
+from app.models import FollowupQuestion
+
+TOPICS = {"work": [1.0, 0.0, 0.0], "love": [0.0, 1.0, 0.0], "health": [0.0, 0.0, 1.0]}
+
+
+def topic_embedder(text):
+    """Embeds a text as the one-hot vector of the first topic it mentions."""
+    for topic, vector in TOPICS.items():
+        if topic in text:
+            return vector
+    return [0.3, 0.3, 0.3]
+
+
+def make_history(topics):
+    return [
+        FollowupQuestion(question_id=f"q{i}", discussion_id="d1",
+                         question=f"What about {topic}?", response=f"Some {topic} advice.")
+        for i, topic in enumerate(topics, 1)
+    ]
+
+
+class TestHistoryIndex(unittest.TestCase):
+
+    def test_short_history_is_returned_without_embedding(self):
+        embedder = Mock()
+        index = HistoryIndex(backend="local", top_k=3, embedder=embedder)
+        history = make_history(["work", "love", "health"])
+        self.assertEqual(index.relevant_turns("And my job?", history), history[:2])
+        embedder.assert_not_called()
+
+    def test_local_backend_ranks_by_similarity(self):
+        index = HistoryIndex(backend="local", top_k=2, embedder=topic_embedder)
+        history = make_history(["work", "love", "health", "work", "love", "health"])
+        for turn in history[:3]:
+            index.embed_turn(turn)
+
+        relevant = index.relevant_turns("More about work please", history)
+        # The latest turn is always added by the renderer, so it is not ranked
+        self.assertEqual([turn.question_id for turn in relevant], ["q1", "q4"])
+
+    def test_embedding_failure_falls_back(self):
+        index = HistoryIndex(backend="local", top_k=1, embedder=Mock(side_effect=RuntimeError("quota")))
+        self.assertIsNone(index.relevant_turns("work?", make_history(["work", "love", "health"])))
+
+    def test_weaviate_backend_uses_near_vector(self):
+        client = Mock()
+        client.collections.exists.return_value = True
+        query = client.collections.get.return_value.query
+        query.near_vector.return_value = Mock(objects=[
+            Mock(properties={"question_id": "q5"}), Mock(properties={"question_id": "q2"}),
+            Mock(properties={"question_id": "q4"})
+        ])
+        index = HistoryIndex(backend="weaviate", top_k=2, embedder=topic_embedder)
+        history = make_history(["work", "love", "health", "work", "love"])
+
+        relevant = index.relevant_turns("What about love?", history, client)
+
+        self.assertEqual([turn.question_id for turn in relevant], ["q2", "q4"])
+        kwargs = query.near_vector.call_args.kwargs
+        self.assertEqual(kwargs["near_vector"], TOPICS["love"])
+        self.assertEqual(kwargs["limit"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
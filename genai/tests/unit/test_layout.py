@@ -1,6 +1,10 @@
 import unittest
-import random
-from app.card_engine import draw_cards, interpret_card, layout_three_card
+from unittest.mock import patch
+from app import card_engine
+from app.card_engine import (
+    CELTIC_CROSS, SPREADS, THREE_CARD, LayoutTable, build_layout, build_layout_table, draw_cards,
+    draw_spreads, interpret_card, layout_celtic_cross, layout_five_card, layout_three_card, spread_rng
+)
 from app.models import TarotCard, CardLayout
 
 class TestCardEngine(unittest.TestCase):
@@ -42,5 +46,71 @@ class TestCardEngine(unittest.TestCase):
             assert isinstance(card_layout.meaning, str) 
             self.assertTrue(card_layout.name.startswith("Card"))
 
+    def test_layout_five_card(self):
+        layout = layout_five_card(self.deck)
+        self.assertEqual([card.position for card in layout],
+                         ["situation", "challenge", "advice", "hidden_influence", "outcome"])
+        self.assertEqual(len({card.name for card in layout}), 5)
+
+    def test_layout_celtic_cross(self):
+        layout = layout_celtic_cross(self.deck)
+        self.assertEqual(len(layout), 10)
+        self.assertEqual(len({card.name for card in layout}), 10)
+        self.assertEqual(tuple(card.position for card in layout), SPREADS[CELTIC_CROSS].positions)
+
+    def test_seeded_draws_are_reproducible(self):
+        first = layout_celtic_cross(self.deck, rng=spread_rng(42))
+        second = layout_celtic_cross(self.deck, rng=spread_rng(42))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, layout_celtic_cross(self.deck, rng=spread_rng(43)))
+
+    def test_draw_spreads_batch(self):
+        spreads = draw_spreads(self.deck, THREE_CARD, 500, rng=spread_rng(7))
+        self.assertEqual(len(spreads), 500)
+        for spread in spreads:
+            self.assertEqual([card.position for card in spread], ["past", "present", "future"])
+            self.assertEqual(len({card.name for card in spread}), 3)
+        # Orientation and card choice vary across the batch
+        self.assertEqual({card.upright for spread in spreads for card in spread}, {True, False})
+        self.assertEqual(len({spread[0].name for spread in spreads}), len(self.deck))
+
+    def test_unknown_spread(self):
+        with self.assertRaises(ValueError):
+            layout_three_card(self.deck, layout_key="seven_card")
+
+    def test_layout_table_matches_built_layouts(self):
+        table = LayoutTable(self.deck)
+        for upright in (True, False):
+            self.assertEqual(table.layout(2, upright, "crown"), build_layout(self.deck[2], upright, "crown"))
+
+    def test_layout_table_returns_copies(self):
+        table = LayoutTable(self.deck)
+        table.layout(0, True, "past").meaning = "changed"
+        self.assertEqual(table.layout(0, True, "past").meaning, "light0")
+
+        keywords = list(table.layout(0, True, "past").position_keywords)
+        table.layout(0, True, "past").position_keywords.append("leaked")
+        self.assertEqual(table.layout(0, True, "past").position_keywords, keywords)
+
+    def test_layout_table_is_reused_for_the_same_deck(self):
+        table = build_layout_table(self.deck)
+        with patch.object(card_engine, "LayoutTable", wraps=LayoutTable) as table_class:
+            layout_three_card(self.deck)
+            # Same card objects in another order still use the table
+            spread = layout_three_card(sorted(self.deck, key=lambda card: card.name, reverse=True),
+                                       rng=spread_rng(1))
+            table_class.assert_not_called()
+        self.assertIs(card_engine._layout_table, table)
+        for card_layout in spread:
+            card = next(card for card in self.deck if card.name == card_layout.name)
+            self.assertEqual(card_layout, build_layout(card, card_layout.upright, card_layout.position))
+
+    def test_layout_table_is_rebuilt_for_a_new_deck(self):
+        build_layout_table(self.deck)
+        new_deck = [card.model_copy(update={"meanings_light": ["new"]}) for card in self.deck]
+        spread = layout_three_card(new_deck)
+        self.assertIs(card_engine._layout_table.cards[0], new_deck[0])
+        self.assertTrue(all(card.meaning == "new" for card in spread if card.upright))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+from app.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry(window=100)
+
+    def test_counters_and_gauges(self):
+        self.registry.increment("requests")
+        self.registry.increment("requests", 2)
+        self.registry.set_gauge("queue_depth", 7)
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot["counters"]["requests"], 3)
+        self.assertEqual(snapshot["gauges"]["queue_depth"], 7)
+
+    def test_timing_summary(self):
+        for ms in range(1, 101):
+            self.registry.observe("latency", ms / 1000)
+        summary = self.registry.snapshot()["timings"]["latency"]
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["max_ms"], 100.0)
+        self.assertAlmostEqual(summary["p95_ms"], 95.0, delta=1.0)
+        self.assertAlmostEqual(self.registry.percentile("latency", 50), 0.05, delta=0.002)
+
+    def test_window_is_bounded(self):
+        registry = MetricsRegistry(window=10)
+        for i in range(50):
+            registry.observe("latency", i)
+        self.assertEqual(registry.snapshot()["timings"]["latency"]["count"], 10)
+
+    def test_empty_percentile(self):
+        self.assertEqual(self.registry.percentile("missing", 95), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from app.card_engine import POSITION_KEYWORDS
+from app.models import CardLayout, TarotCard
+from app.offline_reading import OfflineReading, compose_offline_reading
+
+
+class TestOfflineReading(unittest.TestCase):
+
+    def setUp(self):
+        self.picks = [
+            CardLayout(name="The Fool", position="past", upright=True,
+                       meaning="Freeing yourself from limitation | Being open-minded",
+                       position_keywords=POSITION_KEYWORDS["past"]),
+            CardLayout(name="The Tower", position="present", upright=False,
+                       meaning="Resisting necessary change", position_keywords=POSITION_KEYWORDS["present"]),
+            CardLayout(name="The Star", position="future", upright=True,
+                       meaning="Renewed hope", position_keywords=POSITION_KEYWORDS["future"]),
+        ]
+        self.deck = {
+            "The Fool": TarotCard(name="The Fool", fortune_telling=["Watch for new projects and new beginnings"]),
+            "The Star": TarotCard(name="The Star", fortune_telling=["A wish will come true"]),
+        }
+
+    def test_reading_covers_every_card(self):
+        reading = compose_offline_reading("Should I change jobs?", self.picks, deck=self.deck)
+
+        self.assertIsInstance(reading, OfflineReading)
+        self.assertIn("Should I change jobs?", reading)
+        for layout in self.picks:
+            self.assertIn(layout.name, reading)
+        self.assertIn("The Tower (reversed)", reading)
+        self.assertIn("roots and foundation", reading)
+        self.assertIn("Watch for new projects and new beginnings.", reading)
+        self.assertIn("resisting necessary change", reading)
+
+    def test_reading_is_deterministic(self):
+        first = compose_offline_reading("Will I travel?", self.picks, deck=self.deck)
+        second = compose_offline_reading("Will I travel?", self.picks, deck=self.deck)
+        self.assertEqual(first, second)
+
+    def test_works_without_deck(self):
+        reading = compose_offline_reading("Any news?", self.picks, deck={})
+        self.assertIn("The Star", reading)
+        self.assertTrue(reading.endswith("Let The Star guide your next step."))
+
+    def test_balanced_orientations(self):
+        picks = self.picks + [CardLayout(name="The Moon", position="crown", upright=False, meaning="Confusion",
+                                         position_keywords=POSITION_KEYWORDS["crown"])]
+        reading = compose_offline_reading("Any news?", picks, deck=self.deck)
+        self.assertIn("Upright and reversed cards are in balance", reading)
+        self.assertNotIn("Most cards", reading)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from app import outbox
+from app.outbox import WriteOutbox, write_object
+
+
+def make_client(errors_by_call=None, exc=None):
+    """Mock client whose insert_many returns the given error dicts in turn."""
+    client = Mock()
+    errors_by_call = list(errors_by_call or [])
+    collection = client.collections.get.return_value
+
+    def insert_many(objects):
+        if exc is not None:
+            raise exc
+        errors = errors_by_call.pop(0) if errors_by_call else {}
+        return Mock(errors={index: Mock(message=message) for index, message in errors.items()})
+
+    collection.data.insert_many.side_effect = insert_many
+    return client
+
+
+class TestWriteOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "outbox.sqlite3")
+        ensure_patch = patch.object(outbox, "ensure_collection")
+        self.ensure = ensure_patch.start()
+        self.addCleanup(ensure_patch.stop)
+
+    def make_outbox(self, **kwargs):
+        box = WriteOutbox(path=self.path, flush_interval=0.01, **kwargs)
+        self.addCleanup(box.close)
+        return box
+
+    def test_enqueue_is_durable(self):
+        box = self.make_outbox()
+        object_uuid = box.enqueue("Feedback", {"user_id": "u1", "rating": 5})
+        box.close()
+
+        reopened = self.make_outbox()
+        self.assertEqual(reopened.depth(), 1)
+        self.assertEqual(reopened._lease(10)[0][2], object_uuid)
+
+    def test_flush_batches_by_collection(self):
+        box = self.make_outbox(batch_size=10)
+        for i in range(3):
+            box.enqueue("Discussion", {"discussion_id": f"d{i}"})
+        box.enqueue("FollowupQuestion", {"question_id": "q1"}, object_uuid="fixed-uuid")
+
+        client = make_client()
+        self.assertEqual(box.flush_once(client), 4)
+
+        self.assertEqual(box.depth(), 0)
+        self.assertEqual(client.collections.get.return_value.data.insert_many.call_count, 2)
+        first_batch = client.collections.get.return_value.data.insert_many.call_args_list[0].args[0]
+        self.assertEqual([o.properties["discussion_id"] for o in first_batch], ["d0", "d1", "d2"])
+        self.ensure.assert_any_call(client, "Discussion")
+        self.ensure.assert_any_call(client, "FollowupQuestion")
+
+    def test_vectors_are_delivered_with_objects(self):
+        box = self.make_outbox()
+        box.enqueue("FollowupQuestion", {"question_id": "q1"}, vector=[0.1, 0.2])
+        box.enqueue("FollowupQuestion", {"question_id": "q2"})
+
+        client = make_client()
+        box.flush_once(client)
+        batch = client.collections.get.return_value.data.insert_many.call_args.args[0]
+        self.assertEqual([o.vector for o in batch], [[0.1, 0.2], None])
+
+    def test_spool_without_vector_column_is_migrated(self):
+        conn = sqlite3.connect(self.path)
+        conn.executescript(outbox._SCHEMA.replace("    vector TEXT,\n", ""))
+        conn.execute("INSERT INTO outbox (collection, object_uuid, properties, enqueued_at) "
+                     "VALUES ('Feedback', 'u1', '{}', 0)")
+        conn.commit()
+        conn.close()
+
+        box = self.make_outbox()
+        self.assertEqual(box.flush_once(make_client()), 1)
+
+    def test_flush_respects_batch_size(self):
+        box = self.make_outbox(batch_size=2)
+        for i in range(5):
+            box.enqueue("Feedback", {"n": i})
+        self.assertEqual(box.flush_once(make_client()), 2)
+        self.assertEqual(box.depth(), 3)
+
+    def test_rejected_objects_are_retried_then_dead_lettered(self):
+        box = self.make_outbox(max_attempts=2)
+        box.enqueue("Feedback", {"n": 0})
+        box.enqueue("Feedback", {"n": 1})
+        client = make_client(errors_by_call=[{1: "invalid"}, {0: "still invalid"}])
+
+        self.assertEqual(box.flush_once(client), 1)
+        self.assertEqual(box.depth(), 1)
+        self.assertEqual(box.flush_once(client), 1)
+        self.assertEqual(box.stats()["depth"], 0)
+        self.assertEqual(box.stats()["dead_lettered"], 1)
+
+    def test_outage_keeps_rows_without_using_attempts(self):
+        box = self.make_outbox(max_attempts=1)
+        box.enqueue("Feedback", {"n": 0})
+
+        with self.assertRaises(ConnectionError):
+            box.flush_once(make_client(exc=ConnectionError("weaviate down")))
+        self.assertEqual(box.depth(), 1)
+
+        self.assertEqual(box.flush_once(make_client()), 1)
+        self.assertEqual(box.stats()["dead_lettered"], 0)
+
+    def test_drain(self):
+        box = self.make_outbox(batch_size=2)
+        for i in range(5):
+            box.enqueue("Feedback", {"n": i})
+        self.assertEqual(box.drain(make_client(), timeout=5), 0)
+        self.assertEqual(box.depth(), 0)
+
+    def test_write_object_inserts_directly_when_disabled(self):
+        client = Mock()
+        client.collections.get.return_value.data.insert.return_value = "abc"
+        with patch.object(outbox, "OUTBOX_ENABLED", False):
+            self.assertEqual(write_object(client, "Feedback", {"n": 1}), "abc")
+        client.collections.get.assert_called_once_with("Feedback")
+
+
+if __name__ == '__main__':
+    unittest.main()
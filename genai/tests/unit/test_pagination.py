@@ -0,0 +1,78 @@
+import unittest
+import uuid
+from unittest.mock import Mock
+
+from app.pagination import decode_cursor, encode_cursor, fetch_page, iterate_all
+
+
+IDS = [str(uuid.UUID(int=i)) for i in range(10)]
+
+
+def make_obj(object_id, timestamp):
+    return Mock(uuid=object_id, properties={"timestamp": timestamp})
+
+
+class FakeCollection:
+    """Answers fetch_objects from an in-memory list, honouring the keyset cursor."""
+
+    def __init__(self, objects):
+        self.objects = sorted(objects, key=lambda o: (o.properties["timestamp"], o.uuid))
+        self.query = Mock()
+        self.query.fetch_objects.side_effect = self._fetch
+        self.cursor_value = None
+        self.seen = []
+
+    def _fetch(self, filters=None, sort=None, limit=10, **kwargs):
+        rows = [
+            o for o in self.objects
+            if self.cursor_value is None
+            or (o.properties["timestamp"] >= self.cursor_value and o.uuid not in self.seen)
+        ]
+        return Mock(objects=rows[:limit])
+
+
+class TestPagination(unittest.TestCase):
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor("2025-01-01T10:00:00", ["a", "b"])
+        self.assertEqual(decode_cursor(cursor), ("2025-01-01T10:00:00", ["a", "b"]))
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_page_has_cursor_only_when_more_rows(self):
+        collection = FakeCollection([make_obj(f"id{i}", f"2025-01-0{i}") for i in range(1, 4)])
+        page = fetch_page(collection, "timestamp", limit=3)
+        self.assertEqual(len(page.objects), 3)
+        self.assertIsNone(page.next_cursor)
+
+        page = fetch_page(collection, "timestamp", limit=2)
+        self.assertEqual([o.uuid for o in page.objects], ["id1", "id2"])
+        self.assertEqual(decode_cursor(page.next_cursor), ("2025-01-02", ["id2"]))
+        self.assertEqual(collection.query.fetch_objects.call_args.kwargs["limit"], 3)
+
+    def test_ties_on_sort_value_are_carried_in_cursor(self):
+        collection = FakeCollection([make_obj(IDS[i], "2025-01-01") for i in range(5)])
+        page = fetch_page(collection, "timestamp", limit=2)
+        value, seen = decode_cursor(page.next_cursor)
+
+        collection.cursor_value, collection.seen = value, seen
+        page = fetch_page(collection, "timestamp", limit=2, after=page.next_cursor)
+        self.assertEqual([o.uuid for o in page.objects], IDS[2:4])
+        self.assertEqual(decode_cursor(page.next_cursor)[1], IDS[:4])
+
+    def test_iterate_all_follows_cursors(self):
+        pages = [
+            Mock(objects=[make_obj(IDS[0], "1"), make_obj(IDS[1], "2"), make_obj(IDS[2], "3")]),
+            Mock(objects=[make_obj(IDS[2], "3")]),
+        ]
+        collection = Mock()
+        collection.query.fetch_objects.side_effect = pages
+        result = list(iterate_all(collection, "timestamp", page_size=2))
+        self.assertEqual([o.uuid for o in result], IDS[:3])
+        self.assertEqual(collection.query.fetch_objects.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
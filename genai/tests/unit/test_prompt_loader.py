@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from string import Template
+
+from app.card_engine import CELTIC_CROSS, THREE_CARD, draw_spread, spread_rng
+from app.prompt_loader import (
+    BASIC_TEMPLATE, SPREAD_TEMPLATE, CompiledTemplate, PromptTemplates, build_tarot_prompt_smart,
+    render_history_context, spread_of
+)
+from tools.prompt_bench import bench_case, uncached_prompt
+from tools.spread_bench import synthetic_deck
+
+
+class TestCompiledTemplate(unittest.TestCase):
+
+    def test_matches_safe_substitute(self):
+        sources = [
+            "Question: $question\nCards:\n$cards",
+            "${question}s cost $$5, $unknown stays, a lone $ too",
+            "$question$cards",
+            "no placeholders at all",
+        ]
+        values = {"question": "Will it work?", "cards": "- [Past] The Fool"}
+        for source in sources:
+            self.assertEqual(CompiledTemplate(source).render(**values), Template(source).safe_substitute(**values))
+
+
+class TestPromptTemplates(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.templates = PromptTemplates(directory=self.tmp.name, check_interval=0)
+        self.write(BASIC_TEMPLATE, "Basic: $question")
+
+    def write(self, name, text, mtime=None):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_reloads_on_mtime_change(self):
+        path = self.write(BASIC_TEMPLATE, "Basic: $question", mtime=1000)
+        first = self.templates.get(path)
+        self.assertIs(self.templates.get(path), first)
+
+        self.write(BASIC_TEMPLATE, "Changed: $question", mtime=2000)
+        self.assertEqual(self.templates.get(path).render(question="q"), "Changed: q")
+
+    def test_per_spread_template_replaces_basic(self):
+        self.assertEqual(self.templates.basic(CELTIC_CROSS).source, "Basic: $question")
+        self.write(SPREAD_TEMPLATE.format(spread=CELTIC_CROSS), "Celtic: $question")
+        self.assertEqual(self.templates.basic(CELTIC_CROSS).source, "Celtic: $question")
+        self.assertEqual(self.templates.basic(THREE_CARD).source, "Basic: $question")
+        self.assertEqual(self.templates.preload(), [BASIC_TEMPLATE, SPREAD_TEMPLATE.format(spread=CELTIC_CROSS)])
+
+    def test_missing_template_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self.templates.get(os.path.join(self.tmp.name, "missing.txt"))
+
+
+class TestPromptAssembly(unittest.TestCase):
+
+    def setUp(self):
+        self.deck = synthetic_deck()
+
+    def test_spread_of(self):
+        self.assertEqual(spread_of(draw_spread(self.deck, CELTIC_CROSS)), CELTIC_CROSS)
+        self.assertIsNone(spread_of(draw_spread(self.deck, CELTIC_CROSS)[:2]))
+
+    def test_prompts_match_uncached_rendering(self):
+        history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+        for layout_key in (THREE_CARD, CELTIC_CROSS):
+            picks = draw_spread(self.deck, layout_key, spread_rng(1))
+            for turns in (None, history):
+                self.assertEqual(build_tarot_prompt_smart("Will it work?", picks, turns),
+                                 uncached_prompt("Will it work?", picks, turns))
+
+    def test_bench_case_reports_timings(self):
+        case = bench_case("Will it work?", draw_spread(self.deck, THREE_CARD, spread_rng(2)), None, iterations=10)
+        self.assertTrue(case["identical"])
+        self.assertGreater(case["compiled_us"], 0)
+
+
+class TestHistoryContext(unittest.TestCase):
+
+    def test_newest_messages_within_budget(self):
+        history = [{"role": "user", "content": "a" * 40}, {"role": "assistant", "content": "b" * 40},
+                   {"role": "user", "content": "c" * 40}]
+        context = render_history_context(history, max_tokens=30)
+        self.assertNotIn("a" * 40, context)
+        self.assertTrue(context.endswith("User: " + "c" * 40))
+
+    def test_oversized_newest_message_is_truncated(self):
+        history = [{"role": "user", "content": "earlier"}, {"role": "assistant", "content": "x" * 1000}]
+        context = render_history_context(history, max_tokens=20)
+        self.assertTrue(context.startswith("Assistant: xxx"))
+        self.assertTrue(context.endswith("..."))
+        self.assertLessEqual(len(context), 20 * 4 + 3)
+        self.assertNotIn("earlier", context)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import Mock
+
+from app.models import CardLayout
+from app.reading_cache import ReadingCache, normalize_question, reading_cache_key
+
+
+def make_spread(upright=True):
+    return [
+        CardLayout(name="The Fool", position="past", upright=upright, meaning="m", position_keywords=[]),
+        CardLayout(name="The Sun", position="present", upright=True, meaning="m", position_keywords=[]),
+        CardLayout(name="The Moon", position="future", upright=False, meaning="m", position_keywords=[]),
+    ]
+
+
+class TestReadingCache(unittest.TestCase):
+
+    def test_normalize_question(self):
+        self.assertEqual(
+            normalize_question("  Will I find LOVE this year?! "),
+            normalize_question("will i find love, this year")
+        )
+
+    def test_key_depends_on_orientation(self):
+        question = "Will I find love?"
+        self.assertNotEqual(
+            reading_cache_key(question, make_spread(upright=True)),
+            reading_cache_key(question, make_spread(upright=False))
+        )
+
+    def test_hit_and_miss_ratio(self):
+        cache = ReadingCache(max_entries=10, ttl=60, similarity_threshold=None)
+        spread = make_spread()
+        self.assertIsNone(cache.get("Will I find love?", spread))
+        cache.set("Will I find love?", spread, "Yes.")
+        self.assertEqual(cache.get("will i find love", spread), "Yes.")
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    def test_lru_eviction(self):
+        cache = ReadingCache(max_entries=2, ttl=60, similarity_threshold=None)
+        spread = make_spread()
+        cache.set("q1", spread, "a1")
+        cache.set("q2", spread, "a2")
+        cache.get("q1", spread)
+        cache.set("q3", spread, "a3")
+        self.assertIsNone(cache.get("q2", spread))
+        self.assertEqual(cache.get("q1", spread), "a1")
+
+    def test_ttl_expiry(self):
+        cache = ReadingCache(max_entries=10, ttl=60, similarity_threshold=None)
+        spread = make_spread()
+        cache.set("q", spread, "a", ttl=0)
+        self.assertIsNone(cache.get("q", spread))
+
+    def test_empty_answer_not_cached(self):
+        cache = ReadingCache(max_entries=10, ttl=60, similarity_threshold=None)
+        cache.set("q", make_spread(), "")
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_remote_tier(self):
+        remote = Mock()
+        remote.get.return_value = "From Redis"
+        cache = ReadingCache(max_entries=10, ttl=60, remote=remote, similarity_threshold=None)
+        spread = make_spread()
+        self.assertEqual(cache.get("q", spread), "From Redis")
+        self.assertEqual(cache.stats()["remote_hits"], 1)
+        cache.set("q2", spread, "a2")
+        remote.set.assert_called_once()
+
+    def test_similarity_match(self):
+        vectors = {
+            "will i find love this year": [1.0, 0.0],
+            "am i going to find love this year": [0.99, 0.05],
+            "should i change jobs": [0.0, 1.0],
+        }
+        cache = ReadingCache(max_entries=10, ttl=60, similarity_threshold=0.95,
+                             embedder=lambda text: vectors[text])
+        spread = make_spread()
+        cache.set("Will I find love this year?", spread, "Love is near.")
+        self.assertEqual(cache.get("Am I going to find love this year?", spread), "Love is near.")
+        self.assertIsNone(cache.get("Should I change jobs?", spread))
+        self.assertEqual(cache.stats()["similar_hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
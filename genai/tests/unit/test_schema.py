@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from weaviate.classes.config import DataType, Tokenization
+
+from app.schema import SCHEMAS, SchemaRegistry, tokenization_of
+
+# Properties used as keyset pagination sort keys; range filters on them need one token per value
+SORT_KEYS = {
+    "Discussion": "created_at",
+    "FollowupQuestion": "timestamp",
+    "Feedback": "timestamp",
+    "ReadingContext": "timestamp",
+    "KeywordMeaning": "created_at",
+}
+
+
+def make_client(existing=None):
+    """
+    Mock client where `existing` maps collection names to their property data
+    types, or to (data type, tokenization) pairs.
+    """
+    existing = dict(existing or {})
+    client = Mock()
+    client.collections.exists.side_effect = lambda name: name in existing
+
+    def get(name):
+        collection = Mock()
+        properties = []
+        for prop_name, spec in existing[name].items():
+            data_type, tokenization = spec if isinstance(spec, tuple) else (spec, None)
+            prop = Mock(data_type=data_type, tokenization=tokenization)
+            prop.name = prop_name  # `name` is reserved in the Mock constructor
+            properties.append(prop)
+        collection.config.get.return_value.properties = properties
+        return collection
+
+    client.collections.get.side_effect = get
+    return client
+
+
+class TestSchemaRegistry(unittest.TestCase):
+
+    def test_every_collection_is_declared_once(self):
+        names = [spec.name for spec in SCHEMAS]
+        self.assertEqual(len(names), len(set(names)))
+        for name in ["Discussion", "FollowupQuestion", "Feedback", "KeywordMeaning", "ReadingContext", "TarotCard"]:
+            self.assertIn(name, names)
+        self.assertLess(names.index("KeywordMeaning"), names.index("TarotCard"))
+
+    def test_bootstrap_creates_missing_collections(self):
+        client = make_client()
+        report = SchemaRegistry().bootstrap(client)
+
+        self.assertEqual(set(report.values()), {"created"})
+        self.assertEqual(client.collections.create.call_count, len(SCHEMAS))
+        tarot = next(c for c in client.collections.create.call_args_list if c.kwargs["name"] == "TarotCard")
+        self.assertEqual(tarot.kwargs["references"][0].target_collection, "KeywordMeaning")
+
+    def test_bootstrap_adds_missing_properties(self):
+        client = make_client({"FollowupQuestion": {"question_id": DataType.TEXT, "discussion_id": DataType.TEXT}})
+        registry = SchemaRegistry([spec for spec in SCHEMAS if spec.name == "FollowupQuestion"])
+
+        self.assertEqual(registry.bootstrap(client), {"FollowupQuestion": "updated"})
+        client.collections.create.assert_not_called()
+
+    def test_sort_keys_are_field_tokenized(self):
+        specs = {spec.name: spec for spec in SCHEMAS}
+        for collection, sort_key in SORT_KEYS.items():
+            prop = next(p for p in specs[collection].properties if p.name == sort_key)
+            self.assertEqual(prop.dataType, DataType.TEXT, collection)
+            self.assertEqual(tokenization_of(prop.dataType, prop.tokenization), "field", collection)
+
+    def test_word_tokenized_sort_key_is_reported(self):
+        client = make_client({"FollowupQuestion": {
+            "question_id": (DataType.TEXT, Tokenization.FIELD),
+            "discussion_id": (DataType.TEXT, Tokenization.FIELD),
+            "question": DataType.TEXT,
+            "response": DataType.TEXT,
+            "timestamp": (DataType.TEXT, Tokenization.WORD),
+        }})
+        registry = SchemaRegistry([spec for spec in SCHEMAS if spec.name == "FollowupQuestion"])
+
+        with patch("app.schema.logger") as logger:
+            self.assertEqual(registry.bootstrap(client), {"FollowupQuestion": "ok"})
+        warnings = [call.args[0] for call in logger.warning.call_args_list]
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("FollowupQuestion.timestamp is word-tokenized", warnings[0])
+
+    def test_checks_happen_once(self):
+        client = make_client()
+        registry = SchemaRegistry()
+        registry.bootstrap(client)
+        client.collections.exists.reset_mock()
+
+        registry.ensure_collection(client, "Discussion")
+        self.assertTrue(registry.collection_available(client, "Feedback"))
+        client.collections.exists.assert_not_called()
+
+    def test_collection_available_without_bootstrap(self):
+        client = make_client({"Discussion": {}})
+        registry = SchemaRegistry()
+
+        self.assertFalse(registry.collection_available(client, "Feedback"))
+        self.assertTrue(registry.collection_available(client, "Discussion"))
+        self.assertTrue(registry.collection_available(client, "Discussion"))
+        self.assertEqual(client.collections.exists.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
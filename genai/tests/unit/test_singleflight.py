@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from app.singleflight import SingleFlight, prompt_key
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_prompt_key_is_stable(self):
+        self.assertEqual(prompt_key("same prompt"), prompt_key("same prompt"))
+        self.assertNotEqual(prompt_key("a"), prompt_key("b"))
+
+    def test_concurrent_threads_share_one_call(self):
+        flight = SingleFlight("test")
+        calls = []
+        started = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return "reading"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(4)]
+        for t in followers:
+            t.start()
+        for t in [leader] + followers:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["reading"] * 5)
+        self.assertEqual(flight.stats()["coalesced"], 4)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_error_is_shared_and_not_cached(self):
+        flight = SingleFlight("test")
+
+        def failing():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flight.do("k", failing)
+        self.assertEqual(flight.do("k", lambda: "ok"), "ok")
+
+    def test_async_callers_share_one_call(self):
+        flight = SingleFlight("test")
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "reading"
+
+        async def run():
+            return await asyncio.gather(*(flight.do_async("k", slow) for _ in range(5)))
+
+        results = asyncio.run(run())
+        self.assertEqual(results, ["reading"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats()["coalesced"], 4)
+
+    def test_async_error_is_shared(self):
+        flight = SingleFlight("test")
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        async def run():
+            return await asyncio.gather(*(flight.do_async("k", failing) for _ in range(3)),
+                                        return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(flight.stats()["executions"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
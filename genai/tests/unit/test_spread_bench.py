@@ -0,0 +1,48 @@
+import argparse
+import unittest
+
+import numpy as np
+
+from tools.spread_bench import chi_square, chi_square_p_value, positive_int, run_simulation, spread_report
+
+
+class TestSpreadBench(unittest.TestCase):
+
+    def test_p_value_approximation(self):
+        # Reference values of the chi-square distribution with 77 degrees of freedom
+        self.assertAlmostEqual(chi_square_p_value(98.48, 77), 0.05, delta=0.003)
+        self.assertAlmostEqual(chi_square_p_value(107.58, 77), 0.0122, delta=0.002)
+        self.assertGreater(chi_square_p_value(50.0, 77), 0.99)
+
+    def test_chi_square_flags_biased_counts(self):
+        self.assertEqual(chi_square(np.full(10, 100))["chi2"], 0.0)
+        biased = np.full(10, 100)
+        biased[0] = 300
+        self.assertLess(chi_square(biased)["p_value"], 1e-6)
+
+    def test_simulation_counts_every_draw(self):
+        result = run_simulation(deck_size=20, cards_per_spread=3, spreads=5000, batch_size=700, workers=1, seed=3)
+        self.assertEqual(result["counts"].shape, (3, 20))
+        self.assertTrue((result["counts"].sum(axis=1) == 5000).all())
+        again = run_simulation(deck_size=20, cards_per_spread=3, spreads=5000, batch_size=700, workers=1, seed=3)
+        self.assertTrue((result["counts"] == again["counts"]).all())
+
+    def test_report_of_uniform_draws(self):
+        names = [f"Card{i}" for i in range(20)]
+        result = run_simulation(deck_size=20, cards_per_spread=3, spreads=20000, batch_size=5000, workers=1, seed=5)
+        report = spread_report(names, ["past", "present", "future"], 20000, result)
+        self.assertEqual(report["cards_drawn"], 60000)
+        self.assertEqual(sum(report["per_card"].values()), 60000)
+        self.assertEqual(set(report["per_position"]), {"past", "present", "future"})
+        self.assertAlmostEqual(report["orientation"]["upright_ratio"], 0.5, delta=0.02)
+        self.assertGreater(report["uniformity"]["p_value"], 0.001)
+
+    def test_counts_must_be_positive(self):
+        self.assertEqual(positive_int("10"), 10)
+        for value in ["0", "-5"]:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                positive_int(value)
+
+
+if __name__ == '__main__':
+    unittest.main()
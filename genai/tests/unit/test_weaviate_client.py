@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import Mock
+
+from app.weaviate_client import WeaviateClientManager
+
+
+class TestWeaviateClientManager(unittest.TestCase):
+
+    def setUp(self):
+        self.clients = []
+
+        def factory():
+            client = Mock()
+            client.is_connected.return_value = True
+            client.is_ready.return_value = True
+            self.clients.append(client)
+            return client
+
+        self.factory = factory
+
+    def test_client_is_reused(self):
+        manager = WeaviateClientManager(factory=self.factory, health_check_interval=60)
+        first = manager.get_client()
+        second = manager.get_client()
+        self.assertIs(first, second)
+        self.assertEqual(len(self.clients), 1)
+
+    def test_connect_is_idempotent(self):
+        manager = WeaviateClientManager(factory=self.factory, health_check_interval=60)
+        self.assertIs(manager.connect(), manager.connect())
+        self.assertEqual(len(self.clients), 1)
+
+    def test_unhealthy_client_is_replaced(self):
+        manager = WeaviateClientManager(factory=self.factory, health_check_interval=0)
+        first = manager.get_client()
+        first.is_ready.return_value = False
+        second = manager.get_client()
+        self.assertIsNot(first, second)
+        first.close.assert_called_once()
+
+    def test_healthy_client_survives_check(self):
+        manager = WeaviateClientManager(factory=self.factory, health_check_interval=0)
+        first = manager.get_client()
+        self.assertIs(manager.get_client(), first)
+        first.close.assert_not_called()
+
+    def test_close_then_reconnect(self):
+        manager = WeaviateClientManager(factory=self.factory, health_check_interval=60)
+        first = manager.get_client()
+        manager.close()
+        first.close.assert_called_once()
+        self.assertIsNot(manager.get_client(), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
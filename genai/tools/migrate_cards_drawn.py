@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+One-off migration of stored cards from JSON text to the typed `cards` property.
+
+Discussion and Feedback objects written before `app/card_codec.py` existed keep
+their cards as JSON text in `cards_drawn`. This tool adds the `cards` nested
+object property to those collections if it is missing, then walks every object
+and rewrites the ones without `cards` in fixed-size batches (other properties
+and the vector are kept; `cards_drawn` is left in place for rollback).
+Discussion rows also get the `card_names` and `response_preview` list fields.
+
+Usage:
+    python tools/migrate_cards_drawn.py [--collection Discussion] [--batch-size 100] [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.card_codec import CARDS_PROPERTY, LEGACY_CARDS_PROPERTY, cards_property, encode_cards, parse_legacy_cards
+from app.rag_engine import response_preview
+from app.weaviate_client import get_weaviate_client
+
+COLLECTIONS = ["Discussion", "Feedback"]
+
+
+def ensure_cards_property(collection, dry_run: bool = False) -> bool:
+    """Add the typed `cards` property if the collection does not have it. Returns True if added."""
+    names = {prop.name for prop in collection.config.get().properties}
+    if CARDS_PROPERTY in names:
+        return False
+    if not dry_run:
+        collection.config.add_property(cards_property())
+    return True
+
+
+def migrated_properties(collection_name: str, props: Dict) -> Dict:
+    """Full property set of a legacy object with its cards decoded, or {} if nothing to do."""
+    if props.get(CARDS_PROPERTY) is not None or not props.get(LEGACY_CARDS_PROPERTY):
+        return {}
+    cards = parse_legacy_cards(props[LEGACY_CARDS_PROPERTY])
+    if not cards:
+        return {}
+
+    updated = dict(props)
+    updated[CARDS_PROPERTY] = encode_cards(cards)
+    if collection_name == "Discussion":
+        if not updated.get("card_names"):
+            updated["card_names"] = [card.name for card in cards]
+        if not updated.get("response_preview"):
+            updated["response_preview"] = response_preview(props.get("initial_response") or "")
+    return updated
+
+
+def flush(collection, pending: List[Tuple[str, Dict, object]], batch_size: int) -> int:
+    """Write one batch of rewritten objects. Returns the number of failures."""
+    with collection.batch.fixed_size(batch_size=batch_size) as batch:
+        for object_uuid, properties, vector in pending:
+            batch.add_object(properties=properties, uuid=object_uuid, vector=vector)
+    failed = collection.batch.failed_objects
+    for failure in failed[:5]:
+        print(f"   ❌ {failure.message}")
+    return len(failed)
+
+
+def migrate_collection(client, name: str, batch_size: int, dry_run: bool) -> Dict[str, int]:
+    stats = {"scanned": 0, "migrated": 0, "skipped": 0, "failed": 0}
+    if not client.collections.exists(name):
+        print(f"⏭️  {name}: collection does not exist")
+        return stats
+
+    collection = client.collections.get(name)
+    if ensure_cards_property(collection, dry_run):
+        print(f"➕ {name}: {'would add' if dry_run else 'added'} '{CARDS_PROPERTY}' property")
+
+    pending: List[Tuple[str, Dict, object]] = []
+    for obj in collection.iterator(include_vector=True):
+        stats["scanned"] += 1
+        properties = migrated_properties(name, obj.properties)
+        if not properties:
+            stats["skipped"] += 1
+            continue
+        vector = obj.vector.get("default") if obj.vector else None
+        pending.append((obj.uuid, properties, vector))
+
+        if len(pending) >= batch_size:
+            failed = 0 if dry_run else flush(collection, pending, batch_size)
+            stats["migrated"] += len(pending) - failed
+            stats["failed"] += failed
+            pending = []
+            print(f"   {name}: {stats['migrated']} migrated, {stats['scanned']} scanned")
+
+    if pending:
+        failed = 0 if dry_run else flush(collection, pending, batch_size)
+        stats["migrated"] += len(pending) - failed
+        stats["failed"] += failed
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate cards_drawn JSON text to the typed cards property')
+    parser.add_argument('--collection', choices=COLLECTIONS, action='append',
+                        help='Collection to migrate (repeatable, default: all)')
+    parser.add_argument('--batch-size', type=int, default=100, help='Objects written per batch')
+    parser.add_argument('--dry-run', action='store_true', help='Only report what would be migrated')
+    args = parser.parse_args()
+
+    client = get_weaviate_client()
+    try:
+        for name in args.collection or COLLECTIONS:
+            stats = migrate_collection(client, name, args.batch_size, args.dry_run)
+            prefix = "🔍 (dry run) " if args.dry_run else "✅ "
+            print(f"{prefix}{name}: {stats['migrated']} migrated, {stats['skipped']} already typed or empty, "
+                  f"{stats['failed']} failed, {stats['scanned']} scanned")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+One-off rebuild of collections whose properties are tokenized differently from `app/schema.py`.
+
+Keyset pagination filters timestamps with range operators, which only compare
+the whole value when the property is FIELD-tokenized. Weaviate cannot change
+the tokenization of an existing property, so a collection created with the
+old word-tokenized `timestamp` / `created_at` is rebuilt: every object is
+copied (properties, UUID and vector) into a staging collection, the original
+is recreated from the schema registry and the objects are copied back.
+
+Stop the GenAI service while this runs; writes made during the rebuild are lost.
+
+Usage:
+    python tools/migrate_sort_keys.py [--collection FollowupQuestion] [--batch-size 100] [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schema import CollectionSpec, create_collection, get_schema_registry, tokenization_of
+from app.weaviate_client import get_weaviate_client
+
+STAGING_SUFFIX = "_SortKeyMigration"
+
+
+def mismatched_properties(collection, spec: CollectionSpec) -> List[str]:
+    """Names of the properties whose tokenization differs from the declared one."""
+    existing = {prop.name: prop for prop in collection.config.get().properties}
+    mismatched = []
+    for prop in spec.properties:
+        current = existing.get(prop.name)
+        if current is None or current.data_type.value != prop.dataType.value:
+            continue
+        if tokenization_of(current.data_type, current.tokenization) != tokenization_of(prop.dataType, prop.tokenization):
+            mismatched.append(prop.name)
+    return mismatched
+
+
+def copy_objects(source, target, batch_size: int) -> int:
+    """Copy every object of `source` into `target`. Returns the number of failures."""
+    with target.batch.fixed_size(batch_size=batch_size) as batch:
+        for obj in source.iterator(include_vector=True):
+            vector = obj.vector.get("default") if obj.vector else None
+            batch.add_object(properties=obj.properties, uuid=obj.uuid, vector=vector)
+    failed = target.batch.failed_objects
+    for failure in failed[:5]:
+        print(f"   ❌ {failure.message}")
+    return len(failed)
+
+
+def rebuild_collection(client, spec: CollectionSpec, batch_size: int) -> Dict[str, int]:
+    if spec.references:
+        raise RuntimeError(f"{spec.name} has cross-references, which this tool does not copy")
+    staging_name = spec.name + STAGING_SUFFIX
+    if client.collections.exists(staging_name):
+        raise RuntimeError(f"{staging_name} already exists; a previous run did not finish")
+
+    original = client.collections.get(spec.name)
+    count = len(original)
+    create_collection(client, spec, name=staging_name)
+    staging = client.collections.get(staging_name)
+    failed = copy_objects(original, staging, batch_size)
+    if failed or len(staging) != count:
+        raise RuntimeError(f"Copying {spec.name} to {staging_name} failed; {spec.name} was left untouched")
+
+    client.collections.delete(spec.name)
+    create_collection(client, spec)
+    failed = copy_objects(staging, client.collections.get(spec.name), batch_size)
+    if failed:
+        raise RuntimeError(f"{failed} objects could not be copied back; they are kept in {staging_name}")
+    client.collections.delete(staging_name)
+    return {"copied": count}
+
+
+def main():
+    registry = get_schema_registry()
+    parser = argparse.ArgumentParser(description='Rebuild collections whose property tokenization is outdated')
+    parser.add_argument('--collection', choices=sorted(registry.specs), action='append',
+                        help='Collection to check (repeatable, default: all)')
+    parser.add_argument('--batch-size', type=int, default=100, help='Objects written per batch')
+    parser.add_argument('--dry-run', action='store_true', help='Only report what would be rebuilt')
+    args = parser.parse_args()
+
+    client = get_weaviate_client()
+    try:
+        for name in args.collection or registry.specs:
+            spec = registry.specs[name]
+            if not client.collections.exists(name):
+                print(f"⏭️  {name}: collection does not exist")
+                continue
+            mismatched = mismatched_properties(client.collections.get(name), spec)
+            if not mismatched:
+                print(f"✅ {name}: tokenization matches the schema")
+            elif args.dry_run:
+                print(f"🔍 (dry run) {name}: would rebuild for {mismatched}")
+            else:
+                stats = rebuild_collection(client, spec, args.batch_size)
+                print(f"✅ {name}: rebuilt for {mismatched}, {stats['copied']} objects copied")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
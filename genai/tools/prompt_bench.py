@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of prompt assembly.
+
+Times `build_tarot_prompt_smart` (compiled templates and cached card blocks)
+for every registered spread, with and without conversation history, against
+the previous way of building the same prompt: a fresh `string.Template` and
+freshly rendered card blocks per call. Each case also checks that both paths
+produce the identical prompt. The report is printed (or written) as JSON so
+assembly cost can be tracked as templates grow.
+
+Usage:
+    python tools/prompt_bench.py [--iterations 20000] [--spread celtic_cross] [--output report.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from string import Template
+from typing import Callable, Dict, List, Sequence
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.card_engine import SPREADS, draw_spread, spread_rng
+from app.models import CardLayout
+from app.prompt_loader import (
+    build_tarot_prompt_smart, load_tarot_template, load_tarot_with_history_template,
+    render_history_context, spread_of
+)
+from spread_bench import synthetic_deck
+
+HISTORY = [
+    {"role": "user", "content": "Will the new job work out for me?"},
+    {"role": "assistant", "content": "The cards point to a slow but steady start, with support from a mentor."},
+    {"role": "user", "content": "What should I watch out for in the first months?"},
+    {"role": "assistant", "content": "Beware of promising too much too early; the Tower reversed warns of overreach."},
+]
+
+
+def uncached_card_blocks(picks: Sequence[CardLayout]) -> str:
+    """Card blocks rendered from scratch on every call."""
+    cards_lines = []
+    for card in picks:
+        orient = "Upright" if card.upright else "Reversed"
+        card_info = [f"- [{card.position.capitalize()}] {card.name}", f"  Orientation: {orient}",
+                     f"  Meaning: {card.meaning}"]
+        if card.position_keywords:
+            card_info.append(f"  Position Keywords: {', '.join(card.position_keywords)}")
+        cards_lines.append("\n".join(card_info))
+    return "\n\n".join(cards_lines)
+
+
+def uncached_prompt(question: str, picks: List[CardLayout], history: List[dict] = None) -> str:
+    """Same prompt as `build_tarot_prompt_smart`, without any compiled or cached parts."""
+    if history:
+        return Template(load_tarot_with_history_template()).safe_substitute(
+            question=question, tarot_context=uncached_card_blocks(picks),
+            history_context=render_history_context(history)
+        )
+    return Template(load_tarot_template(spread=spread_of(picks))).safe_substitute(
+        question=question, cards=uncached_card_blocks(picks)
+    )
+
+
+def per_call_us(fn: Callable[[], str], iterations: int) -> float:
+    fn()
+    return round(min(timeit.repeat(fn, number=iterations, repeat=3)) / iterations * 1e6, 3)
+
+
+def bench_case(question: str, picks: List[CardLayout], history: List[dict], iterations: int) -> Dict:
+    compiled = build_tarot_prompt_smart(question, picks, history)
+    baseline = uncached_prompt(question, picks, history)
+    compiled_us = per_call_us(lambda: build_tarot_prompt_smart(question, picks, history), iterations)
+    baseline_us = per_call_us(lambda: uncached_prompt(question, picks, history), iterations)
+    return {
+        "prompt_chars": len(compiled),
+        "identical": compiled == baseline,
+        "compiled_us": compiled_us,
+        "uncached_us": baseline_us,
+        "speedup": round(baseline_us / compiled_us, 2) if compiled_us else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmark of prompt assembly')
+    parser.add_argument('--iterations', type=int, default=20_000, help='Prompts built per timing run')
+    parser.add_argument('--spread', choices=sorted(SPREADS), action='append',
+                        help='Spread type to benchmark (repeatable, default: all registered)')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args()
+
+    deck = synthetic_deck()
+    question = "What should I focus on in my career this year?"
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "iterations": args.iterations,
+        "spreads": {},
+    }
+    for layout_key in args.spread or sorted(SPREADS):
+        picks = draw_spread(deck, layout_key, spread_rng(0))
+        print(f"Benchmarking {layout_key} prompts...", file=sys.stderr)
+        report["spreads"][layout_key] = {
+            "basic": bench_case(question, picks, None, args.iterations),
+            "with_history": bench_case(question, picks, HISTORY, args.iterations),
+        }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
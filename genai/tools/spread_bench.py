@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo statistics and throughput benchmark for the spread engine.
+
+Draws a large number of simulated spreads through `app.card_engine` for every
+requested spread type and reports:
+
+- draws per second of the vectorized index draw, and of full `CardLayout`
+  spreads (`draw_spreads`) on a smaller sample;
+- per-card and per-position frequency tables and the upright ratio;
+- chi-square uniformity checks (all positions together and per position) and
+  a z-score for the orientation balance.
+
+p-values use the Wilson-Hilferty normal approximation of the chi-square
+distribution, which is accurate for the 77 degrees of freedom of a full deck.
+Work can be split across a process pool with independent seeded streams. The
+report is printed (or written) as JSON so runs can be compared between
+releases.
+
+Usage:
+    python tools/spread_bench.py [--spreads 1000000] [--spread celtic_cross] [--workers 4]
+                                 [--seed 42] [--from-weaviate] [--output report.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.card_engine import SPREADS, draw_indices, draw_spreads, get_spread
+from app.models import TarotCard
+
+DECK_SIZE = 78
+
+
+def synthetic_deck(size: int = DECK_SIZE) -> List[TarotCard]:
+    return [
+        TarotCard(name=f"Card {i:02d}", meanings_light=[f"light {i}"], meanings_shadow=[f"shadow {i}"])
+        for i in range(size)
+    ]
+
+
+def chi_square_p_value(chi2: float, dof: int) -> float:
+    """Upper-tail p-value of a chi-square statistic (Wilson-Hilferty approximation)."""
+    if dof <= 0:
+        return 1.0
+    z = ((chi2 / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def chi_square(counts: np.ndarray) -> Dict[str, float]:
+    """Goodness of fit of `counts` against a uniform distribution."""
+    expected = counts.sum() / counts.size
+    chi2 = float(((counts - expected) ** 2 / expected).sum()) if expected else 0.0
+    dof = counts.size - 1
+    return {"chi2": round(chi2, 3), "dof": dof, "p_value": round(chi_square_p_value(chi2, dof), 6)}
+
+
+def simulate(deck_size: int, cards_per_spread: int, spreads: int, batch_size: int,
+             seed: Optional[np.random.SeedSequence] = None) -> Dict:
+    """
+    Draw `spreads` spreads in batches. Returns per-position card counts, per-
+    position upright counts and the time spent drawing (counting excluded).
+    """
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(cards_per_spread * deck_size, dtype=np.int64)
+    upright_counts = np.zeros(cards_per_spread, dtype=np.int64)
+    offsets = np.arange(cards_per_spread) * deck_size
+    draw_seconds = 0.0
+    remaining = spreads
+    while remaining:
+        batch = min(batch_size, remaining)
+        started = time.perf_counter()
+        indices, upright = draw_indices(deck_size, cards_per_spread, batch, rng)
+        draw_seconds += time.perf_counter() - started
+        counts += np.bincount((indices + offsets).ravel(), minlength=counts.size)
+        upright_counts += upright.sum(axis=0)
+        remaining -= batch
+    return {
+        "counts": counts.reshape(cards_per_spread, deck_size),
+        "upright": upright_counts,
+        "draw_seconds": draw_seconds,
+    }
+
+
+def _simulate_chunk(args) -> Dict:
+    return simulate(*args)
+
+
+def run_simulation(deck_size: int, cards_per_spread: int, spreads: int, batch_size: int,
+                   workers: int, seed: Optional[int]) -> Dict:
+    """Run `simulate` in this process or split over `workers` processes."""
+    started = time.perf_counter()
+    if workers <= 1:
+        result = simulate(deck_size, cards_per_spread, spreads, batch_size, np.random.SeedSequence(seed))
+    else:
+        chunks = [spreads // workers + (1 if i < spreads % workers else 0) for i in range(workers)]
+        streams = np.random.SeedSequence(seed).spawn(workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_chunk, [
+                (deck_size, cards_per_spread, chunk, batch_size, stream) for chunk, stream in zip(chunks, streams)
+            ]))
+        result = {
+            "counts": sum(part["counts"] for part in parts),
+            "upright": sum(part["upright"] for part in parts),
+            "draw_seconds": max(part["draw_seconds"] for part in parts),
+        }
+    result["wall_seconds"] = time.perf_counter() - started
+    return result
+
+
+def measure_layouts(deck: Sequence[TarotCard], layout_key: str, spreads: int, seed: Optional[int]) -> float:
+    """Full spreads (CardLayout objects) per second through `draw_spreads`."""
+    if spreads <= 0:
+        return 0.0
+    rng = np.random.default_rng(seed)
+    draw_spreads(deck, layout_key, 1, rng)  # builds the layout table outside the timing
+    started = time.perf_counter()
+    draw_spreads(deck, layout_key, spreads, rng)
+    return spreads / (time.perf_counter() - started)
+
+
+def spread_report(names: Sequence[str], positions: Sequence[str], spreads: int, result: Dict) -> Dict:
+    counts = result["counts"]
+    upright = int(result["upright"].sum())
+    draws = spreads * len(positions)
+    per_card = counts.sum(axis=0)
+    return {
+        "spreads": spreads,
+        "cards_drawn": draws,
+        "throughput": {
+            "spreads_per_second": round(spreads / result["wall_seconds"], 1),
+            "draws_per_second": round(draws / result["wall_seconds"], 1),
+            "spreads_per_second_drawing_only": round(spreads / result["draw_seconds"], 1)
+            if result["draw_seconds"] else None,
+        },
+        "orientation": {
+            "upright_ratio": round(upright / draws, 6),
+            "z_score": round((upright - draws / 2) / math.sqrt(draws / 4), 3),
+        },
+        "uniformity": chi_square(per_card),
+        "per_card": dict(zip(names, per_card.tolist())),
+        "per_position": {
+            position: {
+                "uniformity": chi_square(counts[i]),
+                "upright_ratio": round(int(result["upright"][i]) / spreads, 6),
+                "counts": dict(zip(names, counts[i].tolist())),
+            }
+            for i, position in enumerate(positions)
+        },
+    }
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo statistics and throughput of the spread engine')
+    parser.add_argument('--spreads', type=positive_int, default=1_000_000, help='Spreads simulated per spread type')
+    parser.add_argument('--spread', choices=sorted(SPREADS), action='append',
+                        help='Spread type to simulate (repeatable, default: all registered)')
+    parser.add_argument('--batch-size', type=positive_int, default=10_000, help='Spreads drawn per vectorized batch')
+    parser.add_argument('--workers', type=positive_int, default=1, help='Processes to split the simulation over')
+    parser.add_argument('--layout-spreads', type=int, default=10_000,
+                        help='Spreads drawn as CardLayout objects to measure layout throughput')
+    parser.add_argument('--seed', type=int, help='Seed for reproducible runs')
+    parser.add_argument('--from-weaviate', action='store_true',
+                        help='Use the deck stored in Weaviate instead of a synthetic 78-card deck')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args()
+
+    if args.from_weaviate:
+        from app.deck_cache import load_deck_from_weaviate
+        from app.weaviate_client import get_weaviate_client
+        client = get_weaviate_client()
+        try:
+            deck = load_deck_from_weaviate(client)
+        finally:
+            client.close()
+    else:
+        deck = synthetic_deck()
+    names = [card.name for card in deck]
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "deck_size": len(deck),
+        "workers": args.workers,
+        "seed": args.seed,
+        "spreads": {},
+    }
+    for layout_key in args.spread or sorted(SPREADS):
+        positions = get_spread(layout_key).positions
+        print(f"Simulating {args.spreads:,} {layout_key} spreads...", file=sys.stderr)
+        result = run_simulation(len(deck), len(positions), args.spreads, args.batch_size, args.workers, args.seed)
+        entry = spread_report(names, positions, args.spreads, result)
+        entry["throughput"]["layout_spreads_per_second"] = round(
+            measure_layouts(deck, layout_key, args.layout_spreads, args.seed), 1
+        )
+        report["spreads"][layout_key] = entry
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
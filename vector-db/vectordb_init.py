@@ -1,15 +1,24 @@
 import weaviate
 from weaviate.classes.init import Auth
-from weaviate.classes.config import Configure
-from weaviate.classes.config import Property, DataType, ReferenceProperty
 import os
+import sys
 from dotenv import load_dotenv
 
 import json
+import uuid
+from datetime import datetime
 import pandas as pd
 from weaviate.util import generate_uuid5
 from tqdm import tqdm
 
+# The collection schema is shared with the genai service; its directory has to be
+# importable, e.g. `PYTHONPATH=../genai python vectordb_init.py` (see the Makefile)
+try:
+    from app.schema import bootstrap_schema
+except ImportError as e:
+    sys.exit(f"Cannot import the shared schema (app.schema): {e}. "
+             f"Put the genai directory on PYTHONPATH, e.g. PYTHONPATH=../genai python vectordb_init.py")
+
 load_dotenv()
 
 weaviate_url = os.environ["WEAVIATE_URL"]
@@ -23,50 +32,10 @@ client = weaviate.connect_to_weaviate_cloud(
 
 # print(client.is_ready())
 
-# 1. KeywordMeaning
-if not client.collections.exists("KeywordMeaning"):
-    client.collections.create(
-        name="KeywordMeaning",
-        properties=[
-            Property(name="keyword",      data_type=DataType.TEXT),
-            Property(name="meaning",      data_type=DataType.TEXT),
-            Property(name="feedback",     data_type=DataType.TEXT_ARRAY), 
-            Property(name="source",       data_type=DataType.TEXT),
-            Property(name="orientation",  data_type=DataType.TEXT),
-            Property(name="position",     data_type=DataType.INT)
-        ],
-        vectorizer_config=Configure.Vectorizer.text2vec_weaviate()
-    )
-
-# 2. TarotCard
-if not client.collections.exists("TarotCard"):
-    client.collections.create(
-        name="TarotCard",
-        properties=[
-            Property(name="name", data_type=DataType.TEXT),
-            Property(name="number", data_type=DataType.TEXT),
-            Property(name="arcana", data_type=DataType.TEXT),
-            Property(name="suit", data_type=DataType.TEXT),
-            Property(name="img", data_type=DataType.TEXT),
-            Property(name="fortune_telling", data_type=DataType.TEXT_ARRAY),
-            Property(name="keywords", data_type=DataType.TEXT_ARRAY),
-            Property(name="meanings_light", data_type=DataType.TEXT_ARRAY),
-            Property(name="meanings_shadow", data_type=DataType.TEXT_ARRAY),
-            Property(name="archetype", data_type=DataType.TEXT),
-            Property(name="hebrew_alphabet", data_type=DataType.TEXT),
-            Property(name="numerology", data_type=DataType.TEXT),
-            Property(name="elemental", data_type=DataType.TEXT),
-            Property(name="mythical_spiritual", data_type=DataType.TEXT),
-            Property(name="questions_to_ask", data_type=DataType.TEXT_ARRAY)
-        ],
-        references=[
-            ReferenceProperty(
-                name="keywordsMeaning",
-                target_collection="KeywordMeaning"
-            )
-        ],
-        vectorizer_config=Configure.Vectorizer.text2vec_weaviate()
-    )
+# Create or validate every collection from the genai schema registry
+# (KeywordMeaning, TarotCard, DeckMeta and the collections the genai service writes)
+for name, outcome in bootstrap_schema(client).items():
+    print(f"🧱 {name}: {outcome}")
 
 collections = client.collections.list_all()
 #print(collections)
@@ -117,6 +86,20 @@ if batch.number_errors > 0:
 else:
     print("✅ All cards imported successfully")
 
+# Bump the deck version so running genai workers reload their cached deck
+deck_meta = client.collections.get("DeckMeta")
+deck_meta_uuid = generate_uuid5("tarot_deck")
+deck_meta_props = {
+    "version": uuid.uuid4().hex,
+    "card_count": len(cards_data),
+    "updated_at": datetime.now().isoformat()
+}
+if deck_meta.data.exists(deck_meta_uuid):
+    deck_meta.data.replace(uuid=deck_meta_uuid, properties=deck_meta_props)
+else:
+    deck_meta.data.insert(properties=deck_meta_props, uuid=deck_meta_uuid)
+print(f"🔖 Deck version bumped to {deck_meta_props['version']}")
+
 # Get the tarot collection
 tarot = client.collections.get("TarotCard")
 result = tarot.query.fetch_objects(limit=4)